@@ -0,0 +1,352 @@
+"""Performance benchmarks of colorteller.
+
+Each case is timed for palette sizes 6, 32, 128 and 512 by default. The time is the min and median over `repeat` runs after one warm-up run, and the peak memory is the peak of the memory traced by `tracemalloc` in a separate run.
+
+```bash
+python -m benchmarks.run run -o baseline.json
+# ... change the code ...
+python -m benchmarks.run run -o current.json
+python -m benchmarks.run compare baseline.json current.json
+```
+"""
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import click
+import numpy as np
+
+DEFAULT_SIZES = (6, 32, 128, 512)
+
+CASES = {}
+
+#: max palette size of the cases that are too slow for large palettes
+MAX_SIZES = {}
+
+
+def case(name, max_size=None):
+    """Register a benchmark case.
+
+    A case is a function that takes a palette and a folder for temporary files, and returns the function to benchmark. Everything done before returning is setup and is not timed.
+
+    :param name: name of the case
+    :param max_size: larger palettes are skipped for this case, defaults to None
+    """
+
+    def _register(func):
+        CASES[name] = func
+        if max_size is not None:
+            MAX_SIZES[name] = max_size
+        return func
+
+    return _register
+
+
+def palette(size: int, seed: int = 42) -> list:
+    """A reproducible palette of random colors."""
+    rgb = np.random.default_rng(seed).integers(0, 256, size=(size, 3))
+
+    return [f"#{r:02x}{g:02x}{b:02x}" for r, g, b in rgb.tolist()]
+
+
+def _colors(hex_strings):
+    from colorteller.teller import Colors
+
+    colors = Colors(color_palette=hex_strings)
+    colors.lab_array
+
+    return colors
+
+
+def _metrics(hex_strings):
+    from colorteller.utils.benchmark import (
+        LightnessBenchmark,
+        PerceptualDistanceBenchmark,
+    )
+
+    return _colors(hex_strings).metrics(
+        methods=[PerceptualDistanceBenchmark, LightnessBenchmark]
+    )
+
+
+@case("hex_to_rgb")
+def _hex_to_rgb(hex_strings, tmp):
+    from colorteller.utils.color import hex_to_rgb
+
+    return lambda: hex_to_rgb(hex_strings)
+
+
+@case("rgb_to_lab")
+def _rgb_to_lab(hex_strings, tmp):
+    from colorteller.utils.color import hex_to_rgb, rgb_to_lab
+
+    rgb = hex_to_rgb(hex_strings)
+
+    return lambda: rgb_to_lab(rgb)
+
+
+@case("PerceptualDistanceBenchmark")
+def _perceptual_distance(hex_strings, tmp):
+    from colorteller.utils.benchmark import PerceptualDistanceBenchmark
+
+    colors = _colors(hex_strings)
+
+    return lambda: PerceptualDistanceBenchmark(colors).metric()
+
+
+@case("LightnessBenchmark")
+def _lightness(hex_strings, tmp):
+    from colorteller.utils.benchmark import LightnessBenchmark
+
+    colors = _colors(hex_strings)
+
+    return lambda: LightnessBenchmark(colors).metric()
+
+
+@case("ColorVisionDeficiencyBenchmark")
+def _color_vision_deficiency(hex_strings, tmp):
+    from colorteller.utils.benchmark import ColorVisionDeficiencyBenchmark
+
+    colors = _colors(hex_strings)
+
+    return lambda: ColorVisionDeficiencyBenchmark(colors).metric()
+
+
+@case("sort_on_distance_matrix")
+def _sort(hex_strings, tmp):
+    from colorteller.utils.color import hex_to_lab
+    from colorteller.utils.sort import sort_on_distance_matrix
+
+    lab = hex_to_lab(hex_strings)
+
+    return lambda: sort_on_distance_matrix(lab)
+
+
+def _benchmark_chart(name):
+    def _chart(hex_strings, tmp):
+        from colorteller.visualize import BenchmarkCharts
+
+        charts = BenchmarkCharts(metrics=_metrics(hex_strings), save_folder=tmp)
+
+        return lambda: getattr(charts, name)(save_to=True)
+
+    return _chart
+
+
+def _application_chart(name):
+    def _chart(hex_strings, tmp):
+        from colorteller.visualize import ApplicationCharts
+
+        charts = ApplicationCharts(colors=_colors(hex_strings), save_folder=tmp)
+
+        return lambda: getattr(charts, name)(save_to=True)
+
+    return _chart
+
+
+# the annotated heatmaps have N^2 text labels, about 10 minutes for 512 colors
+for _name in ("distance_matrix", "noticable_matrix"):
+    case(f"BenchmarkCharts.{_name}", max_size=128)(_benchmark_chart(_name))
+for _name in ("bar_chart", "line_chart", "donut_chart"):
+    case(f"ApplicationCharts.{_name}")(_application_chart(_name))
+# pandas redraws the legend for each color, over 2 minutes for 512 colors
+case("ApplicationCharts.scatter_chart", max_size=128)(
+    _application_chart("scatter_chart")
+)
+
+
+def measure(func, repeat: int = 5, max_time: float = 10.0) -> dict:
+    """Time a function and trace its peak memory.
+
+    If the warm-up run already takes longer than `max_time`, it is used as the only timed run.
+
+    :param func: the function to benchmark
+    :param repeat: number of timed runs, defaults to 5
+    :param max_time: stop repeating after this many seconds, defaults to 10
+    :return: a dict with `time_min`, `time_median` and `repeat` in seconds, and `peak_memory` in bytes.
+    :rtype: dict
+    """
+    t0 = time.perf_counter()
+    func()
+    warm_up_time = time.perf_counter() - t0
+
+    times = []
+    start = time.perf_counter()
+    for _ in range(repeat if warm_up_time <= max_time else 0):
+        t0 = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - t0)
+        if time.perf_counter() - start > max_time:
+            break
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "time_min": min(times, default=warm_up_time),
+        "time_median": statistics.median(times) if times else warm_up_time,
+        "repeat": len(times),
+        "peak_memory": peak_memory,
+    }
+
+
+def _meta() -> dict:
+    import matplotlib
+    import pandas
+
+    from colorteller.version import __version__
+
+    return {
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "colorteller": __version__,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pandas.__version__,
+        "matplotlib": matplotlib.__version__,
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+    }
+
+
+def run(sizes=DEFAULT_SIZES, names=None, repeat: int = 5, max_time: float = 10.0):
+    """Run the benchmark cases.
+
+    :param sizes: palette sizes, defaults to `DEFAULT_SIZES`
+    :param names: names of the cases, defaults to all the cases in `CASES`
+    :param repeat: see `measure`
+    :param max_time: see `measure`
+    :return: a dict with the environment (`meta`) and the results of each case and size (`results`).
+    :rtype: dict
+    """
+    if names is None:
+        names = list(CASES)
+    unknown = [n for n in names if n not in CASES]
+    if unknown:
+        raise ValueError(f"Unknown benchmark cases: {unknown}")
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in names:
+            for size in sizes:
+                if size > MAX_SIZES.get(name, size):
+                    click.echo(f"Skipped {name} for {size} colors", err=True)
+                    continue
+                func = CASES[name](palette(size), Path(tmp))
+                res = {"name": name, "size": size, **measure(func, repeat, max_time)}
+                results.append(res)
+                click.echo(_format_result(res), err=True)
+
+    return {"meta": _meta(), "results": results}
+
+
+def compare(baseline: dict, current: dict, tolerance: float = 0.2) -> list:
+    """Compare the results of a run with a baseline.
+
+    :param baseline: results of the baseline, see `run`
+    :param current: results of the current run, see `run`
+    :param tolerance: relative slowdown or memory increase that is reported as a regression, defaults to 0.2
+    :return: a list of the cases in both runs, with the ratios of the median time and the peak memory, and whether it is a regression.
+    :rtype: list
+    """
+    baseline_results = {(r["name"], r["size"]): r for r in baseline["results"]}
+
+    comparisons = []
+    for r in current["results"]:
+        b = baseline_results.get((r["name"], r["size"]))
+        if b is None:
+            continue
+        time_ratio = r["time_median"] / b["time_median"]
+        memory_ratio = r["peak_memory"] / max(b["peak_memory"], 1)
+        comparisons.append(
+            {
+                "name": r["name"],
+                "size": r["size"],
+                "time_ratio": time_ratio,
+                "memory_ratio": memory_ratio,
+                "regression": time_ratio > 1 + tolerance
+                or memory_ratio > 1 + tolerance,
+            }
+        )
+
+    return comparisons
+
+
+def _format_result(res: dict) -> str:
+    return (
+        f"{res['name']:<36} {res['size']:>5} "
+        f"{res['time_median'] * 1e3:>10.3f} ms {res['peak_memory'] / 2**20:>9.2f} MiB"
+    )
+
+
+@click.group()
+def cli():
+    """Performance benchmarks of colorteller."""
+
+
+@cli.command("run")
+@click.option(
+    "--sizes",
+    "-s",
+    default=",".join(map(str, DEFAULT_SIZES)),
+    show_default=True,
+    help="Comma separated palette sizes",
+)
+@click.option("--name", "-n", multiple=True, help="Benchmark cases to run")
+@click.option("--repeat", "-r", default=5, show_default=True, help="Number of runs")
+@click.option(
+    "--max-time",
+    default=10.0,
+    show_default=True,
+    help="Max time of the runs of one case in seconds",
+)
+@click.option("--output", "-o", default=None, help="Save the results as json")
+@click.option("--baseline", "-b", default=None, help="Compare with a baseline")
+@click.option("--tolerance", default=0.2, show_default=True)
+def run_command(sizes, name, repeat, max_time, output, baseline, tolerance):
+    """Run the benchmarks."""
+    sizes = [int(s) for s in sizes.split(",")]
+    results = run(sizes=sizes, names=list(name) or None, repeat=repeat, max_time=max_time)
+
+    if output:
+        Path(output).write_text(json.dumps(results, indent=2))
+        click.echo(f"Saved results to {output}", err=True)
+    if baseline:
+        baseline = json.loads(Path(baseline).read_text())
+        _report(compare(baseline, results, tolerance))
+
+
+@cli.command("compare")
+@click.argument("baseline")
+@click.argument("current")
+@click.option("--tolerance", default=0.2, show_default=True)
+def compare_command(baseline, current, tolerance):
+    """Compare the results in CURRENT with the results in BASELINE."""
+    baseline = json.loads(Path(baseline).read_text())
+    current = json.loads(Path(current).read_text())
+    _report(compare(baseline, current, tolerance))
+
+
+def _report(comparisons: list):
+    for c in comparisons:
+        flag = "REGRESSION" if c["regression"] else ""
+        click.echo(
+            f"{c['name']:<36} {c['size']:>5} "
+            f"time x{c['time_ratio']:.2f} memory x{c['memory_ratio']:.2f} {flag}"
+        )
+
+    if any(c["regression"] for c in comparisons):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    cli()
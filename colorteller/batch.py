@@ -0,0 +1,222 @@
+import multiprocessing
+from collections import deque
+from itertools import islice
+from typing import Iterable, Iterator, Optional, Union
+
+from loguru import logger
+
+from colorteller.palette import Palette
+from colorteller.teller import Colors, ColorTeller
+from colorteller.utils.benchmark import LightnessBenchmark, PerceptualDistanceBenchmark
+
+DEFAULT_METHODS = [PerceptualDistanceBenchmark, LightnessBenchmark]
+
+_WORKER_METHODS = None
+
+
+def palette_to_colorteller(
+    palette: Union[list, tuple, dict, str, Palette, ColorTeller]
+):
+    """Convert one palette to a ColorTeller object.
+
+    :param palette: a list of hex strings, a dict (or json string of dict) from the colorteller web service, a `palette.Palette` object, or a ColorTeller object.
+    :return: a ColorTeller object
+    :rtype: ColorTeller
+    """
+    if isinstance(palette, ColorTeller):
+        return palette
+    elif isinstance(palette, Palette):
+        return palette.to_colorteller()
+    elif isinstance(palette, (dict, str)):
+        return ColorTeller(colorteller_raw=palette)
+    elif isinstance(palette, (list, tuple)):
+        return ColorTeller(hex_strings=list(palette))
+    else:
+        raise TypeError(
+            f"palette has to be a list of hex strings, a dict, a Palette or a ColorTeller; {palette}"
+        )
+
+
+def benchmark_palette(
+    index: int,
+    palette,
+    methods: Optional[list] = None,
+    cached: Optional[list] = None,
+) -> dict:
+    """Benchmark one palette.
+
+    Exceptions are caught and recorded in the `error` field of the result so that one invalid palette doesn't stop a batch.
+
+    :param index: the index of the palette in the batch
+    :param palette: the palette, see `palette_to_colorteller` for the accepted types.
+    :param methods: a list of benchmark methods, defaults to `DEFAULT_METHODS`
+    :param cached: a list of already known metrics (or None) for each method, the methods with known metrics are not calculated again.
+    :return: a dict with the keys `index`, `colors`, `metrics` and `error`
+    :rtype: dict
+    """
+    if methods is None:
+        methods = DEFAULT_METHODS
+    if cached is None:
+        cached = [None] * len(methods)
+
+    res = {"index": index, "colors": None, "metrics": None, "error": None}
+    try:
+        ct = palette_to_colorteller(palette)
+        res["colors"] = list(ct.hex)
+        colors = Colors(colorteller=ct)
+        res["metrics"] = [
+            metric if metric is not None else m(colors).metric()
+            for m, metric in zip(methods, cached)
+        ]
+    except Exception as e:
+        logger.debug(f"Could not benchmark palette {index}: {e}")
+        res["error"] = f"{type(e).__name__}: {e}"
+
+    return res
+
+
+def _init_worker(methods):
+    global _WORKER_METHODS
+    _WORKER_METHODS = methods
+
+
+def _benchmark_chunk_worker(tasks):
+    return [
+        benchmark_palette(index, palette, methods=_WORKER_METHODS, cached=cached)
+        for index, palette, cached in tasks
+    ]
+
+
+def _lookup_store(index: int, palette, methods: list, store):
+    """Look up the results of a palette in the store.
+
+    :return: the task for the workers and the benchmark objects, which are None if the palette can not be parsed.
+    """
+    try:
+        ct = palette_to_colorteller(palette)
+        colors = Colors(colorteller=ct)
+        benchmarks = [m(colors) for m in methods]
+        cached = [store.get_benchmark(b) for b in benchmarks]
+    except Exception:
+        # leave the error to the worker so that it is reported in the results
+        return (index, palette, None), None
+
+    return (index, list(ct.hex), cached), benchmarks
+
+
+def iter_benchmark_palettes(
+    palettes: Iterable,
+    methods: Optional[list] = None,
+    processes: Optional[int] = None,
+    chunksize: int = 64,
+    store=None,
+    max_in_flight: Optional[int] = None,
+) -> Iterator[dict]:
+    """Benchmark many palettes using a pool of processes.
+
+    The palettes are dispatched to the workers in chunks of `chunksize` and the results are yielded in the same order as the input. `palettes` is consumed lazily, so it can be a generator over a large file: at most `max_in_flight` chunks are read ahead of the results that have been yielded.
+
+    ```python
+    from colorteller import batch
+
+    palettes = [
+        ["#8de4d3", "#344b46", "#74ee65"],
+        ["#238910", "#a6c363", "#509d99"],
+    ]
+    for res in batch.iter_benchmark_palettes(palettes, processes=2):
+        print(res["index"], res["error"])
+    ```
+
+    :param palettes: an iterable of palettes, see `palette_to_colorteller` for the accepted types.
+    :param methods: a list of benchmark methods, defaults to `DEFAULT_METHODS`
+    :param processes: number of worker processes, defaults to the number of CPUs. Use `1` to run in the current process.
+    :param chunksize: number of palettes sent to a worker at once, defaults to 64
+    :param store: a `store.ResultsStore` object. If provided, the results are looked up in the store before the palettes are sent to the workers, and new results are added to the store. Both are done in the thread that consumes the iterator.
+    :param max_in_flight: max number of chunks sent to the workers but not yet yielded, defaults to twice the number of processes
+    :return: an iterator of the results, see `benchmark_palette`.
+    """
+    if methods is None:
+        methods = DEFAULT_METHODS
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    if processes < 1:
+        raise ValueError(f"processes has to be a positive integer; {processes}")
+    if max_in_flight is None:
+        max_in_flight = 2 * processes
+    if chunksize < 1 or max_in_flight < 1:
+        raise ValueError(
+            f"chunksize and max_in_flight have to be positive integers; {chunksize}, {max_in_flight}"
+        )
+
+    def _task(index, palette):
+        """The task for the workers and the benchmark objects to store the results."""
+        if store is None:
+            return (index, palette, None), None
+        return _lookup_store(index, palette, methods, store)
+
+    def _store_results(res, benchmarks, cached):
+        if store is None or benchmarks is None or res["error"] is not None:
+            return
+        for b, metric, cached_metric in zip(benchmarks, res["metrics"], cached):
+            if cached_metric is None:
+                store.put_benchmark(b, metric)
+
+    if processes == 1:
+        for index, palette in enumerate(palettes):
+            (index, palette, cached), benchmarks = _task(index, palette)
+            res = benchmark_palette(index, palette, methods=methods, cached=cached)
+            _store_results(res, benchmarks, cached)
+            yield res
+        return
+
+    indexed = enumerate(palettes)
+    # chunks sent to the workers, in the same order as the input
+    in_flight = deque()
+
+    def _results():
+        async_result, tasks, benchmarks = in_flight.popleft()
+        for res, task, b in zip(async_result.get(), tasks, benchmarks):
+            _store_results(res, b, task[2])
+            yield res
+
+    with multiprocessing.Pool(
+        processes=processes, initializer=_init_worker, initargs=(methods,)
+    ) as pool:
+        while True:
+            chunk = list(islice(indexed, chunksize))
+            if not chunk:
+                break
+            tasks, benchmarks = zip(*(_task(i, palette) for i, palette in chunk))
+            async_result = pool.apply_async(_benchmark_chunk_worker, (tasks,))
+            in_flight.append((async_result, tasks, benchmarks))
+            if len(in_flight) >= max_in_flight:
+                yield from _results()
+        while in_flight:
+            yield from _results()
+
+
+def benchmark_palettes(
+    palettes: Iterable,
+    methods: Optional[list] = None,
+    processes: Optional[int] = None,
+    chunksize: int = 64,
+    store=None,
+    max_in_flight: Optional[int] = None,
+) -> list:
+    """Benchmark many palettes using a pool of processes and return all the results as a list.
+
+    See `iter_benchmark_palettes` for the arguments.
+
+    :return: a list of the results in the same order as the input.
+    :rtype: list
+    """
+    return list(
+        iter_benchmark_palettes(
+            palettes,
+            methods=methods,
+            processes=processes,
+            chunksize=chunksize,
+            store=store,
+            max_in_flight=max_in_flight,
+        )
+    )
@@ -0,0 +1,251 @@
+import asyncio
+import random
+from typing import Iterable, List, Optional
+
+from loguru import logger
+
+from colorteller.teller import ColorTeller
+from colorteller.utils.jsonl import loads
+
+#: the colorteller web service
+DEFAULT_BASE_URL = "https://colorteller.kausalflow.com"
+
+#: HTTP status codes that are retried
+RETRY_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+
+
+def _aiohttp():
+    try:
+        import aiohttp
+    except ImportError as e:
+        raise ImportError(
+            "The client requires aiohttp, install it using `pip install colorteller[client]`"
+        ) from e
+
+    return aiohttp
+
+
+class PaletteResponse:
+    """The result of fetching one palette.
+
+    :param url: the url of the palette
+    :param data: the json of the palette, None if the request failed.
+    :param error: the error message, None if the request succeeded.
+    """
+
+    __slots__ = ("url", "data", "error")
+
+    def __init__(self, url: str, data: Optional[dict] = None, error: Optional[str] = None):
+        self.url = url
+        self.data = data
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        """whether the palette was fetched"""
+        return self.error is None
+
+    def colorteller(self) -> ColorTeller:
+        """Create a ColorTeller object from the palette.
+
+        :return: a ColorTeller object
+        :rtype: ColorTeller
+        """
+        if not self.ok:
+            raise ValueError(f"Could not fetch {self.url}: {self.error}")
+
+        return ColorTeller(colorteller_raw=self.data)
+
+    def __repr__(self):
+        return f"PaletteResponse(url={self.url!r}, ok={self.ok})"
+
+
+class ColorTellerClient:
+    """An asyncio client of the colorteller web service.
+
+    The palettes are fetched concurrently over a pool of keep-alive connections. At most `concurrency` requests are in flight at the same time. Failed requests (connection errors, timeouts and the status codes in `RETRY_STATUSES`) are retried with exponential backoff and jitter, honoring `Retry-After`.
+
+    ```python
+    import asyncio
+    from colorteller.client import ColorTellerClient
+
+    async def main():
+        async with ColorTellerClient(concurrency=8) as client:
+            responses = await client.fetch_many(["/colors/bobcat-yellow/"])
+        return [r.colorteller() for r in responses if r.ok]
+
+    asyncio.run(main())
+    ```
+
+    !!! note
+        The client requires [aiohttp](https://docs.aiohttp.org), e.g., `pip install colorteller[client]`.
+
+    :param base_url: the url of the web service, relative urls and permalinks are resolved against it, defaults to `DEFAULT_BASE_URL`
+    :param concurrency: max number of concurrent requests and connections, defaults to 8
+    :param retries: max number of retries of a request, defaults to 3
+    :param backoff: the delay before the first retry in seconds, doubled for each retry, defaults to 0.5
+    :param max_backoff: max delay between retries in seconds, defaults to 10
+    :param timeout: total timeout of a request in seconds, defaults to 30
+    :param index_file: file name appended to urls ending with `/`, i.e., the json of a permalink, defaults to `index.json`
+    """
+
+    def __init__(
+        self,
+        base_url: str = DEFAULT_BASE_URL,
+        concurrency: int = 8,
+        retries: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 10.0,
+        timeout: float = 30.0,
+        index_file: str = "index.json",
+    ) -> None:
+        if concurrency < 1:
+            raise ValueError(f"concurrency has to be a positive integer; {concurrency}")
+
+        self.base_url = base_url.rstrip("/")
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.index_file = index_file
+
+        self._session = None
+        self._semaphore = None
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def open(self) -> None:
+        """Create the connection pool. It is called by `async with`."""
+        aiohttp = _aiohttp()
+        connector = aiohttp.TCPConnector(
+            limit=self.concurrency, limit_per_host=self.concurrency
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers={"Accept": "application/json"},
+        )
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+
+    async def close(self) -> None:
+        """Close the connection pool. It is called by `async with`."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def url(self, permalink: str) -> str:
+        """The url of the json of a palette.
+
+        ```python
+        client = ColorTellerClient(base_url="https://colorteller.kausalflow.com")
+        client.url("//localhost:1234/colors/bobcat-yellow/")
+        # 'https://localhost:1234/colors/bobcat-yellow/index.json'
+        client.url("bobcat-yellow")
+        # 'https://colorteller.kausalflow.com/colors/bobcat-yellow/index.json'
+        ```
+
+        :param permalink: a full url, a protocol relative url (e.g., the `permalink` of a palette), a path, or the name of a palette.
+        :return: the url
+        :rtype: str
+        """
+        if permalink.startswith("//"):
+            scheme = self.base_url.split("://", 1)[0]
+            url = f"{scheme}:{permalink}"
+        elif "://" in permalink:
+            url = permalink
+        elif permalink.startswith("/"):
+            url = f"{self.base_url}{permalink}"
+        else:
+            url = f"{self.base_url}/colors/{permalink}/"
+
+        if url.endswith("/") and self.index_file:
+            url = f"{url}{self.index_file}"
+
+        return url
+
+    def _delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        if retry_after is not None:
+            try:
+                return min(float(retry_after), self.max_backoff)
+            except ValueError:
+                pass
+        delay = min(self.backoff * 2**attempt, self.max_backoff)
+
+        return delay * (0.5 + random.random() / 2)
+
+    async def fetch(self, permalink: str) -> PaletteResponse:
+        """Fetch one palette, see `url` for the accepted permalinks.
+
+        Errors are not raised but recorded in the response.
+
+        :param permalink: the permalink of the palette
+        :return: the response
+        :rtype: PaletteResponse
+        """
+        if self._session is None:
+            raise RuntimeError("The client is not open, use `async with ColorTellerClient() as client`")
+        aiohttp = _aiohttp()
+        url = self.url(permalink)
+
+        error = None
+        for attempt in range(self.retries + 1):
+            retry_after = None
+            try:
+                async with self._semaphore:
+                    async with self._session.get(url) as resp:
+                        if resp.status in RETRY_STATUSES:
+                            retry_after = resp.headers.get("Retry-After")
+                            error = f"HTTP {resp.status}"
+                        elif resp.status >= 400:
+                            return PaletteResponse(url, error=f"HTTP {resp.status}")
+                        else:
+                            data = loads(await resp.read())
+                            return PaletteResponse(url, data=data)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = f"{type(e).__name__}: {e}"
+            except ValueError as e:
+                return PaletteResponse(url, error=f"{type(e).__name__}: {e}")
+
+            if attempt < self.retries:
+                delay = self._delay(attempt, retry_after)
+                logger.debug(f"Retrying {url} in {delay:.2f}s after {error}")
+                await asyncio.sleep(delay)
+
+        return PaletteResponse(url, error=error)
+
+    async def fetch_many(self, permalinks: Iterable[str]) -> List[PaletteResponse]:
+        """Fetch many palettes concurrently.
+
+        :param permalinks: the permalinks of the palettes, see `url`
+        :return: the responses in the same order as `permalinks`
+        :rtype: list
+        """
+        return list(await asyncio.gather(*(self.fetch(p) for p in permalinks)))
+
+
+def fetch_palettes(permalinks: Iterable[str], **kwargs) -> List[PaletteResponse]:
+    """Fetch many palettes concurrently from a synchronous program.
+
+    ```python
+    from colorteller.client import fetch_palettes
+
+    cts = [r.colorteller() for r in fetch_palettes(["bobcat-yellow"]) if r.ok]
+    ```
+
+    :param permalinks: the permalinks of the palettes, see `ColorTellerClient.url`
+    :param kwargs: arguments of `ColorTellerClient`
+    :return: the responses in the same order as `permalinks`
+    :rtype: list
+    """
+
+    async def _fetch():
+        async with ColorTellerClient(**kwargs) as client:
+            return await client.fetch_many(permalinks)
+
+    return asyncio.run(_fetch())
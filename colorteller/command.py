@@ -1,6 +1,7 @@
 import json
 import os
 import sys
+from functools import partial
 from pathlib import Path
 from typing import Optional, Union
 
@@ -9,8 +10,13 @@ from loguru import logger
 
 from colorteller.teller import Colors, ColorTeller
 from colorteller.utils.benchmark import LightnessBenchmark, PerceptualDistanceBenchmark
-import colorteller.visualize as cvis
-from colorteller.utils.cmd import prepare_paths
+from colorteller.batch import iter_benchmark_palettes
+from colorteller.store import ResultsStore
+from colorteller.utils.cmd import iter_hex_lines, prepare_paths
+from colorteller.utils.delta_e import DEFAULT_METRIC, METRICS
+from colorteller.utils.jsonl import iter_jsonl
+from colorteller.utils.lut import LUT_ENV, build_lut, lut_path
+from colorteller.utils.serialize import FORMATS, dumps_metrics, save_metrics
 
 logger.remove()
 logger.add(sys.stderr, level="INFO", enqueue=True)
@@ -47,7 +53,46 @@ def colorteller(ctx):
     required=False,
     default=False,
 )
-def benchmark(hex_strings, target, with_benchmark_charts):
+@click.option(
+    "--with_application_charts",
+    "-wac",
+    help="whether to create application charts",
+    type=bool,
+    required=False,
+    default=False,
+)
+@click.option(
+    "--jobs",
+    "-j",
+    help="Number of processes to render the application charts",
+    type=int,
+    default=1,
+)
+@click.option(
+    "--format",
+    "-f",
+    "metrics_format",
+    help="Format of the metrics: json, condensed for json with the upper triangles of the matrices, or npz for a binary numpy file (requires --target)",
+    type=click.Choice(FORMATS),
+    default="json",
+)
+@click.option(
+    "--metric",
+    "-m",
+    help="Color difference metric of the perceptual distances",
+    type=click.Choice(list(METRICS)),
+    default=DEFAULT_METRIC,
+    show_default=True,
+)
+def benchmark(
+    hex_strings,
+    target,
+    with_benchmark_charts,
+    with_application_charts,
+    jobs,
+    metrics_format,
+    metric,
+):
     """Benchmark input colors
 
     :param hex: Paper DOI, optional, can be multiple
@@ -58,24 +103,145 @@ def benchmark(hex_strings, target, with_benchmark_charts):
 
     colors = Colors(colorteller=ct)
 
-    metrics = colors.metrics(methods=[PerceptualDistanceBenchmark, LightnessBenchmark])
+    metrics = colors.metrics(
+        methods=[partial(PerceptualDistanceBenchmark, metric=metric), LightnessBenchmark]
+    )
+
+    if metrics_format == "npz" and not target:
+        raise click.UsageError("--format npz requires --target")
 
+    paths = {}
     if target:
         paths = prepare_paths(target)
         target = paths["target"]
 
     if paths.get("metrics_to"):
         metrics_to = paths["metrics_to"]
-        with open(metrics_to, "w") as fp:
-            json.dump(metrics, fp)
+        if metrics_format == "npz":
+            metrics_to = metrics_to.with_suffix(".npz")
+        save_metrics(metrics, metrics_to, format=metrics_format)
     else:
-        click.echo(json.dumps(metrics, indent=2))
+        click.echo(dumps_metrics(metrics, format=metrics_format, indent=2))
 
     if with_benchmark_charts and target:
         # create visualizations
+        # the plotting stack is slow to import, so only import it when needed
+        import colorteller.visualize as cvis
+
         click.echo("Creating benchmark charts...")
         vis_bm = cvis.BenchmarkCharts(metrics=metrics, save_folder=target)
         vis_bm.distance_matrix(show=False, save_to=True)
         click.echo(f"Saved distance_matrix chart to folder {target}.")
         vis_bm.noticable_matrix(show=False, save_to=True)
         click.echo(f"Saved noticable_matrix chart to folder {target}.")
+
+    if with_application_charts and target:
+        import colorteller.visualize as cvis
+
+        click.echo("Creating application charts...")
+        vis_ac = cvis.ApplicationCharts(colors=colors, save_folder=target)
+        charts = vis_ac.charts(save_to=True, jobs=jobs)
+        click.echo(f"Saved {', '.join(charts)} to folder {target}.")
+
+
+@colorteller.command(name="benchmark-batch")
+@click.option(
+    "--input",
+    "-i",
+    "input_file",
+    help="File of palettes to benchmark, use - for stdin",
+    type=click.File("r"),
+    default="-",
+)
+@click.option(
+    "--output",
+    "-o",
+    "output_file",
+    help="File to write the metrics to, one json record per line, use - for stdout",
+    type=click.File("w"),
+    default="-",
+)
+@click.option(
+    "--format",
+    "-f",
+    "input_format",
+    help="Format of the input: jsonl for colorteller web service records or lines for one palette per line with comma or space separated hex strings",
+    type=click.Choice(["jsonl", "lines"]),
+    default="jsonl",
+)
+@click.option(
+    "--jobs",
+    "-j",
+    help="Number of worker processes",
+    type=int,
+    default=1,
+)
+@click.option(
+    "--chunksize",
+    help="Number of palettes sent to a worker at once",
+    type=int,
+    default=64,
+)
+@click.option(
+    "--store",
+    "-s",
+    "store_path",
+    help="Folder of a results store to reuse and save the results",
+    type=click.Path(exists=False),
+    required=False,
+    default=None,
+)
+@click.option(
+    "--metric",
+    "-m",
+    help="Color difference metric of the perceptual distances",
+    type=click.Choice(list(METRICS)),
+    default=DEFAULT_METRIC,
+    show_default=True,
+)
+def benchmark_batch(
+    input_file, output_file, input_format, jobs, chunksize, store_path, metric
+):
+    """Benchmark many palettes from a file or stdin
+
+    Each line of the output is a json record with the keys `index`, `colors`, `metrics` and `error`, in the same order as the input. Invalid jsonl records are skipped with a warning. The input is streamed, so only a few chunks of palettes per job are held in memory.
+    """
+
+    if input_format == "jsonl":
+        palettes = iter_jsonl(input_file, as_hex=True, errors="skip")
+    else:
+        palettes = iter_hex_lines(input_file)
+
+    methods = [partial(PerceptualDistanceBenchmark, metric=metric), LightnessBenchmark]
+
+    store = None
+    if store_path:
+        store = ResultsStore(store_path)
+
+    for res in iter_benchmark_palettes(
+        palettes, methods=methods, processes=jobs, chunksize=chunksize, store=store
+    ):
+        output_file.write(json.dumps(res) + "\n")
+
+
+@colorteller.command(name="build-lut")
+@click.option(
+    "--target",
+    "-t",
+    help="Path to save the lookup table, defaults to the environment variable COLORTELLER_LUT",
+    type=click.Path(exists=False),
+    default=None,
+)
+def build_lookup_table(target):
+    """Build the sRGB to Lab lookup table
+
+    The table (about 200 MB) is used to convert hex colors to Lab values if the environment variable COLORTELLER_LUT is set to its path.
+    """
+    if target is None:
+        target = lut_path()
+    if target is None:
+        raise click.UsageError(f"--target is required if {LUT_ENV} is not set")
+
+    click.echo("Building the lookup table...")
+    path = build_lut(target)
+    click.echo(f"Saved the lookup table to {path}.")
@@ -1,10 +1,65 @@
+from functools import lru_cache
+from typing import Optional
+
 import numpy as np
 import pandas as pd
 
 
+@lru_cache(maxsize=128)
+def _cached_values(shape: tuple, limits: tuple, seed: int, mode: str) -> np.ndarray:
+    values = _values(shape, limits, seed, mode)
+    values.setflags(write=False)
+
+    return values
+
+
+def _values(shape: tuple, limits: tuple, seed: Optional[int], mode: str) -> np.ndarray:
+    if mode == "rand":
+        return np.random.default_rng(seed).random(shape)
+    elif mode == "constant":
+        return np.full(shape, float(limits[1]))
+    else:
+        raise ValueError("mode should be: rand, linear or constant")
+
+
+def values(shape: tuple, limits=None, seed: Optional[int] = None, mode="rand"):
+    """Values of a dataset.
+
+    The random values are drawn from a `numpy.random.Generator` seeded with `seed`, so the global random state is not touched. With a seed, the values are cached by `(shape, limits, seed, mode)` and the same read-only array is returned for all the datasets of the same shape, e.g., palettes of the same size share one array.
+
+    !!! note
+        The cached arrays are read-only. Use `.copy()` to modify the values.
+
+    :param shape: shape of the values
+    :param limits: the min and max values, defaults to `[0, 100]`
+    :param seed: seed of the random generator, defaults to None, i.e., new random values without caching.
+    :param mode: `rand` for random values in [0, 1), or `constant` for the max value; defaults to `rand`
+    :return: an array of the values
+    :rtype: numpy.ndarray
+    """
+    if limits is None:
+        limits = [0, 100]
+    shape, limits = tuple(shape), tuple(limits)
+
+    if seed is None:
+        return _values(shape, limits, seed, mode)
+
+    return _cached_values(shape, limits, seed, mode)
+
+
 class Dataset:
     def __init__(self) -> None:
-        pass
+        self._data = None
+
+    def data(self):
+        """The data of the dataset. It is created once and reused for the following calls.
+
+        The data is backed by the shared read-only values from `values` and is not copied.
+        """
+        if self._data is None:
+            self._data = self._create_data()
+
+        return self._data
 
 
 class TwoDimScalar(Dataset):
@@ -50,15 +105,14 @@ class TwoDimScalar(Dataset):
 
         return index
 
-    def data(self):
+    def _create_data(self):
         data = self._rand_data()
-        dataframe = pd.DataFrame(data, columns=self.column, index=self.index)
+        dataframe = pd.DataFrame(data, columns=self.column, index=self.index, copy=False)
 
         return dataframe
 
     def _rand_data(self):
-        np.random.seed(self.seed)
-        return np.random.rand(self.rows, self.columns)
+        return values((self.rows, self.columns), self.limits, self.seed)
 
     @property
     def rows(self):
@@ -112,20 +166,14 @@ class OneDimScalar(Dataset):
 
         return index
 
-    def data(self):
+    def _create_data(self):
         data = self._rand_data()
-        series = pd.Series(data, index=self.index)
+        series = pd.Series(data, index=self.index, copy=False)
 
         return series
 
     def _rand_data(self):
-        if self.mode == "rand":
-            np.random.seed(self.seed)
-            return np.random.rand(self.rows)
-        elif self.mode == "constant":
-            return np.ones(self.rows) * self.max
-        else:
-            raise ValueError("mode should be: rand, linear or constant")
+        return values((self.rows,), self.limits, self.seed, self.mode)
 
     @property
     def rows(self):
@@ -0,0 +1,208 @@
+from typing import List, Optional, Union
+
+import numpy as np
+
+from colorteller.palette import Palette
+from colorteller.utils.benchmark import LightnessBenchmark, PerceptualDistanceBenchmark
+from colorteller.utils.color import hex_to_rgb
+from colorteller.utils.delta_e import delta_e_cie2000, delta_e_cie2000_matrix
+from colorteller.utils.lut import rgb_to_lab_lut
+
+
+class PaletteEditor:
+    """An editable palette that keeps its benchmarks up to date.
+
+    The distance matrix, the noticable matrix and the lightness flags are updated when a color is added, removed or replaced. Each edit calculates the distances between one color and the others, i.e., O(N) instead of the O(N^2) of `teller.Colors.metrics`.
+
+    ```python
+    from colorteller.editor import PaletteEditor
+    from colorteller.visualize import BenchmarkCharts
+
+    editor = PaletteEditor(["#8de4d3", "#344b46", "#74ee65"])
+    editor.add("#238910")
+    editor.replace(0, "#a6c363")
+    editor.remove(1)
+
+    m = editor.metrics()
+    BenchmarkCharts(metrics=m).distance_matrix()
+    ```
+
+    !!! note "Storage"
+        Each color is kept in a slot of preallocated arrays. Removing a color frees its slot, which is reused by the next color added, and the order of the palette is a list of slots. The arrays grow by doubling when all the slots are used.
+
+    :param colors: the initial palette, a list of hex strings or a `palette.Palette` object, defaults to an empty palette
+    :param threshold: the deltaE threshold for two colors to be noticable, see `utils.benchmark.PerceptualDistanceBenchmark`, defaults to 5
+    :param min_lightness: the min lightness value, see `utils.benchmark.LightnessBenchmark`, defaults to 25
+    :param max_lightness: the max lightness value, see `utils.benchmark.LightnessBenchmark`, defaults to 85
+    """
+
+    def __init__(
+        self,
+        colors: Optional[Union[list, Palette]] = None,
+        threshold: Union[int, float] = 5,
+        min_lightness: Union[int, float] = 25,
+        max_lightness: Union[int, float] = 85,
+    ) -> None:
+        self.threshold = threshold
+        self.min_lightness = min_lightness
+        self.max_lightness = max_lightness
+
+        if colors is None:
+            colors = []
+        rgb = colors.rgb if isinstance(colors, Palette) else hex_to_rgb(colors)
+        n = len(rgb)
+
+        self._allocate(max(n, 8))
+        self._hex[:n] = Palette(rgb).hex
+        self._lab[:n] = rgb_to_lab_lut(rgb)
+        self._distances[:n, :n] = delta_e_cie2000_matrix(self._lab[:n])
+        self._noticable[:n, :n] = self._distances[:n, :n] > threshold
+        self._update_lightness(slice(0, n))
+
+        self.order = list(range(n))
+        self._free = list(range(self._capacity - 1, n - 1, -1))
+
+    def _allocate(self, capacity: int) -> None:
+        self._capacity = capacity
+        self._hex = [None] * capacity
+        self._lab = np.zeros((capacity, 3))
+        self._distances = np.zeros((capacity, capacity))
+        self._noticable = np.zeros((capacity, capacity), dtype=bool)
+        self._bounded = np.zeros((capacity, 3), dtype=bool)
+
+    def _grow(self) -> None:
+        """Double the capacity of the arrays. Amortized, it is O(N) per added color."""
+        old = self._capacity
+        hex_strings, lab = self._hex, self._lab
+        distances, noticable, bounded = self._distances, self._noticable, self._bounded
+
+        self._allocate(2 * old)
+        self._hex[:old] = hex_strings
+        self._lab[:old] = lab
+        self._distances[:old, :old] = distances
+        self._noticable[:old, :old] = noticable
+        self._bounded[:old] = bounded
+        self._free.extend(range(self._capacity - 1, old - 1, -1))
+
+    def _update_lightness(self, slots) -> None:
+        lightness = self._lab[slots, 0]
+        smaller_than_max = lightness <= self.max_lightness
+        greater_than_min = lightness >= self.min_lightness
+        self._bounded[slots] = np.stack(
+            [smaller_than_max, greater_than_min, smaller_than_max & greater_than_min],
+            axis=-1,
+        )
+
+    def _set(self, slot: int, rgb: np.ndarray) -> None:
+        """Set the color in a slot and update its distances to the colors in the palette.
+
+        :param rgb: the rgb value of the color, an array of shape (1, 3) from `utils.color.hex_to_rgb`
+        """
+        self._hex[slot] = Palette(rgb).hex[0]
+        self._lab[slot] = rgb_to_lab_lut(rgb)[0]
+        self._update_lightness([slot])
+
+        others = np.array([s for s in self.order if s != slot], dtype=int)
+        distances = delta_e_cie2000(self._lab[others], self._lab[slot])
+        self._distances[slot, others] = distances
+        self._distances[others, slot] = distances
+        self._distances[slot, slot] = 0
+        self._noticable[slot, others] = distances > self.threshold
+        self._noticable[others, slot] = distances > self.threshold
+        self._noticable[slot, slot] = False
+
+    def __len__(self):
+        return len(self.order)
+
+    @property
+    def hex(self) -> List[str]:
+        """a list of hex strings of the palette"""
+        return [self._hex[s] for s in self.order]
+
+    @property
+    def palette(self) -> Palette:
+        """a `palette.Palette` object of the colors"""
+        return Palette.from_hex(self.hex)
+
+    def add(self, hex_string: str, index: Optional[int] = None) -> None:
+        """Add a color to the palette.
+
+        :param hex_string: the hex string of the color
+        :param index: position of the new color, defaults to the end of the palette
+        """
+        # parse the color first, so that an invalid hex string doesn't change the palette
+        rgb = hex_to_rgb([hex_string])
+        if not self._free:
+            self._grow()
+        slot = self._free.pop()
+        self.order.insert(len(self.order) if index is None else index, slot)
+        self._set(slot, rgb)
+
+    def remove(self, index: int) -> str:
+        """Remove a color from the palette.
+
+        :param index: position of the color
+        :return: the hex string of the removed color
+        :rtype: str
+        """
+        slot = self.order.pop(index)
+        self._free.append(slot)
+
+        return self._hex[slot]
+
+    def replace(self, index: int, hex_string: str) -> None:
+        """Replace a color of the palette.
+
+        :param index: position of the color
+        :param hex_string: the hex string of the new color
+        """
+        rgb = hex_to_rgb([hex_string])
+        self._set(self.order[index], rgb)
+
+    def distances(self) -> np.ndarray:
+        """the distance matrix of the palette, of shape (N, N)"""
+        slots = np.array(self.order, dtype=int)
+
+        return self._distances[np.ix_(slots, slots)]
+
+    def noticable(self) -> np.ndarray:
+        """the noticable matrix of the palette, of shape (N, N)"""
+        slots = np.array(self.order, dtype=int)
+
+        return self._noticable[np.ix_(slots, slots)]
+
+    def metrics(self) -> list:
+        """The metrics of the palette in the same format as `teller.Colors.metrics` with `PerceptualDistanceBenchmark` and `LightnessBenchmark`, e.g., for `visualize.BenchmarkCharts`.
+
+        Assembling the metrics is O(N^2) as the matrices have N^2 values, but no distance is calculated.
+
+        :return: a list of the perceptual distance and lightness metrics
+        :rtype: list
+        """
+        slots = np.array(self.order, dtype=int)
+        lab = self._lab[slots]
+        bounded = self._bounded[slots]
+
+        return [
+            {
+                "method": PerceptualDistanceBenchmark.method,
+                "data": {
+                    "colors": self.hex,
+                    "metric": "cie2000",
+                    "lab": [tuple(c) for c in lab.tolist()],
+                    "distances": self.distances().tolist(),
+                    "noticable": self.noticable().tolist(),
+                },
+            },
+            {
+                "method": LightnessBenchmark.method,
+                "data": {
+                    "lightness": lab[:, 0].tolist(),
+                    "min_lightness": self.min_lightness,
+                    "max_lightness": self.max_lightness,
+                    "smaller_than_max": bounded[:, 0].tolist(),
+                    "greater_than_min": bounded[:, 1].tolist(),
+                    "bounded_by_min_max": bounded[:, 2].tolist(),
+                },
+            },
+        ]
@@ -0,0 +1,159 @@
+import time
+from functools import partial
+from typing import Optional
+
+import numpy as np
+from loguru import logger
+
+from colorteller.teller import Colors
+from colorteller.utils.benchmark import LightnessBenchmark, PerceptualDistanceBenchmark
+from colorteller.utils.lut import rgb_to_lab_lut
+from colorteller.utils.delta_e import delta_e_cie2000, delta_e_cie2000_matrix
+
+
+def _candidate_grid(grid_size: int, min_lightness: float, max_lightness: float):
+    """A regular grid of sRGB colors within the lightness bounds."""
+    levels = np.linspace(0, 255, grid_size).round().astype(np.uint8)
+    rgb = np.stack(np.meshgrid(levels, levels, levels, indexing="ij"), axis=-1)
+    rgb = rgb.reshape(-1, 3)
+    lab = rgb_to_lab_lut(rgb)
+    in_bounds = (lab[:, 0] >= min_lightness) & (lab[:, 0] <= max_lightness)
+
+    return rgb[in_bounds], lab[in_bounds]
+
+
+def _farthest_point_sampling(lab: np.ndarray, n: int, rng) -> np.ndarray:
+    """Pick n points one by one, each time the candidate farthest from the ones already picked."""
+    chosen = [int(rng.integers(len(lab)))]
+    min_distances = delta_e_cie2000(lab, lab[chosen[0]])
+    for _ in range(n - 1):
+        nxt = int(np.argmax(min_distances))
+        chosen.append(nxt)
+        min_distances = np.minimum(min_distances, delta_e_cie2000(lab, lab[nxt]))
+
+    return np.array(chosen)
+
+
+def generate_palette(
+    n: int,
+    min_lightness: float = 25,
+    max_lightness: float = 85,
+    grid_size: int = 24,
+    batch_size: int = 256,
+    time_budget: float = 2.0,
+    max_iter: int = 10000,
+    seed: Optional[int] = None,
+    methods: Optional[list] = None,
+) -> dict:
+    """Generate a palette of n colors that maximizes the minimum pairwise CIEDE2000 distance, with the lightness of all the colors within the bounds.
+
+    1. The initial palette is picked from a regular grid of sRGB colors (`grid_size` levels for each channel) using farthest point sampling.
+    2. The palette is refined using simulated annealing: in each step, one of the two closest colors (or sometimes a random color) is replaced by the best of `batch_size` random perturbations in sRGB. All the perturbations are scored at once.
+
+    The refinement stops after `time_budget` seconds or `max_iter` steps, and the best palette found is returned. The colors are converted to Lab using `utils.lut.rgb_to_lab_lut`, the same as the benchmarks, so `min_distance` is the minimum of the distances in the metrics.
+
+    ```python
+    from colorteller.generate import generate_palette
+
+    res = generate_palette(8, min_lightness=25, max_lightness=85, seed=42)
+    res["colors"], res["min_distance"]
+    ```
+
+    :param n: number of colors
+    :param min_lightness: the min lightness value, defaults to 25
+    :param max_lightness: the max lightness value, defaults to 85
+    :param grid_size: number of levels for each channel of the candidate grid, defaults to 24
+    :param batch_size: number of perturbations scored in each step, defaults to 256
+    :param time_budget: max time of the refinement in seconds, defaults to 2
+    :param max_iter: max number of refinement steps, defaults to 10000
+    :param seed: seed of the random generator, defaults to None
+    :param methods: benchmark methods for the metrics of the palette, defaults to `PerceptualDistanceBenchmark` and `LightnessBenchmark` with the lightness bounds.
+    :return: a dict with the hex strings of the palette (`colors`), the minimum pairwise distance (`min_distance`) and the metrics (`metrics`).
+    :rtype: dict
+    """
+    if n < 2:
+        raise ValueError(f"n has to be at least 2; {n}")
+
+    rng = np.random.default_rng(seed)
+
+    rgb_grid, lab_grid = _candidate_grid(grid_size, min_lightness, max_lightness)
+    if len(lab_grid) < n:
+        raise ValueError(
+            f"Not enough colors within the lightness bounds [{min_lightness}, {max_lightness}]"
+        )
+    chosen = _farthest_point_sampling(lab_grid, n, rng)
+    rgb = rgb_grid[chosen].astype(int)
+    lab = lab_grid[chosen]
+
+    dist = delta_e_cie2000_matrix(lab)
+    np.fill_diagonal(dist, np.inf)
+    score = dist.min()
+    best_rgb, best_score = rgb.copy(), score
+    logger.debug(f"Initial minimum distance from farthest point sampling: {score}")
+
+    start = time.perf_counter()
+    steps = 0
+    for _ in range(max_iter):
+        elapsed = time.perf_counter() - start
+        if elapsed > time_budget:
+            break
+        steps += 1
+        progress = elapsed / time_budget
+        step = max(1, int(32 * (1 - progress)))
+        temperature = 0.5 * (1 - progress) + 1e-6
+
+        # move one of the closest pair most of the time
+        if rng.random() < 0.8:
+            i = int(rng.choice(np.unravel_index(np.argmin(dist), dist.shape)))
+        else:
+            i = int(rng.integers(n))
+
+        candidates_rgb = np.clip(
+            rgb[i] + rng.integers(-step, step + 1, size=(batch_size, 3)), 0, 255
+        )
+        candidates_lab = rgb_to_lab_lut(candidates_rgb.astype(np.uint8))
+        others = np.delete(np.arange(n), i)
+        candidates_dist = delta_e_cie2000(
+            candidates_lab[:, None, :], lab[None, others, :]
+        )
+        candidates_min = candidates_dist.min(axis=1)
+        in_bounds = (candidates_lab[:, 0] >= min_lightness) & (
+            candidates_lab[:, 0] <= max_lightness
+        )
+        candidates_min[~in_bounds] = -np.inf
+        best_candidate = int(np.argmax(candidates_min))
+        if not np.isfinite(candidates_min[best_candidate]):
+            continue
+
+        # the score of the palette if color i is replaced
+        dist_without_i = dist[np.ix_(others, others)].min() if n > 2 else np.inf
+        new_score = min(dist_without_i, candidates_min[best_candidate])
+        if new_score >= score or rng.random() < np.exp(
+            (new_score - score) / temperature
+        ):
+            rgb[i] = candidates_rgb[best_candidate]
+            lab[i] = candidates_lab[best_candidate]
+            dist[i, others] = candidates_dist[best_candidate]
+            dist[others, i] = candidates_dist[best_candidate]
+            score = new_score
+            if score > best_score:
+                best_rgb, best_score = rgb.copy(), score
+
+    logger.debug(f"Minimum distance after {steps} refinement steps: {best_score}")
+
+    hex_strings = [f"#{r:02x}{g:02x}{b:02x}" for r, g, b in best_rgb.tolist()]
+    if methods is None:
+        methods = [
+            PerceptualDistanceBenchmark,
+            partial(
+                LightnessBenchmark,
+                min_lightness=min_lightness,
+                max_lightness=max_lightness,
+            ),
+        ]
+
+    return {
+        "colors": hex_strings,
+        "min_distance": float(best_score),
+        "metrics": Colors(color_palette=hex_strings).metrics(methods=methods),
+    }
@@ -0,0 +1,166 @@
+import json
+from typing import Iterable, List, Union
+
+import numpy as np
+
+from colorteller.utils.color import hex_to_rgb
+
+
+class Palette:
+    """A compact color palette backed by an uint8 array of shape (N, 3).
+
+    A Palette object only holds a read-only array of the rgb values, without any per-color Python objects. Slicing a palette returns a view of the same memory, so many palettes can be kept as slices of one large array, see `split_palettes`.
+
+    ```python
+    from colorteller.palette import Palette
+
+    p = Palette.from_hex(["#8de4d3", "#344b46", "#74ee65", "#238910"])
+    p[1:3].hex
+    # ['#344b46', '#74ee65']
+    c = teller.Colors(color_palette=p)
+    ```
+
+    :param rgb: rgb values of shape (N, 3) in 0-255. An uint8 array is used without copying.
+    """
+
+    __slots__ = ("_rgb",)
+
+    def __init__(self, rgb) -> None:
+        rgb_array = np.asarray(rgb)
+        if rgb_array.dtype != np.uint8:
+            if rgb_array.size and (rgb_array.min() < 0 or rgb_array.max() > 255):
+                raise ValueError(f"rgb values have to be in 0-255; {rgb}")
+            rgb_array = rgb_array.astype(np.uint8)
+        rgb_array = rgb_array.reshape(-1, 3).view()
+        rgb_array.setflags(write=False)
+
+        self._rgb = rgb_array
+
+    @classmethod
+    def from_hex(cls, hex_strings: Iterable[str]) -> "Palette":
+        """Create a palette from hex strings.
+
+        :param hex_strings: a list of hex strings, with or without the leading `#`
+        :return: a Palette object
+        :rtype: Palette
+        """
+        return cls(hex_to_rgb(list(hex_strings)))
+
+    @classmethod
+    def from_dict(cls, colorteller_raw: Union[dict, str]) -> "Palette":
+        """Create a palette from the dict (or json string of dict) of the colorteller web service.
+
+        :param colorteller_raw: a dict or json string with the key `colors`, see `teller.ColorTeller`
+        :return: a Palette object
+        :rtype: Palette
+        """
+        if isinstance(colorteller_raw, str):
+            colorteller_raw = json.loads(colorteller_raw)
+
+        return cls.from_hex(c.get("hex") for c in colorteller_raw.get("colors", []))
+
+    @classmethod
+    def from_colorteller(cls, colorteller) -> "Palette":
+        """Create a palette from a ColorTeller object, using its cached rgb array.
+
+        :param colorteller: a `teller.ColorTeller` object
+        :return: a Palette object
+        :rtype: Palette
+        """
+        return cls(colorteller.rgb_array)
+
+    @property
+    def rgb(self) -> np.ndarray:
+        """the read-only uint8 array of shape (N, 3) of the rgb values"""
+        return self._rgb
+
+    @property
+    def hex(self) -> List[str]:
+        """a list of hex strings"""
+        hex_joined = self._rgb.tobytes().hex()
+
+        return ["#" + hex_joined[i : i + 6] for i in range(0, len(hex_joined), 6)]
+
+    def to_dict(self) -> dict:
+        """Convert to a dict in the format of the colorteller web service.
+
+        :return: a dict with the keys `colors` and `hex`
+        :rtype: dict
+        """
+        hex_strings = self.hex
+
+        return {
+            "colors": [{"hex": h} for h in hex_strings],
+            "hex": [h[1:] for h in hex_strings],
+        }
+
+    def to_colorteller(self):
+        """Convert to a ColorTeller object. The rgb array is shared with the ColorTeller object instead of parsed from the hex strings again.
+
+        :return: a ColorTeller object
+        :rtype: teller.ColorTeller
+        """
+        from colorteller.teller import ColorTeller
+
+        ct = ColorTeller(hex_strings=self.hex)
+        ct._cache["rgb_array"] = self._rgb
+
+        return ct
+
+    def __len__(self):
+        return len(self._rgb)
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            return "#" + self._rgb[key].tobytes().hex()
+
+        return Palette(self._rgb[key])
+
+    def __iter__(self):
+        return iter(self.hex)
+
+    def __eq__(self, other):
+        if not isinstance(other, Palette):
+            return NotImplemented
+
+        return np.array_equal(self._rgb, other._rgb)
+
+    def __hash__(self):
+        return hash(self._rgb.tobytes())
+
+    def __repr__(self):
+        return f"Palette({self.hex})"
+
+    def __getstate__(self):
+        return self._rgb.tobytes()
+
+    def __setstate__(self, state):
+        rgb = np.frombuffer(state, dtype=np.uint8).reshape(-1, 3)
+        rgb.setflags(write=False)
+        self._rgb = rgb
+
+
+def split_palettes(rgb, lengths: Iterable[int]) -> List[Palette]:
+    """Split one array of colors into palettes without copying.
+
+    This is the most compact way to keep many palettes in memory: all the colors are stored in one array and each palette is a view of it.
+
+    ```python
+    rgb = np.concatenate([p.rgb for p in palettes])
+    palettes = split_palettes(rgb, [len(p) for p in palettes])
+    ```
+
+    :param rgb: an uint8 array of shape (M, 3) with the colors of all the palettes
+    :param lengths: number of colors in each palette, which add up to M
+    :return: a list of Palette objects
+    :rtype: list
+    """
+    rgb = np.asarray(rgb, dtype=np.uint8).reshape(-1, 3)
+    lengths = np.asarray(list(lengths), dtype=np.int64)
+    if lengths.sum() != len(rgb):
+        raise ValueError(
+            f"lengths add up to {lengths.sum()} but there are {len(rgb)} colors"
+        )
+    bounds = np.concatenate([[0], np.cumsum(lengths)]).tolist()
+
+    return [Palette(rgb[start:end]) for start, end in zip(bounds[:-1], bounds[1:])]
@@ -0,0 +1,371 @@
+import json
+from pathlib import Path
+from typing import Iterable, List, Optional, Union
+
+import numpy as np
+
+from colorteller.palette import Palette, split_palettes
+from colorteller.utils.color import hex_to_rgb
+from colorteller.utils.delta_e import DEFAULT_METRIC, delta_e_pairwise
+from colorteller.utils.lut import rgb_to_lab_lut
+from colorteller.utils.neighbors import compress_chroma
+
+#: methods of `palette_distance`
+PALETTE_DISTANCES = ("hausdorff", "modified_hausdorff")
+
+# offsets of the 3 x 3 x 3 block of cells around a cell
+_OFFSETS = np.array(
+    [(i, j, k) for i in (-1, 0, 1) for j in (-1, 0, 1) for k in (-1, 0, 1)],
+    dtype=np.int64,
+)
+
+
+def _rgb(palette) -> np.ndarray:
+    if isinstance(palette, Palette):
+        return palette.rgb
+
+    return hex_to_rgb(list(palette))
+
+
+def _ranges(starts, sizes) -> np.ndarray:
+    """The concatenated ranges `start, ..., start + size - 1`."""
+    return np.repeat(starts - np.cumsum(sizes) + sizes, sizes) + np.arange(sizes.sum())
+
+
+def palette_distances(
+    lab,
+    colors,
+    offsets,
+    method: str = "modified_hausdorff",
+    metric: str = DEFAULT_METRIC,
+    chunk_size: int = 2**20,
+) -> np.ndarray:
+    """Distances from one palette to many palettes, calculated in batch.
+
+    The palettes are compared using the distances between their colors:
+
+    - `hausdorff`: the max distance from a color of one palette to the closest color of the other palette;
+    - `modified_hausdorff`: the same but with the mean instead of the max over the colors of each palette ([Dubuisson and Jain, 1994](https://doi.org/10.1109/ICPR.1994.576361)), which is less sensitive to one odd color.
+
+    Both are symmetric and are 0 for palettes with the same colors in any order.
+
+    The many palettes are given as the Lab colors of all the palettes concatenated, and the `offsets` of each palette in them, e.g., `colors[offsets[i]:offsets[i + 1]]` is palette `i`. The color differences are calculated in chunks of about `chunk_size` values.
+
+    :param lab: the Lab colors of the palette, of shape (N, 3)
+    :param colors: the Lab colors of the other palettes concatenated, of shape (M, 3)
+    :param offsets: the start of each of the other palettes in `colors` and the total number of colors, of length P + 1
+    :param method: `hausdorff` or `modified_hausdorff`, defaults to `modified_hausdorff`
+    :param metric: name of the color difference metric, see `utils.delta_e.METRICS`, defaults to `cie2000`
+    :param chunk_size: approximate number of color differences calculated at once, defaults to 2**20
+    :return: the distances to the other palettes, of shape (P,)
+    :rtype: numpy.ndarray
+    """
+    if method not in PALETTE_DISTANCES:
+        raise ValueError(f"method has to be one of {PALETTE_DISTANCES}; {method}")
+    lab = np.asarray(lab, dtype=float).reshape(-1, 3)
+    colors = np.asarray(colors, dtype=float).reshape(-1, 3)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    lengths = np.diff(offsets)
+    if not len(lab) or np.any(lengths <= 0):
+        raise ValueError("palettes can not be empty")
+
+    distances = np.zeros(len(lengths))
+    # palettes of each chunk, so that the chunk has about chunk_size color differences
+    chunk = (offsets[:-1] - offsets[0]) * len(lab) // max(chunk_size, 1)
+    bounds = np.flatnonzero(np.diff(chunk)) + 1
+    for palettes in np.split(np.arange(len(lengths)), bounds):
+        if not len(palettes):
+            continue
+        start, end = offsets[palettes[0]], offsets[palettes[-1] + 1]
+        starts = offsets[palettes] - start
+        d = delta_e_pairwise(lab, colors[start:end], metric)
+        # from each color of the palette to the closest color of each other palette
+        forward = np.minimum.reduceat(d, starts, axis=1)
+        # from each color of the other palettes to the closest color of the palette
+        backward = d.min(axis=0)
+        if method == "hausdorff":
+            distances[palettes] = np.maximum(
+                forward.max(axis=0), np.maximum.reduceat(backward, starts)
+            )
+        else:
+            distances[palettes] = np.maximum(
+                forward.mean(axis=0),
+                np.add.reduceat(backward, starts) / lengths[palettes],
+            )
+
+    return distances
+
+
+def palette_distance(
+    lab_1, lab_2, method: str = "modified_hausdorff", metric: str = DEFAULT_METRIC
+) -> float:
+    """Distance between two palettes, see `palette_distances`.
+
+    ```python
+    from colorteller.utils.color import hex_to_lab
+
+    palette_distance(hex_to_lab(["#8de4d3", "#344b46"]), hex_to_lab(["#344b46", "#8de4d4"]))
+    # 0.17...
+    ```
+
+    :param lab_1: the Lab colors of a palette, of shape (N, 3)
+    :param lab_2: the Lab colors of the other palette, of shape (M, 3)
+    :param method: `hausdorff` or `modified_hausdorff`, defaults to `modified_hausdorff`
+    :param metric: name of the color difference metric, see `utils.delta_e.METRICS`, defaults to `cie2000`
+    :return: the distance
+    :rtype: float
+    """
+    lab_2 = np.asarray(lab_2, dtype=float).reshape(-1, 3)
+
+    distances = palette_distances(
+        lab_1, lab_2, [0, len(lab_2)], method=method, metric=metric
+    )
+
+    return float(distances[0])
+
+
+class PaletteIndex:
+    """An index of a corpus of palettes to find the palettes similar to a palette.
+
+    ```python
+    from colorteller.client import fetch_palettes
+    from colorteller.search import PaletteIndex
+
+    responses = fetch_palettes(permalinks)
+    index = PaletteIndex.from_dicts(r.data for r in responses if r.ok)
+    index.save("palettes.npz")
+
+    index = PaletteIndex.load("palettes.npz")
+    index.query(["#8de4d3", "#344b46", "#74ee65"], k=5)
+    # [{'index': 42, 'name': '//colorteller.kausalflow.com/colors/bobcat-yellow/', 'distance': 1.2, 'colors': [...]}, ...]
+    ```
+
+    A query has two steps:
+
+    1. Candidates: the colors of the corpus are put into the cells of a coarse grid. For each color of the query, only the colors in the same or neighbouring cells are compared, which gives the `approximate_distances` to the palettes. The closest `candidates` palettes are kept.
+    2. Rerank: the exact `palette_distances` to the candidates are calculated, and the closest `k` are returned.
+
+    A query only compares the colors around the colors of the query, so it is fast for large corpora. It is approximate: a close palette may be ranked out of the candidates, e.g., if its colors are close to the query but in cells further away.
+
+    !!! note "Grid"
+        The grid is built in the space of `utils.neighbors.compress_chroma`, where the Euclidean distance is closer to CIEDE2000 than in Lab. Smaller cells are faster, but fewer colors are compared and the approximate distances are less accurate. More `candidates` find more of the closest palettes but the rerank is slower.
+
+    !!! note "Recall"
+        With the defaults, queries of 6 random colors on corpora of 50k and 200k random palettes of 2 to 7 colors find 9.7 of the exact 10 closest palettes on average, and at least 8. With `cell_size=5`, they find only 6 to 7 of them. The `hausdorff` distance is set by the farthest color, which is often outside of the neighbouring cells, so most of the approximate distances are capped and the recall is much lower for palettes far from the corpus; use a larger `cell_size` or more `candidates` for it.
+
+    :param palettes: the palettes, each is a list of hex strings or a `palette.Palette` object
+    :param names: names of the palettes, e.g., the permalinks, defaults to the indices of the palettes
+    :param method: `hausdorff` or `modified_hausdorff`, see `palette_distances`, defaults to `modified_hausdorff`
+    :param metric: name of the color difference metric, see `utils.delta_e.METRICS`, defaults to `cie2000`
+    :param cell_size: size of the cells of the grid, defaults to 8
+    """
+
+    def __init__(
+        self,
+        palettes: Iterable[Union[list, Palette]],
+        names: Optional[list] = None,
+        method: str = "modified_hausdorff",
+        metric: str = DEFAULT_METRIC,
+        cell_size: float = 8.0,
+    ) -> None:
+        if method not in PALETTE_DISTANCES:
+            raise ValueError(f"method has to be one of {PALETTE_DISTANCES}; {method}")
+        rgb = [_rgb(p) for p in palettes]
+        if any(len(p) == 0 for p in rgb):
+            raise ValueError("palettes can not be empty")
+        if names is None:
+            names = list(range(len(rgb)))
+        names = list(names)
+        if len(names) != len(rgb):
+            raise ValueError(f"{len(names)} names for {len(rgb)} palettes")
+
+        self.names = names
+        self.method = method
+        self.metric = metric
+        self.cell_size = cell_size
+        self.rgb = np.concatenate(rgb) if rgb else np.zeros((0, 3), dtype=np.uint8)
+        self.offsets = np.concatenate([[0], np.cumsum([len(p) for p in rgb])]).astype(
+            np.int64
+        )
+        self.lab = rgb_to_lab_lut(self.rgb)
+
+        self._build()
+
+    def _build(self) -> None:
+        """Build the inverted index from the cells of the grid to the colors in them."""
+        points = compress_chroma(self.lab)
+        cells = np.floor(points / self.cell_size).astype(np.int64)
+        palette_of_color = np.repeat(np.arange(len(self)), np.diff(self.offsets))
+
+        self._lower = cells.min(axis=0, initial=0) - 1
+        self._dims = cells.max(axis=0, initial=0) - self._lower + 2
+        keys = np.ravel_multi_index((cells - self._lower).T, self._dims)
+        # the colors sorted by cell, so that the colors of a cell are contiguous
+        order = np.argsort(keys, kind="stable")
+        self._keys, starts = np.unique(keys[order], return_index=True)
+        self._starts = np.append(starts, len(order))
+        self._points = points[order].astype(np.float32)
+        self._palette_of_color = palette_of_color[order]
+        self._order = order
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def palette(self, index: int) -> Palette:
+        """The palette at an index, a view of the colors of the index.
+
+        :param index: index of the palette
+        :return: the palette
+        :rtype: Palette
+        """
+        return Palette(self.rgb[self.offsets[index] : self.offsets[index + 1]])
+
+    @property
+    def palettes(self) -> List[Palette]:
+        """all the palettes, see `palette.split_palettes`"""
+        return split_palettes(self.rgb, np.diff(self.offsets))
+
+    def approximate_distances(self, palette: Union[list, Palette]) -> np.ndarray:
+        """Approximate distances from a palette to all the palettes of the index, using the grid.
+
+        The approximate distance is the `method` of `palette_distances`, using the Euclidean distance in the space of the grid. Only the colors in the same or neighbouring cells are compared, in both directions, and a color without any color of the other palette around it counts as `2 * cell_size`.
+
+        :param palette: a list of hex strings or a `palette.Palette` object
+        :return: the approximate distances, of shape (P,)
+        :rtype: numpy.ndarray
+        """
+        points = compress_chroma(rgb_to_lab_lut(_rgb(palette))).astype(np.float32)
+        cells = np.floor(points / self.cell_size).astype(np.int64) - self._lower
+        neighbours = (cells[:, None, :] + _OFFSETS).reshape(-1, 3)
+        query_color = np.repeat(np.arange(len(points)), len(_OFFSETS))
+        inside = np.all((neighbours >= 0) & (neighbours < self._dims), axis=-1)
+        keys = np.ravel_multi_index(neighbours[inside].T, self._dims)
+        query_color = query_color[inside]
+
+        position = np.minimum(np.searchsorted(self._keys, keys), len(self._keys) - 1)
+        found = self._keys[position] == keys
+        position, query_color = position[found], query_color[found]
+
+        # the colors in the cells around each color of the palette
+        starts = self._starts[position]
+        sizes = self._starts[position + 1] - starts
+        colors = _ranges(starts, sizes)
+        query_color = np.repeat(query_color, sizes)
+        d = np.linalg.norm(self._points[colors] - points[query_color], axis=-1)
+        cap = 2.0 * self.cell_size
+
+        # the closest color of each palette to each color of the query
+        closest = np.full((len(points), len(self)), cap, dtype=np.float32)
+        np.minimum.at(closest, (query_color, self._palette_of_color[colors]), d)
+        # the closest color of the query to each color of the palettes, in the order of the palettes
+        backward = np.full(len(self._points), cap, dtype=np.float32)
+        np.minimum.at(backward, self._order[colors], d)
+        if self.method == "hausdorff":
+            return np.maximum(
+                closest.max(axis=0), np.maximum.reduceat(backward, self.offsets[:-1])
+            )
+
+        return np.maximum(
+            closest.mean(axis=0),
+            np.add.reduceat(backward, self.offsets[:-1]) / np.diff(self.offsets),
+        )
+
+    def query(
+        self, palette: Union[list, Palette], k: int = 10, candidates: int = 1000
+    ) -> List[dict]:
+        """Find the palettes closest to a palette.
+
+        :param palette: a list of hex strings or a `palette.Palette` object
+        :param k: number of palettes to return, defaults to 10
+        :param candidates: number of candidates to rerank using the exact distances, defaults to 1000
+        :return: the closest palettes, sorted by the distance. Each is a dict with the `index`, `name`, `distance` and `colors` (hex strings) of the palette.
+        :rtype: list
+        """
+        if not len(self):
+            return []
+        rgb = _rgb(palette)
+        candidates = max(candidates, k)
+        if len(self) > candidates:
+            approximate = self.approximate_distances(Palette(rgb))
+            top = np.argpartition(approximate, candidates - 1)[:candidates]
+            indices = np.sort(top)
+        else:
+            indices = np.arange(len(self))
+
+        starts = self.offsets[indices]
+        sizes = self.offsets[indices + 1] - starts
+        distances = palette_distances(
+            rgb_to_lab_lut(rgb),
+            self.lab[_ranges(starts, sizes)],
+            np.concatenate([[0], np.cumsum(sizes)]),
+            method=self.method,
+            metric=self.metric,
+        )
+
+        closest = np.argsort(distances, kind="stable")[:k]
+
+        return [
+            {
+                "index": int(indices[i]),
+                "name": self.names[indices[i]],
+                "distance": float(distances[i]),
+                "colors": self.palette(indices[i]).hex,
+            }
+            for i in closest
+        ]
+
+    @classmethod
+    def from_dicts(cls, colorteller_raws: Iterable[dict], **kwargs) -> "PaletteIndex":
+        """Create an index of the palettes of the colorteller web service, named by their permalinks.
+
+        :param colorteller_raws: dicts (or json strings of dicts) of the palettes, see `palette.Palette.from_dict`
+        :param kwargs: other arguments of `PaletteIndex`
+        :return: the index
+        :rtype: PaletteIndex
+        """
+        palettes, names = [], []
+        for raw in colorteller_raws:
+            if isinstance(raw, str):
+                raw = json.loads(raw)
+            palettes.append(Palette.from_dict(raw))
+            names.append(raw.get("permalink"))
+
+        return cls(palettes, names=names, **kwargs)
+
+    def save(self, path: Union[str, Path]) -> Path:
+        """Save the palettes of the index to a numpy `.npz` file. The grid is rebuilt when the index is loaded.
+
+        :param path: path of the file
+        :return: the path of the file
+        :rtype: Path
+        """
+        path = Path(path)
+        header = {
+            "names": self.names,
+            "method": self.method,
+            "metric": self.metric,
+            "cell_size": self.cell_size,
+        }
+        with open(path, "wb") as fp:
+            np.savez(
+                fp,
+                rgb=self.rgb,
+                lengths=np.diff(self.offsets),
+                header=np.array(json.dumps(header)),
+            )
+
+        return path
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "PaletteIndex":
+        """Load an index saved by `save`.
+
+        :param path: path of the file
+        :return: the index
+        :rtype: PaletteIndex
+        """
+        with np.load(path, allow_pickle=False) as npz:
+            header = json.loads(str(npz["header"]))
+            palettes = split_palettes(npz["rgb"], npz["lengths"])
+
+        return cls(palettes, **header)
@@ -0,0 +1,331 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Iterator, Optional, Union
+
+from loguru import logger
+
+from colorteller.utils.hex import Hex
+
+
+def canonical_palette(hex_strings: list) -> list:
+    """The canonical form of a palette: lower case hex strings with `#`, sorted.
+
+    Palettes with the same colors in a different order or with a different case have the same canonical form.
+
+    :param hex_strings: a list of hex strings
+    :return: the sorted list of lower case hex strings
+    :rtype: list
+    """
+    return sorted(f"#{Hex.standard_hex_string(h).lower()}" for h in hex_strings)
+
+
+def palette_key(hex_strings: list) -> str:
+    """Hash of the canonical form of a palette, see `canonical_palette`.
+
+    :param hex_strings: a list of hex strings
+    :return: the sha1 hex digest
+    :rtype: str
+    """
+    return hashlib.sha1(",".join(canonical_palette(hex_strings)).encode()).hexdigest()
+
+
+def result_key(hex_strings: list, method: str, params: Optional[dict] = None) -> str:
+    """Key of a benchmark result: palette hash, method name and parameters.
+
+    :param hex_strings: a list of hex strings
+    :param method: name of the benchmark method, e.g., `perceptual_distance`
+    :param params: parameters of the benchmark, defaults to None
+    :return: the sha1 hex digest
+    :rtype: str
+    """
+    if params is None:
+        params = {}
+    key_raw = json.dumps(
+        [palette_key(hex_strings), method, params], sort_keys=True, default=str
+    )
+
+    return hashlib.sha1(key_raw.encode()).hexdigest()
+
+
+def _permutation(from_hex: list, to_hex: list) -> list:
+    """Indices `p` so that `from_hex[p[i]]` is the same color as `to_hex[i]`."""
+    from_canonical = [Hex.standard_hex_string(h).lower() for h in from_hex]
+    to_canonical = [Hex.standard_hex_string(h).lower() for h in to_hex]
+
+    from_order = sorted(range(len(from_canonical)), key=from_canonical.__getitem__)
+    to_order = sorted(range(len(to_canonical)), key=to_canonical.__getitem__)
+
+    perm = [0] * len(to_canonical)
+    for f, t in zip(from_order, to_order):
+        perm[t] = f
+
+    return perm
+
+
+def _permute_pairwise(matrix: list, perm: list) -> list:
+    """Reorder the rows and columns of a matrix, or of each matrix in a stack of matrices of shape (K, N, N)."""
+    if matrix and matrix[0] and isinstance(matrix[0][0], list):
+        return [_permute_pairwise(m, perm) for m in matrix]
+
+    return [[matrix[i][j] for j in perm] for i in perm]
+
+
+def _permute_pairs(data: dict, pair_fields: list, perm: list) -> None:
+    """Update sparse pairs in place to a new order of the colors.
+
+    The first two of `pair_fields` are the indices of the two colors of each pair, the rest are values of the pairs. The indices are mapped through `perm`, swapped so that the first index is smaller than the second, and the pairs are sorted by the two indices, i.e., the same form as `utils.neighbors.close_pairs`.
+    """
+    inverse = [0] * len(perm)
+    for i, p in enumerate(perm):
+        inverse[p] = i
+
+    pairs = []
+    for i, j, *values in zip(*(data[field] for field in pair_fields)):
+        i, j = inverse[i], inverse[j]
+        pairs.append((min(i, j), max(i, j), *values))
+    pairs.sort(key=lambda pair: pair[:2])
+
+    for k, field in enumerate(pair_fields):
+        data[field] = [pair[k] for pair in pairs]
+
+
+class ResultsStore:
+    """An on-disk store of benchmark results.
+
+    The results are keyed by the canonical palette (see `canonical_palette`), the name of the method and its parameters. A stored result is reused for the same palette in a different order or with a different case; the per color and pairwise fields of the result are reordered to match the requested palette.
+
+    The store is a folder with two append-only [JSON Lines](https://jsonlines.org) files:
+
+    - `results.jsonl`: one result per line,
+    - `index.jsonl`: the key, byte offset and length of each result in `results.jsonl`.
+
+    The index is loaded into a dict when the store is opened, so lookups take one dict access and one read. If the index is missing or out of sync, it is rebuilt from `results.jsonl`.
+
+    ```python
+    from colorteller import teller
+    from colorteller.store import ResultsStore
+    from colorteller.utils import benchmark
+
+    store = ResultsStore("results")
+    c = teller.Colors(color_palette=["#8de4d3", "#344b46", "#74ee65"])
+    m = c.metrics(methods=[benchmark.PerceptualDistanceBenchmark], store=store)
+    ```
+
+    !!! warning
+        The store supports many readers but only one writer at a time.
+
+    :param path: the folder of the store, created if it doesn't exist
+    """
+
+    results_filename = "results.jsonl"
+    index_filename = "index.jsonl"
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.results_path = self.path / self.results_filename
+        self.index_path = self.path / self.index_filename
+        self.results_path.touch()
+
+        self.index = self._load_index()
+
+    def _load_index(self) -> dict:
+        index = {}
+        end = 0
+        if self.index_path.exists():
+            with open(self.index_path, "r") as fp:
+                for line in fp:
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    index[record["key"]] = (record["offset"], record["length"])
+                    end = max(end, record["offset"] + record["length"])
+
+        if end != self.results_path.stat().st_size:
+            logger.info(f"Rebuilding the index of the results store {self.path}")
+            index = self._rebuild_index()
+
+        return index
+
+    def _rebuild_index(self) -> dict:
+        index = {}
+        offset = 0
+        with open(self.results_path, "rb") as fp_results, open(
+            self.index_path, "w"
+        ) as fp_index:
+            for line in fp_results:
+                length = len(line)
+                if line.strip():
+                    key = json.loads(line)["key"]
+                    index[key] = (offset, length)
+                    fp_index.write(
+                        json.dumps({"key": key, "offset": offset, "length": length})
+                        + "\n"
+                    )
+                offset += length
+
+        return index
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.index
+
+    def _read(self, key: str) -> dict:
+        offset, length = self.index[key]
+        with open(self.results_path, "rb") as fp:
+            fp.seek(offset)
+            return json.loads(fp.read(length))
+
+    def get(
+        self, hex_strings: list, method: str, params: Optional[dict] = None
+    ) -> Optional[dict]:
+        """Get the stored result of a benchmark.
+
+        :param hex_strings: a list of hex strings
+        :param method: name of the benchmark method, e.g., `perceptual_distance`
+        :param params: parameters of the benchmark, defaults to None
+        :return: the metric in the format of `teller.Colors.metrics`, i.e., a dict with `method` and `data`, reordered to match `hex_strings`. None if it is not stored.
+        :rtype: Optional[dict]
+        """
+        key = result_key(hex_strings, method, params)
+        if key not in self.index:
+            return None
+
+        record = self._read(key)
+        perm = _permutation(record["colors"], hex_strings)
+        data = record["data"]
+        for field in record["per_color_fields"]:
+            data[field] = [data[field][i] for i in perm]
+        for field in record["pairwise_fields"]:
+            data[field] = _permute_pairwise(data[field], perm)
+        if record.get("pair_fields"):
+            _permute_pairs(data, record["pair_fields"], perm)
+        if "colors" in record["per_color_fields"]:
+            data["colors"] = list(hex_strings)
+
+        return {"method": record["method"], "data": data}
+
+    def put(
+        self,
+        hex_strings: list,
+        metric: dict,
+        params: Optional[dict] = None,
+        per_color_fields: tuple = (),
+        pairwise_fields: tuple = (),
+        pair_fields: tuple = (),
+    ) -> str:
+        """Append the result of a benchmark to the store.
+
+        :param hex_strings: a list of hex strings
+        :param metric: the metric in the format of `teller.Colors.metrics`, i.e., a dict with `method` and `data`
+        :param params: parameters of the benchmark, defaults to None
+        :param per_color_fields: fields in the data with one value for each color, see `utils.benchmark.ColorsBenchmark`
+        :param pairwise_fields: fields in the data with one value for each pair of colors, see `utils.benchmark.ColorsBenchmark`
+        :param pair_fields: fields in the data with one value for each sparse pair of colors, the first two being the indices of the two colors, see `utils.benchmark.ColorsBenchmark`. When the result is read, the indices are updated to the order of the colors and the pairs are sorted again, see `_permute_pairs`.
+        :return: the key of the result
+        :rtype: str
+        """
+        if params is None:
+            params = {}
+        key = result_key(hex_strings, metric["method"], params)
+        record = {
+            "key": key,
+            "palette": palette_key(hex_strings),
+            "colors": list(hex_strings),
+            "method": metric["method"],
+            "params": params,
+            "per_color_fields": list(per_color_fields),
+            "pairwise_fields": list(pairwise_fields),
+            "pair_fields": list(pair_fields),
+            "data": metric["data"],
+        }
+        line = (json.dumps(record, default=str) + "\n").encode()
+
+        with open(self.results_path, "ab") as fp:
+            offset = fp.seek(0, os.SEEK_END)
+            fp.write(line)
+        with open(self.index_path, "a") as fp:
+            fp.write(
+                json.dumps({"key": key, "offset": offset, "length": len(line)}) + "\n"
+            )
+        self.index[key] = (offset, len(line))
+
+        return key
+
+    def get_benchmark(self, benchmark) -> Optional[dict]:
+        """Get the stored result of a benchmark object, e.g., `utils.benchmark.PerceptualDistanceBenchmark(colors)`.
+
+        :param benchmark: a `utils.benchmark.ColorsBenchmark` object
+        :return: the metric or None if it is not stored.
+        """
+        return self.get(benchmark.hex, benchmark.method, benchmark.params)
+
+    def put_benchmark(self, benchmark, metric: dict) -> str:
+        """Store the result of a benchmark object.
+
+        :param benchmark: a `utils.benchmark.ColorsBenchmark` object
+        :param metric: the result of `benchmark.metric()`
+        :return: the key of the result
+        """
+        return self.put(
+            benchmark.hex,
+            metric,
+            params=benchmark.params,
+            per_color_fields=benchmark.per_color_fields,
+            pairwise_fields=benchmark.pairwise_fields,
+            pair_fields=benchmark.pair_fields,
+        )
+
+    def query(
+        self,
+        method: Optional[str] = None,
+        params: Optional[dict] = None,
+        palette: Optional[list] = None,
+        color: Optional[str] = None,
+    ) -> Iterator[dict]:
+        """Iterate through the stored results that match all the conditions given.
+
+        ```python
+        for record in store.query(method="lightness", color="#8de4d3"):
+            print(record["colors"], record["data"]["lightness"])
+        ```
+
+        :param method: name of the benchmark method
+        :param params: parameters of the benchmark
+        :param palette: a list of hex strings, matches the same palette in any order or case
+        :param color: a hex string, matches the palettes that contain the color
+        :return: an iterator of the stored records with the keys `key`, `palette`, `colors`, `method`, `params` and `data`.
+        """
+        if palette is not None:
+            palette = palette_key(palette)
+        if color is not None:
+            color = canonical_palette([color])[0]
+        if params is not None:
+            params = json.loads(json.dumps(params, default=str))
+
+        offset = 0
+        with open(self.results_path, "rb") as fp:
+            for line in fp:
+                line_offset, offset = offset, offset + len(line)
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                # results stored again later replace the earlier ones
+                if self.index.get(record["key"], (None,))[0] != line_offset:
+                    continue
+                if method is not None and record["method"] != method:
+                    continue
+                if params is not None and record["params"] != params:
+                    continue
+                if palette is not None and record["palette"] != palette:
+                    continue
+                if color is not None and color not in canonical_palette(
+                    record["colors"]
+                ):
+                    continue
+
+                yield record
@@ -1,11 +1,14 @@
 import json
+from collections import Counter
 from typing import Optional, Union
 
-from colormath.color_conversions import convert_color
-from colormath.color_objects import LabColor, sRGBColor
+import numpy as np
 from loguru import logger
 
-from .utils.hex import Hex
+from .palette import Palette
+from .utils.color import hex_to_rgb
+from .utils.lut import rgb_to_lab_lut
+from .utils.profile import NO_STAGE, Profiler
 
 
 class ColorTeller:
@@ -44,6 +47,11 @@ class ColorTeller:
     !!! note
         While we can use this to get some properties of the palette, this is mostly for downstream tasks.
 
+    !!! note "Cache"
+        Derived representations of the palette, e.g., `rgb_array`, are computed once and cached. The cache is cleared whenever `hex_strings` is set, e.g., using `from_hex`. The number of actual conversions performed is counted in `conversions`.
+
+        `hex_strings` keeps a copy of the input and returns a copy, and the cached representations are returned as copies (lists) or read-only arrays, so that changing them doesn't make the cache stale.
+
     :param colorteller_raw: A dict (or json string of dict) of the raw response from colorteller web service, defaults to [DefaultParamVal]
     :type colorteller_raw: Union[dict, str]
     :param hex_strings: A list of hex strings for the color palette.
@@ -56,11 +64,15 @@ class ColorTeller:
         hex_strings: Optional[list] = None,
     ) -> None:
 
+        self._cache = {}
+        self.conversions = Counter()
+
         if (hex_strings is not None) and (colorteller_raw is not None):
             logger.warning(f"hex_strings is provided, will ignore colorteller_raw.")
 
         if hex_strings is not None:
             self.hex_strings = hex_strings
+            self.names = [None] * len(hex_strings)
         elif colorteller_raw is not None:
             if isinstance(colorteller_raw, str):
                 colorteller_raw = self.str_to_json(colorteller_raw)
@@ -68,6 +80,7 @@ class ColorTeller:
                 raise TypeError(f"colorteller_raw has to be a dict; {colorteller_raw}")
 
             self.hex_strings = self.get_hex_strings(colorteller_raw)
+            self.names = self.get_names(colorteller_raw)
         else:
             raise Exception("No hex_strings or colorteller_raw provided.")
 
@@ -79,6 +92,37 @@ class ColorTeller:
         :param hex_strings: A list of hex strings for the color palette.
         """
         self.hex_strings = hex_strings
+        self.names = [None] * len(hex_strings)
+
+    @property
+    def hex_strings(self):
+        """a list of hex strings of the palette"""
+        return list(self._hex_strings)
+
+    @hex_strings.setter
+    def hex_strings(self, hex_strings):
+        self._hex_strings = list(hex_strings)
+        self._cache = {}
+
+    def _cached(self, name: str, factory):
+        """Get the cached representation `name` of the palette, calculate it using `factory` if it is not cached.
+
+        :param name: name of the representation, e.g., `rgb_array`
+        :param factory: a function without arguments that calculates the representation
+        :return: the representation, a copy if it is a list. Arrays are cached read-only.
+        """
+        if name not in self._cache:
+            self.conversions[name] += 1
+            value = factory()
+            if isinstance(value, np.ndarray):
+                value.setflags(write=False)
+            self._cache[name] = value
+
+        value = self._cache[name]
+        if isinstance(value, list):
+            return list(value)
+
+        return value
 
     @property
     def hex(self):
@@ -88,8 +132,14 @@ class ColorTeller:
     @property
     def rgb(self):
         """a list of rgb tuples of the palette"""
-        rgb_tuples = [Hex(h).rgb for h in self.hex]
-        return rgb_tuples
+        return self._cached(
+            "rgb", lambda: [tuple(c) for c in self.rgb_array.tolist()]
+        )
+
+    @property
+    def rgb_array(self):
+        """an uint8 array of shape (N, 3) of the rgb values of the palette"""
+        return self._cached("rgb_array", lambda: hex_to_rgb(self.hex))
 
     def get_hex_strings(self, colorteller_raw: Union[dict, str, None]) -> list:
         """Extract hex_strings from colorteller web service json or dict representation of the color palette.
@@ -106,6 +156,44 @@ class ColorTeller:
 
         return self.hex_strings
 
+    def get_names(self, colorteller_raw: Union[dict, None]) -> list:
+        """Extract the names of the colors from colorteller web service dict representation of the color palette.
+
+        :param colorteller_raw: A dict of the raw response from colorteller web service.
+        :return: A list of names, None or empty string if a color has no name.
+        :rtype: list
+        """
+        if colorteller_raw is None:
+            return []
+        colors_raw = colorteller_raw.get("colors", [])
+
+        return [color.get("name") for color in colors_raw]
+
+    def fill_names(self, index) -> list:
+        """Fill the missing names of the colors using the nearest named colors.
+
+        ```python
+        from colorteller.utils.names import NamedColorIndex
+
+        index = NamedColorIndex({"black": "#000000", "white": "#ffffff"})
+        ct = ColorTeller(hex_strings=["#111111", "#eeeeee"])
+        ct.fill_names(index)
+        # ['black', 'white']
+        ```
+
+        :param index: a `colorteller.utils.names.NamedColorIndex` object
+        :return: A list of names, the same as the `names` property.
+        :rtype: list
+        """
+        missing = [i for i, n in enumerate(self.names) if not n]
+        if missing:
+            hex_strings = self.hex
+            filled = index.name([hex_strings[i] for i in missing])
+            for i, n in zip(missing, filled):
+                self.names[i] = n
+
+        return self.names
+
     @staticmethod
     def str_to_json(data_raw):
         """convert the json string to dictionary
@@ -120,7 +208,7 @@ class ColorTeller:
 class Colors:
     """A color palette container with benchmark results.
 
-    To instantiate a Colors object, provide a list of hex strings (`color_palette`) or a ColorTeller object (`colorteller`).
+    To instantiate a Colors object, provide a list of hex strings or a `palette.Palette` object (`color_palette`), or a ColorTeller object (`colorteller`).
 
     !!! warning
         If `colorteller` is provided, the `color_palette` argument will be ignored.
@@ -143,15 +231,18 @@ class Colors:
     m = c.metrics(methods=[benchmark.PerceptualDistanceBenchmark])
     ```
 
-    :param color_palette: A list of hex strings.
-    :type color_palette: list
+    !!! note "Cache"
+        The representations of the colors, e.g., `lab_array` and `LabColor`, are cached on the ColorTeller object. They are calculated only once for all the methods in `metrics`. The number of conversions performed by the last `metrics` call is recorded in `metrics_conversions`.
+
+    :param color_palette: A list of hex strings or a `palette.Palette` object.
+    :type color_palette: Union[list, Palette]
     :param colorteller: an ColorTeller object
     :type colorteller: ColorTeller
     """
 
     def __init__(
         self,
-        color_palette: Optional[list] = None,
+        color_palette: Optional[Union[list, Palette]] = None,
         colorteller: Optional[ColorTeller] = None,
     ):
 
@@ -160,6 +251,9 @@ class Colors:
 
         if colorteller is not None:
             self.colorteller = colorteller
+        elif isinstance(color_palette, Palette):
+            self.color_palette = color_palette.hex
+            self.colorteller = color_palette.to_colorteller()
         elif color_palette is not None:
             if not isinstance(color_palette, list):
                 raise TypeError(
@@ -170,40 +264,117 @@ class Colors:
         else:
             raise Exception("No color_palette or colorteller provided.")
 
+        self.metrics_conversions = Counter()
+
+    @property
+    def conversions(self):
+        """counter of the conversions performed for each representation"""
+        return self.colorteller.conversions
+
     @property
     def hex(self):
         """a list of hex strings"""
         return self.colorteller.hex
 
+    @property
+    def palette(self):
+        """a `palette.Palette` object of the colors"""
+        return Palette(self.rgb_array)
+
     @property
     def rgb(self):
         """a list of rgb tuples"""
         return self.colorteller.rgb
 
+    @property
+    def rgb_array(self):
+        """an uint8 array of shape (N, 3) of the rgb values"""
+        return self.colorteller.rgb_array
+
+    @property
+    def lab_array(self):
+        """a float array of shape (N, 3) of the Lab values (D65, 2°)
+
+        This is the vectorized counterpart of `LabColor` and is used by the benchmarks in `colorteller.utils.benchmark`. The precomputed lookup table in `colorteller.utils.lut` is used if it is enabled using the environment variable `COLORTELLER_LUT`.
+        """
+
+        return self.colorteller._cached(
+            "lab_array", lambda: rgb_to_lab_lut(self.rgb_array)
+        )
+
     @property
     def sRGBColor(self):
         """a list of sRGBColor objects"""
-        return [sRGBColor(*rgb, is_upscaled=True) for rgb in self.rgb]
+        # colormath is slow to import and only needed for the colormath objects
+        from colormath.color_objects import sRGBColor
+
+        return self.colorteller._cached(
+            "sRGBColor",
+            lambda: [sRGBColor(*rgb, is_upscaled=True) for rgb in self.rgb],
+        )
 
     @property
     def LabColor(self):
         """a list of LabColor objects"""
-        return [convert_color(c, LabColor) for c in self.sRGBColor]
+        from colormath.color_conversions import convert_color
+        from colormath.color_objects import LabColor
 
-    def metrics(self, methods: Optional[list] = None):
+        return self.colorteller._cached(
+            "LabColor", lambda: [convert_color(c, LabColor) for c in self.sRGBColor]
+        )
+
+    def metrics(
+        self,
+        methods: Optional[list] = None,
+        store=None,
+        profiler: Optional[Profiler] = None,
+        timings: bool = False,
+    ):
         """Calculates a list of metrics using the methods provided.
 
+        !!! note "Profiling"
+            With a `utils.profile.Profiler`, the time, the number of calls and, optionally, the allocations of each method and of its stages (`conversion`, `pairwise`, `thresholding`, and `result`) are recorded in the profiler and passed to its callbacks. With `timings=True`, the stats of this call are also added to each metric as a `timings` block. Without either, the stages are not measured at all.
+
         :param methods: A list of methods to use to calculate the metrics.
         :type methods: list
+        :param store: a `store.ResultsStore` object. If provided, the results are looked up in the store before being calculated, and new results are added to the store.
+        :param profiler: a `utils.profile.Profiler` object to record the stats of the methods, defaults to None
+        :param timings: whether to add the stats of each method to the metrics as `timings`, defaults to False
         :return: A list of metrics.
         :rtype: list
         """
         if methods is None:
             methods = []
 
+        conversions_before = self.conversions.copy()
+
+        call_profiler = None
+        if timings:
+            # the stats of this call only, which are also passed on to profiler
+            call_profiler = Profiler(
+                callbacks=None if profiler is None else [profiler.record],
+                trace_memory=False if profiler is None else profiler.trace_memory,
+            )
+        elif profiler is not None:
+            call_profiler = profiler
+
         metrics = []
         for m in methods:
             m_b = m(self)
-            metrics.append(m_b.metric())
+            m_b.profiler = call_profiler
+            method = m_b.method or type(m_b).__name__
+            with NO_STAGE if call_profiler is None else call_profiler.method(method):
+                metric = None
+                if store is not None:
+                    metric = store.get_benchmark(m_b)
+                if metric is None:
+                    metric = m_b.metric()
+                    if store is not None:
+                        store.put_benchmark(m_b, metric)
+            if timings:
+                metric = {**metric, "timings": call_profiler.stats[method]}
+            metrics.append(metric)
+
+        self.metrics_conversions = self.conversions - conversions_before
 
         return metrics
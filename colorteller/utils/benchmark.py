@@ -1,19 +1,71 @@
-from colormath.color_conversions import convert_color
-from colormath.color_diff import delta_e_cie2000
-from colormath.color_objects import LabColor, sRGBColor
+import numpy as np
 from loguru import logger
-from typing import Union, Optional
-from colorteller.teller import Colors
+from typing import TYPE_CHECKING, Union, Optional
+from colorteller.palette import Palette
+from colorteller.utils.color import (
+    CVD_MATRICES,
+    linear_rgb_to_xyz,
+    rgb_to_lab,
+    simulate_cvd,
+    srgb_to_linear,
+    xyz_to_lab,
+)
+from colorteller.utils.delta_e import (
+    DEFAULT_METRIC,
+    delta_e_matrix,
+    delta_e_symmetric,
+    get_metric,
+)
+from colorteller.utils.neighbors import close_pairs
+from colorteller.utils.profile import NO_STAGE
+from colorteller.utils.sort import sort_on_distance_to_reference
+
+if TYPE_CHECKING:
+    from colorteller.teller import Colors
 
 
 class ColorsBenchmark:
     """A base class to create charts to benchmark the color palettes.
 
-    :param colors: teller.Colors objects which has properties such as hex.
+    Subclasses set the following class attributes to describe the results of `metric`:
+
+    - `method`: the name of the method in the results,
+    - `per_color_fields`: the fields in the data that are lists with one value for each color,
+    - `pairwise_fields`: the fields in the data that are matrices with one value for each pair of colors,
+    - `pair_fields`: the fields in the data that are lists with one value for each sparse pair of colors, starting with the indices of the two colors, e.g., `pair_rows`, `pair_cols` and `pair_distances`.
+
+    Subclasses mark the stages of `metric` using `stage`, e.g., `with self.stage("pairwise"):`, so that they can be profiled by `teller.Colors.metrics`.
+
+    :param colors: teller.Colors objects which has properties such as hex, or a `palette.Palette` object.
     """
 
-    def __init__(self, colors: Colors) -> None:
+    method = None
+    per_color_fields = ()
+    pairwise_fields = ()
+    pair_fields = ()
+
+    def __init__(self, colors: Union["Colors", Palette]) -> None:
+        if isinstance(colors, Palette):
+            from colorteller.teller import Colors
+
+            colors = Colors(color_palette=colors)
         self.colors = colors
+        self.profiler = None
+
+    def stage(self, name: str):
+        """A context manager that records a stage of `metric` in `self.profiler`. It does nothing if there is no profiler.
+
+        :param name: name of the stage, e.g., `conversion`, `pairwise`, or `thresholding`
+        """
+        if self.profiler is None:
+            return NO_STAGE
+
+        return self.profiler.stage(name)
+
+    @property
+    def params(self):
+        """parameters of the benchmark that change the results"""
+        return {}
 
     @property
     def hex(self):
@@ -31,6 +83,14 @@ class ColorsBenchmark:
     def LabColor(self):
         return self.colors.LabColor
 
+    @property
+    def rgb_array(self):
+        return self.colors.rgb_array
+
+    @property
+    def lab_array(self):
+        return self.colors.lab_array
+
     def metric(self):
         raise NotImplementedError(
             f"metric method is not implementetd in the ColorsBenchmark base class."
@@ -48,23 +108,88 @@ class PerceptualDistanceBenchmark(ColorsBenchmark):
     !!! note "Used in `teller.Colors.metrics`"
         While this class can be used independently, it is mostly designed for the `methods` argument of `teller.Colors.metrics`, e.g., `methods=[PerceptualDistanceBenchmark]`.
 
+    Use `functools.partial` to set the parameters, e.g., `methods=[partial(PerceptualDistanceBenchmark, threshold=3)]`.
+
+    !!! note "Metrics"
+        The distances are CIEDE2000 by default. A cheaper metric, e.g., `partial(PerceptualDistanceBenchmark, metric="oklab")`, is useful to screen many palettes, see `colorteller.utils.delta_e.METRICS`. The threshold depends on the metric.
+
+    !!! note "Sparse"
+        The distance matrix has N^2 values, which is too large for tens of thousands of colors. With `sparse=True`, only the pairs that are not noticable are calculated using `colorteller.utils.neighbors.close_pairs`, and the data has the fields `pair_rows`, `pair_cols` and `pair_distances` instead of `distances` and `noticable`.
+
     :param colors: teller.Colors object which has properties such as hex.
+    :param threshold: the deltaE threshold for two colors to be noticable, defaults to 5
+    :param metric: name of the color difference metric, see `colorteller.utils.delta_e.METRICS`, defaults to `cie2000`
+    :param sparse: whether to only find the pairs that are not noticable, defaults to False
     """
 
-    def __init__(self, colors: Colors) -> None:
+    method = "perceptual_distance"
+    per_color_fields = ("colors", "lab")
+    pairwise_fields = ("distances", "noticable")
+
+    def __init__(
+        self,
+        colors: "Colors",
+        threshold: Union[int, float] = 5,
+        metric: str = DEFAULT_METRIC,
+        sparse: bool = False,
+    ) -> None:
         super().__init__(colors)
+        self.threshold = threshold
+        self.metric_name = metric
+        self._distance = get_metric(metric)
+        self.sparse = sparse
+        if sparse:
+            self.pairwise_fields = ()
+            self.pair_fields = ("pair_rows", "pair_cols", "pair_distances")
+
+    @property
+    def params(self):
+        """parameters of the benchmark that change the results"""
+        return {
+            "threshold": self.threshold,
+            "metric": self.metric_name,
+            "sparse": self.sparse,
+        }
 
     def metric(self):
         """calculate the metrics of the current benchmark"""
+        with self.stage("conversion"):
+            lab = self.lab_array
+
+        if self.sparse:
+            data = self._perceptual_distance_sparse(lab)
+        else:
+            data = self._perceptual_distance(lab)
+
         return {
-            "method": "perceptual_distance",
-            "data": self._perceptual_distance(self.LabColor),
+            "method": self.method,
+            "data": data,
         }
 
-    def _perceptual_distance(self, colors: Colors, matrix=True):
-        """_perceptual_distance takes a Colors object and returns a dict with the perceptual distance between each color in it.
+    def _perceptual_distance_sparse(self, colors):
+        """Finds the pairs of colors that are not noticable, without the distance matrix.
+
+        :param colors: an array of Lab colors of shape (N, 3)
+        :return: a dictionary of the benchmark result, with the pairs in COO format, i.e., the indices of the two colors in `pair_rows` and `pair_cols` and their distances in `pair_distances`.
+        :rtype: dict
+        """
+        with self.stage("pairwise"):
+            pairs = close_pairs(colors, threshold=self.threshold, metric=self.metric_name)
+
+        with self.stage("result"):
+            return {
+                "colors": self.hex,
+                "metric": self.metric_name,
+                "lab": [tuple(c) for c in colors.tolist()],
+                "pair_rows": pairs["rows"].tolist(),
+                "pair_cols": pairs["cols"].tolist(),
+                "pair_distances": pairs["distances"].tolist(),
+            }
+
+    def _perceptual_distance(self, colors: np.ndarray, matrix=True):
+        """_perceptual_distance takes an array of Lab colors and returns a dict with the perceptual distance between each color in it.
 
-        :param colors: a Colors object
+        :param colors: an array of Lab colors of shape (N, 3)
         :param matrix: whether to create a distance matrix, defaults to True
         :type matrix: bool, optional
         :return: a dictionary of the benchmark result
@@ -78,35 +203,30 @@ class PerceptualDistanceBenchmark(ColorsBenchmark):
     def _perceptual_distance_matrix(self, colors):
         """Calculates the perceptual distance matrix
 
-        :param colors: a Colors object
+        The matrix is symmetric, so only the upper triangle is computed using the vectorized `colorteller.utils.delta_e.delta_e_matrix`.
+
+        :param colors: an array of Lab colors of shape (N, 3)
         :return: a dictionary of the benchmark result
         :rtype: dict
         """
-        pd = []
-        for ci in colors:
-            ci_pd = []
-            for cj in colors:
-                ci_pd.append(delta_e_cie2000(ci, cj))
-            pd.append(ci_pd)
-
-        pd_noticable = []
-        for pd_row in pd:
-            pd_noticable_row = []
-            for d in pd_row:
-                pd_noticable_row.append(self._delta_e_noticable_distance(d))
-            pd_noticable.append(pd_noticable_row)
-
-        return {
-            "colors": self.hex,
-            "lab": [c.get_value_tuple() for c in colors],
-            "distances": pd,
-            "noticable": pd_noticable,
-        }
+        with self.stage("pairwise"):
+            pd = delta_e_matrix(colors, self.metric_name)
+        with self.stage("thresholding"):
+            noticable = self._delta_e_noticable_distance(pd, threshold=self.threshold)
+
+        with self.stage("result"):
+            return {
+                "colors": self.hex,
+                "metric": self.metric_name,
+                "lab": [tuple(c) for c in colors.tolist()],
+                "distances": pd.tolist(),
+                "noticable": noticable.tolist(),
+            }
 
     def _perceptual_distance_list(self, colors, sort=False):
         """Calculates a list of perceptual distance
 
-        :param colors: a Colors object
+        :param colors: an array of Lab colors of shape (N, 3)
         :return: a dictionary of the benchmark result
         :rtype: dict
         """
@@ -115,33 +235,31 @@ class PerceptualDistanceBenchmark(ColorsBenchmark):
         )
         if sort is True:
             logger.debug("Sorting colors by perceptual distance.")
-            sorted_lab_colors_ = self._sort_on_distance(colors, delta_e_cie2000)
+            sorted_lab_colors_ = self._sort_on_distance(colors, self._distance)
             logger.debug(f"Sorted colors by perceptual distance: {sorted_lab_colors_}")
             sorted_lab_colors = sorted_lab_colors_["colors"]
-            logger.debug(f"Sorted colors by perceptual distance: {sorted_lab_colors}")
-            sorted_hex = [self.hex[i] for i in sorted_lab_colors_["indices"]]
+            hex_strings = self.hex
+            sorted_hex = [hex_strings[i] for i in sorted_lab_colors_["indices"]]
             logger.debug(f"Sorted colors by perceptual distance: {sorted_hex}")
-            distances = [
-                delta_e_cie2000(c1, c2)
-                for c1, c2 in zip(sorted_lab_colors[:-1], sorted_lab_colors[1:])
-            ]
+            distances = delta_e_symmetric(
+                sorted_lab_colors[:-1], sorted_lab_colors[1:], self.metric_name
+            )
             res = {
                 "hex": sorted_hex,
-                "lab": [c.get_value_tuple() for c in sorted_lab_colors],
-                "distances": distances,
+                "lab": [tuple(c) for c in sorted_lab_colors.tolist()],
+                "distances": distances.tolist(),
             }
         else:
-            distances = [
-                delta_e_cie2000(c1, c2) for c1, c2 in zip(colors[:-1], colors[1:])
-            ]
+            distances = delta_e_symmetric(colors[:-1], colors[1:], self.metric_name)
             res = {
                 "hex": self.hex,
-                "lab": [c.get_value_tuple() for c in colors],
-                "distances": distances,
+                "lab": [tuple(c) for c in colors.tolist()],
+                "distances": distances.tolist(),
             }
 
         res["noticable"] = [
-            self._delta_e_noticable_distance(d) for d in res["distances"]
+            self._delta_e_noticable_distance(d, threshold=self.threshold)
+            for d in res["distances"]
         ]
 
         return res
@@ -151,7 +269,7 @@ class PerceptualDistanceBenchmark(ColorsBenchmark):
     ):
         """Decide whether the two colors are noticable based on deltaE distance.
 
-        If the distance is larger than threshold, the two colors are noticable.
+        If the distance is larger than threshold, the two colors are noticable. The distance can also be an array of distances, in which case an array of booleans is returned.
 
         !!! note "References"
             The choice of the threshold is based on the following paper:
@@ -159,46 +277,46 @@ class PerceptualDistanceBenchmark(ColorsBenchmark):
             Mokrzycki WS, Tatol M. Color difference Delta E - A survey. Machine Graphics and Vision. 2011;20: 383–411. Available: https://www.semanticscholar.org/paper/Color-difference-Delta-E-A-survey/67d9178f7bad9686c002b721138e26124f6e2e35
 
         :param distance: the deltaE distance
-        :type distance: float
+        :type distance: Union[float, numpy.ndarray]
         :param threshold: the threshold to decide whether the two colors are noticable, defaults to 5
         :type threshold: int, optional
         :return: whether the two colors are noticable
-        :rtype: bool
+        :rtype: Union[bool, numpy.ndarray]
         """
+        if isinstance(distance, np.ndarray):
+            return distance > threshold
+
         if distance > threshold:
             return True
         else:
             return False
 
     @staticmethod
-    def _sort_on_distance(lab_colors: list, distance_metric, reference_color=None):
+    def _sort_on_distance(
+        lab_colors: np.ndarray, distance_metric, reference_color=None
+    ):
         """sort the colors based on distance between each other.
 
-        :param lab_colors: a list of colors in lab color space
-        :type lab_colors: list
-        :param distance_metric: the distance metric to use, it should be a function that takes two colors as arguments and returns the distance.
-        :param reference_color: the reference color to use, defaults to None
+        :param lab_colors: an array of colors in lab color space of shape (N, 3)
+        :type lab_colors: numpy.ndarray
+        :param distance_metric: the distance metric to use, a name in `colorteller.utils.delta_e.METRICS` or a function that takes two arrays of Lab colors as arguments and returns the distances, e.g., `colorteller.utils.delta_e.delta_e_cie2000`.
+        :param reference_color: the reference color to use, defaults to None (white)
         """
         if reference_color is None:
-            reference_color_rgb = sRGBColor(rgb_r=255, rgb_g=255, rgb_b=255)
-            reference_color = convert_color(reference_color_rgb, LabColor)
-        elif isinstance(reference_color, str):
+            reference_color = "white"
+        if isinstance(reference_color, str):
             if reference_color == "white":
-                reference_color = convert_color(
-                    sRGBColor(rgb_r=255, rgb_g=255, rgb_b=255), LabColor
-                )
+                reference_color = rgb_to_lab(np.array([255, 255, 255], dtype=np.uint8))
             elif reference_color == "black":
-                reference_color = convert_color(
-                    sRGBColor(rgb_r=0, rgb_g=0, rgb_b=0), LabColor
+                reference_color = rgb_to_lab(np.array([0, 0, 0], dtype=np.uint8))
+            else:
+                raise ValueError(
+                    f"reference_color has to be white or black; {reference_color}"
                 )
 
-        ref_distances = [distance_metric(c, reference_color) for c in lab_colors]
-        sorted_index = sorted(range(len(ref_distances)), key=ref_distances.__getitem__)
-
-        return {
-            "colors": [lab_colors[i] for i in sorted_index],
-            "indices": sorted_index,
-        }
+        return sort_on_distance_to_reference(
+            lab_colors, distance_metric, reference_color
+        )
 
 
 class LightnessBenchmark(ColorsBenchmark):
@@ -208,52 +326,74 @@ class LightnessBenchmark(ColorsBenchmark):
         If a color is too light, it would be very hard to read on white background. If a color is too dark, it would be hard to read on black background.
 
     :param colors: teller.Colors object which has properties such as hex.
+    :param min_lightness: the min lightness value, defaults to 25
+    :param max_lightness: the max lightness value, defaults to 85
     """
 
-    def __init__(self, colors):
+    method = "lightness"
+    per_color_fields = (
+        "lightness",
+        "smaller_than_max",
+        "greater_than_min",
+        "bounded_by_min_max",
+    )
+
+    def __init__(self, colors, min_lightness=25, max_lightness=85):
         super().__init__(colors)
+        self.min_lightness = min_lightness
+        self.max_lightness = max_lightness
+
+    @property
+    def params(self):
+        """parameters of the benchmark that change the results"""
+        return {"min_lightness": self.min_lightness, "max_lightness": self.max_lightness}
 
     def metric(self):
         """calculate the metrics of the current benchmark"""
+        with self.stage("conversion"):
+            lab = self.lab_array
+
         return {
-            "method": "lightness",
+            "method": self.method,
             "data": self._lightness_benchmark(
-                self.LabColor, min_lightness=25, max_lightness=85
+                lab,
+                min_lightness=self.min_lightness,
+                max_lightness=self.max_lightness,
             ),
         }
 
-    def _smaller_than_max(self, color, max_lightness: int = 85):
+    def _smaller_than_max(self, lightness, max_lightness: int = 85):
         """Whether the lightness of the color is larger than the max value set here
 
-        :param color: a color in Lab color space with a `lab_l` property
+        :param lightness: the `L` value of the color(s) in Lab color space
         :param max_lightness: the max lightness value, defaults to 85
         """
-        return color.lab_l <= max_lightness
+        return lightness <= max_lightness
 
-    def _greater_than_min(self, color, min_lightness: int = 25):
+    def _greater_than_min(self, lightness, min_lightness: int = 25):
         """Whether the lightness of the color is lighter than the min value set here.
 
-        :param color: a color in Lab color space with a `lab_l` property
+        :param lightness: the `L` value of the color(s) in Lab color space
         :param min_lightness: the min lightness value, defaults to 25
         """
-        return color.lab_l >= min_lightness
+        return lightness >= min_lightness
 
-    def _bounded_by_min_max(self, color, min_lightness=25, max_lightness=85):
+    def _bounded_by_min_max(self, lightness, min_lightness=25, max_lightness=85):
         """Wheter the color lightness is bounded by min and max.
 
-        :param color: a color in Lab color space with a `lab_l` property
+        :param lightness: the `L` value of the color(s) in Lab color space
         :param min_lightness: the min lightness value, defaults to 25
         :param max_lightness: the max lightness value, defaults to 85
         """
-        return self._greater_than_min(color, min_lightness) and self._smaller_than_max(
-            color, max_lightness
-        )
+        return self._greater_than_min(
+            lightness, min_lightness
+        ) & self._smaller_than_max(lightness, max_lightness)
 
     def _lightness_benchmark(self, colors, min_lightness=25, max_lightness=85):
         """_lightness_benchmark calculates all the benchmarks based on lightness.
 
-        :param colors: a list of colors in Lab color space
-        :type colors: list
+        :param colors: an array of colors in Lab color space of shape (N, 3)
+        :type colors: numpy.ndarray
         :param min_lightness: the min lightness value, defaults to 25
         :type min_lightness: int, optional
         :param max_lightness: the max lightness value, defaults to 85
@@ -261,18 +401,90 @@ class LightnessBenchmark(ColorsBenchmark):
         :return: the benchmark results
         :rtype: dict
         """
+        lightness = np.asarray(colors)[:, 0]
+
+        with self.stage("thresholding"):
+            smaller_than_max = self._smaller_than_max(lightness, max_lightness)
+            greater_than_min = self._greater_than_min(lightness, min_lightness)
+            bounded_by_min_max = smaller_than_max & greater_than_min
+
+        with self.stage("result"):
+            return {
+                "lightness": lightness.tolist(),
+                "min_lightness": min_lightness,
+                "max_lightness": max_lightness,
+                "smaller_than_max": smaller_than_max.tolist(),
+                "greater_than_min": greater_than_min.tolist(),
+                "bounded_by_min_max": bounded_by_min_max.tolist(),
+            }
+
+
+class ColorVisionDeficiencyBenchmark(ColorsBenchmark):
+    """Benchmark whether the colors are still distinguishable with color vision deficiencies, i.e., protanopia, deuteranopia and tritanopia.
+
+    The simulation matrices are applied to the linear rgb values of all the colors at once (see `colorteller.utils.color.simulate_cvd`), and the deltaE matrices of all the deficiencies are calculated in one pass of `colorteller.utils.delta_e.delta_e_matrix` on the stacked Lab values of shape (K, N, 3).
+
+    The data has the same fields as `PerceptualDistanceBenchmark`, with `distances` and `noticable` of shape (K, N, N), i.e., one matrix for each of the K deficiencies listed in `deficiencies`. Use `deficiency` of `visualize.BenchmarkCharts.distance_matrix` and `visualize.BenchmarkCharts.noticable_matrix` to plot them.
+
+    :param colors: teller.Colors object which has properties such as hex.
+    :param deficiencies: names of the deficiencies, keys of `colorteller.utils.color.CVD_MATRICES`, defaults to all of them
+    :param severity: severity of the deficiencies in 0-1, defaults to 1.0
+    :param threshold: the deltaE threshold for two colors to be noticable, defaults to 5
+    :param metric: name of the color difference metric, see `colorteller.utils.delta_e.METRICS`, defaults to `cie2000`
+    """
+
+    method = "color_vision_deficiency"
+    per_color_fields = ("colors",)
+    pairwise_fields = ("distances", "noticable")
+
+    def __init__(
+        self,
+        colors: "Colors",
+        deficiencies: Optional[list] = None,
+        severity: float = 1.0,
+        threshold: Union[int, float] = 5,
+        metric: str = DEFAULT_METRIC,
+    ) -> None:
+        super().__init__(colors)
+        get_metric(metric)
+        self.metric_name = metric
+        if deficiencies is None:
+            deficiencies = list(CVD_MATRICES)
+        self.deficiencies = list(deficiencies)
+        self.severity = severity
+        self.threshold = threshold
+
+    @property
+    def params(self):
+        """parameters of the benchmark that change the results"""
         return {
-            "lightness": [c.lab_l for c in colors],
-            "min_lightness": min_lightness,
-            "max_lightness": max_lightness,
-            "smaller_than_max": [
-                self._smaller_than_max(c, max_lightness) for c in colors
-            ],
-            "greater_than_min": [
-                self._greater_than_min(c, min_lightness) for c in colors
-            ],
-            "bounded_by_min_max": [
-                self._bounded_by_min_max(c, min_lightness, max_lightness)
-                for c in colors
-            ],
+            "deficiencies": self.deficiencies,
+            "severity": self.severity,
+            "threshold": self.threshold,
+            "metric": self.metric_name,
         }
+
+    def metric(self):
+        """calculate the metrics of the current benchmark"""
+        with self.stage("conversion"):
+            simulated = simulate_cvd(
+                srgb_to_linear(self.rgb_array), self.deficiencies, self.severity
+            )
+            lab = xyz_to_lab(linear_rgb_to_xyz(simulated))
+        with self.stage("pairwise"):
+            pd = delta_e_matrix(lab, self.metric_name)
+        with self.stage("thresholding"):
+            noticable = pd > self.threshold
+
+        with self.stage("result"):
+            return {
+                "method": self.method,
+                "data": {
+                    "colors": self.hex,
+                    "metric": self.metric_name,
+                    "deficiencies": self.deficiencies,
+                    "severity": self.severity,
+                    "distances": pd.tolist(),
+                    "noticable": noticable.tolist(),
+                },
+            }
@@ -1,12 +1,22 @@
-import matplotlib.pyplot as plt
-
 import seaborn as sns
 
-sns.set_theme()
+_THEME_IS_SET = False
+
+
+def set_theme():
+    """Set the seaborn theme for the charts.
+
+    The theme changes the global matplotlib settings. It is set only once, when the first chart is created, instead of when the module is imported.
+    """
+    global _THEME_IS_SET
+    if not _THEME_IS_SET:
+        sns.set_theme(style="white")
+        _THEME_IS_SET = True
 
 
 def distance_matrix(dist_mat, colors, ax=None, threshold=10):
     """Visualize distance matrix from a matrix of distance"""
+    set_theme()
 
     dist_mat_annot = []
     for dist_row in dist_mat:
@@ -40,13 +50,14 @@ def distance_matrix(dist_mat, colors, ax=None, threshold=10):
     ax.set_xticklabels(ax.get_xticklabels(), rotation=45)
     ax.set_yticklabels(ax.get_yticklabels(), rotation=45)
 
-    plt.tight_layout()
+    ax.figure.tight_layout()
 
     return ax
 
 
 def noticable_matrix(noti_mat, colors, ax=None):
     """Visualize noticable matrix"""
+    set_theme()
 
     chart_kws = dict(
         vmin=0,
@@ -67,6 +78,6 @@ def noticable_matrix(noti_mat, colors, ax=None):
     ax.set_xticklabels(ax.get_xticklabels(), rotation=45)
     ax.set_yticklabels(ax.get_yticklabels(), rotation=45)
 
-    plt.tight_layout()
+    ax.figure.tight_layout()
 
     return ax
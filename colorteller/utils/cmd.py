@@ -1,3 +1,4 @@
+import re
 from pathlib import Path
 
 
@@ -14,3 +15,16 @@ def prepare_paths(target):
     metrics_to = target / "metrics.json"
 
     return {"target": target, "metrics_to": metrics_to}
+
+
+def iter_hex_lines(source):
+    """
+    Read palettes from a file with one palette per line. The hex strings in a line are separated by commas and/or whitespaces. Empty lines are skipped.
+
+    :param source: a file object
+    :return: an iterator of lists of hex strings
+    """
+    for line in source:
+        hex_strings = [h for h in re.split(r"[,\s]+", line.strip()) if h]
+        if hex_strings:
+            yield hex_strings
@@ -1,3 +1,321 @@
+import numpy as np
+
+from colorteller.utils.hex import Hex
+
+#: sRGB to XYZ conversion matrix, the same as `colormath.color_objects.sRGBColor`
+SRGB_TO_XYZ = np.array(
+    [
+        [0.412424, 0.357579, 0.180464],
+        [0.212656, 0.715158, 0.0721856],
+        [0.0193324, 0.119193, 0.950444],
+    ]
+)
+
+#: XYZ of the D65 illuminant for the 2° observer, the default of colormath for sRGB
+D65_2 = np.array([0.95047, 1.00000, 1.08883])
+
+CIE_E = 216.0 / 24389.0
+
+#: XYZ to LMS matrix of OKLab, from Björn Ottosson (2020), https://bottosson.github.io/posts/oklab/
+OKLAB_M1 = np.array(
+    [
+        [0.8189330101, 0.3618667424, -0.1288597137],
+        [0.0329845436, 0.9293118715, 0.0361456387],
+        [0.0482003018, 0.2643662691, 0.6338517070],
+    ]
+)
+
+#: nonlinear LMS to OKLab matrix
+OKLAB_M2 = np.array(
+    [
+        [0.2104542553, 0.7936177850, -0.0040720468],
+        [1.9779984951, -2.4285922050, 0.4505937099],
+        [0.0259040371, 0.7827717662, -0.8086757660],
+    ]
+)
+
+#: chromatic adaptation matrix of CIECAM02
+CAT02 = np.array(
+    [
+        [0.7328, 0.4296, -0.1624],
+        [-0.7036, 1.6975, 0.0061],
+        [0.0030, 0.0136, 0.9834],
+    ]
+)
+
+#: Hunt-Pointer-Estevez matrix of CIECAM02
+HPE = np.array(
+    [
+        [0.38971, 0.68898, -0.07868],
+        [-0.22981, 1.18340, 0.04641],
+        [0.0, 0.0, 1.0],
+    ]
+)
+
+#: simulation matrices of the color vision deficiencies with severity 1, applied to linear rgb values, from Machado, Oliveira and Fernandes (2009)
+CVD_MATRICES = {
+    "protanopia": np.array(
+        [
+            [0.152286, 1.052583, -0.204868],
+            [0.114503, 0.786281, 0.099216],
+            [-0.003882, -0.048116, 1.051998],
+        ]
+    ),
+    "deuteranopia": np.array(
+        [
+            [0.367322, 0.860646, -0.227968],
+            [0.280085, 0.672501, 0.047413],
+            [-0.011820, 0.042940, 0.968881],
+        ]
+    ),
+    "tritanopia": np.array(
+        [
+            [1.255528, -0.076749, -0.178779],
+            [-0.078411, 0.930809, 0.147602],
+            [0.004733, 0.691367, 0.303900],
+        ]
+    ),
+}
+
+
+def hex_to_rgb(hex_strings: list) -> np.ndarray:
+    """Convert a list of hex strings to an array of rgb values.
+
+    ```python
+    hex_to_rgb(["#0000FF", "#800000"])
+    # array([[  0,   0, 255],
+    #        [128,   0,   0]], dtype=uint8)
+    ```
+
+    :param hex_strings: a list of hex strings, with or without the leading `#`
+    :return: an uint8 array of shape `(N, 3)`
+    :rtype: numpy.ndarray
+    """
+    hex_standard = [Hex.standard_hex_string(h) for h in hex_strings]
+    try:
+        rgb_bytes = bytes.fromhex("".join(hex_standard))
+    except ValueError as e:
+        raise ValueError(f"hex_strings contains invalid hex values; {hex_strings}") from e
+    # bytes.fromhex skips whitespace, which would shift the bytes of the following colors
+    if len(rgb_bytes) != 3 * len(hex_standard):
+        raise ValueError(f"hex_strings contains invalid hex values; {hex_strings}")
+
+    return np.frombuffer(rgb_bytes, dtype=np.uint8).reshape(-1, 3)
+
+
+def srgb_to_linear(rgb) -> np.ndarray:
+    """Remove the sRGB gamma companding.
+
+    :param rgb: rgb values, uint8 arrays are considered as upscaled values in 0-255 while float arrays are considered to be in 0-1.
+    :return: linear rgb values in 0-1
+    :rtype: numpy.ndarray
+    """
+    rgb = np.asarray(rgb)
+    if rgb.dtype == np.uint8:
+        rgb = rgb / 255.0
+    else:
+        rgb = rgb.astype(float)
+
+    return np.where(rgb <= 0.04045, rgb / 12.92, ((rgb + 0.055) / 1.055) ** 2.4)
+
+
+def linear_rgb_to_xyz(linear_rgb) -> np.ndarray:
+    """Convert linear sRGB values to XYZ.
+
+    :param linear_rgb: linear rgb values in 0-1 with the last axis being (r, g, b)
+    :return: XYZ values
+    :rtype: numpy.ndarray
+    """
+    return np.asarray(linear_rgb, dtype=float) @ SRGB_TO_XYZ.T
+
+
+def xyz_to_lab(xyz, illuminant=D65_2) -> np.ndarray:
+    """Convert XYZ values to Lab.
+
+    :param xyz: XYZ values with the last axis being (X, Y, Z)
+    :param illuminant: XYZ of the reference white, defaults to D65 with the 2° observer
+    :return: Lab values
+    :rtype: numpy.ndarray
+    """
+    xyz_scaled = np.asarray(xyz, dtype=float) / illuminant
+    f = np.where(
+        xyz_scaled > CIE_E, np.cbrt(xyz_scaled), 7.787 * xyz_scaled + 16.0 / 116.0
+    )
+
+    lab = np.empty_like(f)
+    lab[..., 0] = 116.0 * f[..., 1] - 16.0
+    lab[..., 1] = 500.0 * (f[..., 0] - f[..., 1])
+    lab[..., 2] = 200.0 * (f[..., 1] - f[..., 2])
+
+    return lab
+
+
+def lab_to_xyz(lab, illuminant=D65_2) -> np.ndarray:
+    """Convert Lab values to XYZ, the inverse of `xyz_to_lab`.
+
+    :param lab: Lab values with the last axis being (L, a, b)
+    :param illuminant: XYZ of the reference white, defaults to D65 with the 2° observer
+    :return: XYZ values
+    :rtype: numpy.ndarray
+    """
+    lab = np.asarray(lab, dtype=float)
+    f = np.empty_like(lab)
+    f[..., 1] = (lab[..., 0] + 16.0) / 116.0
+    f[..., 0] = f[..., 1] + lab[..., 1] / 500.0
+    f[..., 2] = f[..., 1] - lab[..., 2] / 200.0
+
+    f_3 = f**3
+    xyz_scaled = np.where(f_3 > CIE_E, f_3, (f - 16.0 / 116.0) / 7.787)
+
+    return xyz_scaled * illuminant
+
+
+def xyz_to_oklab(xyz) -> np.ndarray:
+    """Convert XYZ values (D65, Y of the white being 1) to OKLab.
+
+    :param xyz: XYZ values with the last axis being (X, Y, Z)
+    :return: OKLab values with the last axis being (L, a, b), L of the white being 1
+    :rtype: numpy.ndarray
+    """
+    lms = np.cbrt(np.asarray(xyz, dtype=float) @ OKLAB_M1.T)
+
+    return lms @ OKLAB_M2.T
+
+
+def lab_to_oklab(lab) -> np.ndarray:
+    """Convert Lab values (D65, 2°) to OKLab, see `xyz_to_oklab`."""
+    return xyz_to_oklab(lab_to_xyz(lab))
+
+
+def _cam02_adapt(rgb, F_L):
+    rgb_scaled = (F_L * np.abs(rgb) / 100.0) ** 0.42
+
+    return np.sign(rgb) * 400.0 * rgb_scaled / (rgb_scaled + 27.13) + 0.1
+
+
+def xyz_to_cam02ucs(
+    xyz, white=D65_2, L_A: float = 64 / np.pi / 5, Y_b: float = 20.0
+) -> np.ndarray:
+    """Convert XYZ values to CAM02-UCS, the uniform color space based on CIECAM02.
+
+    The viewing conditions default to the average surround of sRGB, the same as [colorspacious](https://github.com/njsmith/colorspacious).
+
+    !!! note "References"
+        Luo MR, Cui G, Li C. Uniform colour spaces based on CIECAM02 colour appearance model. Color Research & Application. 2006;31: 320–330.
+
+    :param xyz: XYZ values with the last axis being (X, Y, Z), Y of the white being 1
+    :param white: XYZ of the reference white, defaults to D65 with the 2° observer
+    :param L_A: luminance of the adapting field in cd/m^2, defaults to 64 / pi / 5
+    :param Y_b: relative luminance of the background, defaults to 20
+    :return: CAM02-UCS values with the last axis being (J', a', b')
+    :rtype: numpy.ndarray
+    """
+    # average surround
+    F, c, N_c = 1.0, 0.69, 1.0
+
+    xyz = np.asarray(xyz, dtype=float) * 100.0
+    xyz_w = np.asarray(white, dtype=float) * 100.0
+    Y_w = xyz_w[1]
+
+    k = 1.0 / (5 * L_A + 1)
+    F_L = 0.2 * k**4 * (5 * L_A) + 0.1 * (1 - k**4) ** 2 * np.cbrt(5 * L_A)
+    n = Y_b / Y_w
+    z = 1.48 + np.sqrt(n)
+    N_bb = 0.725 * n**-0.2
+    D = np.clip(F * (1 - (1 / 3.6) * np.exp((-L_A - 42) / 92)), 0, 1)
+
+    to_hpe = HPE @ np.linalg.inv(CAT02)
+    rgb_w = CAT02 @ xyz_w
+    D_rgb = D * Y_w / rgb_w + 1 - D
+
+    rgb_aw = _cam02_adapt(to_hpe @ (D_rgb * rgb_w), F_L)
+    A_w = (2 * rgb_aw[0] + rgb_aw[1] + rgb_aw[2] / 20 - 0.305) * N_bb
+
+    rgb_a = _cam02_adapt((D_rgb * (xyz @ CAT02.T)) @ to_hpe.T, F_L)
+    R_a, G_a, B_a = rgb_a[..., 0], rgb_a[..., 1], rgb_a[..., 2]
+
+    a = R_a - 12 * G_a / 11 + B_a / 11
+    b = (R_a + G_a - 2 * B_a) / 9
+    h = np.arctan2(b, a)
+    e_t = 0.25 * (np.cos(h + 2) + 3.8)
+
+    A = (2 * R_a + G_a + B_a / 20 - 0.305) * N_bb
+    J = 100 * np.maximum(A / A_w, 0) ** (c * z)
+    t = (50000 / 13 * N_c * N_bb * e_t * np.hypot(a, b)) / (
+        R_a + G_a + 21 / 20 * B_a
+    )
+    # t is negative for some imaginary colors far outside of the gamut
+    C = np.maximum(t, 0) ** 0.9 * np.sqrt(J / 100) * (1.64 - 0.29**n) ** 0.73
+    M = C * F_L**0.25
+
+    # Luo, Cui and Li (2006), UCS
+    c_1, c_2 = 0.007, 0.0228
+    J_p = (1 + 100 * c_1) * J / (1 + c_1 * J)
+    M_p = np.log1p(c_2 * M) / c_2
+
+    return np.stack([J_p, M_p * np.cos(h), M_p * np.sin(h)], axis=-1)
+
+
+def lab_to_cam02ucs(lab) -> np.ndarray:
+    """Convert Lab values (D65, 2°) to CAM02-UCS, see `xyz_to_cam02ucs`."""
+    return xyz_to_cam02ucs(lab_to_xyz(lab))
+
+
+def simulate_cvd(linear_rgb, deficiencies=None, severity: float = 1.0) -> np.ndarray:
+    """Simulate how the colors are seen with color vision deficiencies.
+
+    All the deficiencies are applied to all the colors at once, i.e., the input of shape (N, 3) gives an array of shape (K, N, 3) for K deficiencies.
+
+    ```python
+    linear_rgb = srgb_to_linear(hex_to_rgb(["#ff0000", "#00ff00"]))
+    simulate_cvd(linear_rgb, ["protanopia", "deuteranopia"]).shape
+    # (2, 2, 3)
+    ```
+
+    !!! note "References"
+        The matrices are from Machado GM, Oliveira MM, Fernandes LAF. A Physiologically-based Model for Simulation of Color Vision Deficiency. IEEE Transactions on Visualization and Computer Graphics. 2009;15: 1291–1298. A severity below 1 interpolates linearly between the identity and the matrix of severity 1, an approximation of the matrices of the paper for partial deficiencies.
+
+    :param linear_rgb: linear rgb values in 0-1 of shape (N, 3), see `srgb_to_linear`
+    :param deficiencies: names of the deficiencies, keys of `CVD_MATRICES`, defaults to all of them
+    :param severity: severity of the deficiencies in 0-1, defaults to 1.0
+    :return: simulated linear rgb values in 0-1 of shape (K, N, 3)
+    :rtype: numpy.ndarray
+    """
+    if deficiencies is None:
+        deficiencies = list(CVD_MATRICES)
+    unknown = [d for d in deficiencies if d not in CVD_MATRICES]
+    if unknown:
+        raise ValueError(f"deficiencies have to be in {list(CVD_MATRICES)}; {unknown}")
+    if not 0 <= severity <= 1:
+        raise ValueError(f"severity has to be in 0-1; {severity}")
+
+    matrices = np.stack([CVD_MATRICES[d] for d in deficiencies]).reshape(-1, 3, 3)
+    matrices = severity * matrices + (1 - severity) * np.eye(3)
+    linear_rgb = np.asarray(linear_rgb, dtype=float).reshape(-1, 3)
+
+    return np.clip(np.einsum("kij,nj->kni", matrices, linear_rgb), 0, 1)
+
+
+def rgb_to_lab(rgb) -> np.ndarray:
+    """Convert sRGB values to Lab (D65, 2°), the same as `colormath.color_conversions.convert_color(sRGBColor, LabColor)`.
+
+    :param rgb: rgb values, see `srgb_to_linear` for the accepted ranges.
+    :return: Lab values
+    :rtype: numpy.ndarray
+    """
+    return xyz_to_lab(linear_rgb_to_xyz(srgb_to_linear(rgb)))
+
+
+def hex_to_lab(hex_strings: list) -> np.ndarray:
+    """Convert a list of hex strings to an array of Lab values.
+
+    :param hex_strings: a list of hex strings
+    :return: a float array of shape `(N, 3)`
+    :rtype: numpy.ndarray
+    """
+    return rgb_to_lab(hex_to_rgb(hex_strings))
+
+
 def hue_difference(color1, color2):
     """
     Calculates the difference between two colors in the HSL color space.
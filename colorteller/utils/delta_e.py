@@ -0,0 +1,374 @@
+from typing import Callable, Optional, Union
+
+import numpy as np
+
+from colorteller.utils.color import lab_to_cam02ucs, lab_to_oklab
+
+
+def delta_e_cie76(lab_1, lab_2):
+    """Calculates the CIE76 color difference, i.e., the Euclidean distance in Lab, between arrays of Lab colors.
+
+    The inputs are broadcast the same way as `delta_e_cie2000`.
+
+    :param lab_1: Lab colors with the last axis being (L, a, b)
+    :param lab_2: Lab colors with the last axis being (L, a, b)
+    :return: the CIE76 distances
+    :rtype: numpy.ndarray
+    """
+    return _euclidean(lab_1, lab_2)
+
+
+def delta_e_cie94(lab_1, lab_2, K_L=1, K_C=1, K_H=1, K_1=0.045, K_2=0.015):
+    """Calculates the CIE94 color difference between arrays of Lab colors, with `lab_1` being the reference.
+
+    The inputs are broadcast the same way as `delta_e_cie2000`. The defaults are the graphic arts parameters, the same as `colormath.color_diff.delta_e_cie1994`.
+
+    :param lab_1: reference Lab colors with the last axis being (L, a, b)
+    :param lab_2: Lab colors with the last axis being (L, a, b)
+    :param K_L: weighting factor for lightness, defaults to 1
+    :param K_C: weighting factor for chroma, defaults to 1
+    :param K_H: weighting factor for hue, defaults to 1
+    :param K_1: chroma factor, defaults to 0.045
+    :param K_2: hue factor, defaults to 0.015
+    :return: the CIE94 distances
+    :rtype: numpy.ndarray
+    """
+    lab_1 = np.asarray(lab_1, dtype=float)
+    lab_2 = np.asarray(lab_2, dtype=float)
+
+    C_1 = np.hypot(lab_1[..., 1], lab_1[..., 2])
+    C_2 = np.hypot(lab_2[..., 1], lab_2[..., 2])
+    delta_L = lab_1[..., 0] - lab_2[..., 0]
+    delta_C = C_1 - C_2
+    delta_a = lab_1[..., 1] - lab_2[..., 1]
+    delta_b = lab_1[..., 2] - lab_2[..., 2]
+    delta_H_2 = np.maximum(delta_a**2 + delta_b**2 - delta_C**2, 0)
+
+    S_C = 1 + K_1 * C_1
+    S_H = 1 + K_2 * C_1
+
+    return np.sqrt(
+        (delta_L / K_L) ** 2
+        + (delta_C / (K_C * S_C)) ** 2
+        + delta_H_2 / (K_H * S_H) ** 2
+    )
+
+
+def delta_e_cmc(lab_1, lab_2, pl=2, pc=1):
+    """Calculates the CMC l:c color difference between arrays of Lab colors, with `lab_1` being the reference.
+
+    The inputs are broadcast the same way as `delta_e_cie2000`. The defaults are the acceptability parameters 2:1, the same as `colormath.color_diff.delta_e_cmc`.
+
+    :param lab_1: reference Lab colors with the last axis being (L, a, b)
+    :param lab_2: Lab colors with the last axis being (L, a, b)
+    :param pl: weight of lightness, defaults to 2
+    :param pc: weight of chroma, defaults to 1
+    :return: the CMC distances
+    :rtype: numpy.ndarray
+    """
+    lab_1 = np.asarray(lab_1, dtype=float)
+    lab_2 = np.asarray(lab_2, dtype=float)
+    L_1, a_1, b_1 = lab_1[..., 0], lab_1[..., 1], lab_1[..., 2]
+
+    C_1 = np.hypot(a_1, b_1)
+    C_2 = np.hypot(lab_2[..., 1], lab_2[..., 2])
+    delta_L = L_1 - lab_2[..., 0]
+    delta_C = C_1 - C_2
+    delta_a = a_1 - lab_2[..., 1]
+    delta_b = b_1 - lab_2[..., 2]
+    delta_H_2 = np.maximum(delta_a**2 + delta_b**2 - delta_C**2, 0)
+
+    H_1 = np.degrees(np.arctan2(b_1, a_1)) % 360
+    C_1_4 = C_1**4
+    F = np.sqrt(C_1_4 / (C_1_4 + 1900.0))
+    T = np.where(
+        (H_1 >= 164) & (H_1 <= 345),
+        0.56 + np.abs(0.2 * np.cos(np.radians(H_1 + 168))),
+        0.36 + np.abs(0.4 * np.cos(np.radians(H_1 + 35))),
+    )
+    S_L = np.where(L_1 < 16, 0.511, (0.040975 * L_1) / (1 + 0.01765 * L_1))
+    S_C = (0.0638 * C_1) / (1 + 0.0131 * C_1) + 0.638
+    S_H = S_C * (F * T + 1 - F)
+
+    return np.sqrt(
+        (delta_L / (pl * S_L)) ** 2
+        + (delta_C / (pc * S_C)) ** 2
+        + delta_H_2 / S_H**2
+    )
+
+
+def delta_e_oklab(lab_1, lab_2):
+    """Calculates the Euclidean distance in OKLab between arrays of Lab colors.
+
+    The distance is multiplied by 100, so that it is in the same range as the other metrics, i.e., L of the white is 100. The inputs are broadcast the same way as `delta_e_cie2000`.
+
+    :param lab_1: Lab colors with the last axis being (L, a, b)
+    :param lab_2: Lab colors with the last axis being (L, a, b)
+    :return: the OKLab distances
+    :rtype: numpy.ndarray
+    """
+    return _euclidean(_oklab(lab_1), _oklab(lab_2))
+
+
+def delta_e_cam02ucs(lab_1, lab_2):
+    """Calculates the Euclidean distance in CAM02-UCS between arrays of Lab colors.
+
+    The inputs are broadcast the same way as `delta_e_cie2000`. See `colorteller.utils.color.xyz_to_cam02ucs` for the viewing conditions.
+
+    :param lab_1: Lab colors with the last axis being (L, a, b)
+    :param lab_2: Lab colors with the last axis being (L, a, b)
+    :return: the CAM02-UCS distances
+    :rtype: numpy.ndarray
+    """
+    return _euclidean(lab_to_cam02ucs(lab_1), lab_to_cam02ucs(lab_2))
+
+
+def _euclidean(x_1, x_2):
+    diff = np.asarray(x_1, dtype=float) - np.asarray(x_2, dtype=float)
+
+    return np.sqrt(np.einsum("...i,...i->...", diff, diff))
+
+
+def _oklab(lab):
+    return 100.0 * lab_to_oklab(lab)
+
+
+def delta_e_cie2000(lab_1, lab_2, Kl=1, Kc=1, Kh=1):
+    """Calculates the CIEDE2000 color difference between arrays of Lab colors.
+
+    The two inputs are broadcast against each other on all but the last axis, e.g., `(N, 3)` and `(N, 3)` gives `(N,)`, while `(N, 1, 3)` and `(1, M, 3)` gives `(N, M)`.
+
+    !!! note "Accuracy"
+        The implementation follows Sharma, Wu and Dalal (2005). It agrees with `colormath.color_diff.delta_e_cie2000` to within `1e-3` for colors in the sRGB gamut. The small differences come from colormath's handling of the mean hue when the two hue angles are on different sides of 0°.
+
+    :param lab_1: Lab colors with the last axis being (L, a, b)
+    :param lab_2: Lab colors with the last axis being (L, a, b)
+    :param Kl: weighting factor for lightness, defaults to 1
+    :param Kc: weighting factor for chroma, defaults to 1
+    :param Kh: weighting factor for hue, defaults to 1
+    :return: the CIEDE2000 distances
+    :rtype: numpy.ndarray
+    """
+    lab_1 = np.asarray(lab_1, dtype=float)
+    lab_2 = np.asarray(lab_2, dtype=float)
+
+    L1, a1, b1 = lab_1[..., 0], lab_1[..., 1], lab_1[..., 2]
+    L2, a2, b2 = lab_2[..., 0], lab_2[..., 1], lab_2[..., 2]
+
+    avg_C = (np.hypot(a1, b1) + np.hypot(a2, b2)) / 2.0
+    avg_C_7 = avg_C**7
+    G = 0.5 * (1 - np.sqrt(avg_C_7 / (avg_C_7 + 25.0**7)))
+
+    a1p = (1.0 + G) * a1
+    a2p = (1.0 + G) * a2
+    C1p = np.hypot(a1p, b1)
+    C2p = np.hypot(a2p, b2)
+
+    h1p = np.degrees(np.arctan2(b1, a1p)) % 360
+    h2p = np.degrees(np.arctan2(b2, a2p)) % 360
+
+    C1p_C2p = C1p * C2p
+    chromatic = C1p_C2p != 0
+
+    delta_Lp = L2 - L1
+    delta_Cp = C2p - C1p
+
+    diff_hp = h2p - h1p
+    delta_hp = np.where(
+        diff_hp > 180, diff_hp - 360, np.where(diff_hp < -180, diff_hp + 360, diff_hp)
+    )
+    delta_hp = np.where(chromatic, delta_hp, 0)
+    delta_Hp = 2 * np.sqrt(C1p_C2p) * np.sin(np.radians(delta_hp) / 2.0)
+
+    avg_Lp = (L1 + L2) / 2.0
+    avg_Cp = (C1p + C2p) / 2.0
+
+    sum_hp = h1p + h2p
+    avg_hp = np.where(
+        np.fabs(diff_hp) <= 180,
+        sum_hp / 2.0,
+        np.where(sum_hp < 360, (sum_hp + 360) / 2.0, (sum_hp - 360) / 2.0),
+    )
+    avg_hp = np.where(chromatic, avg_hp, sum_hp)
+
+    T = (
+        1
+        - 0.17 * np.cos(np.radians(avg_hp - 30))
+        + 0.24 * np.cos(np.radians(2 * avg_hp))
+        + 0.32 * np.cos(np.radians(3 * avg_hp + 6))
+        - 0.20 * np.cos(np.radians(4 * avg_hp - 63))
+    )
+
+    avg_Lp_50_2 = (avg_Lp - 50) ** 2
+    S_L = 1 + (0.015 * avg_Lp_50_2) / np.sqrt(20 + avg_Lp_50_2)
+    S_C = 1 + 0.045 * avg_Cp
+    S_H = 1 + 0.015 * avg_Cp * T
+
+    delta_ro = 30 * np.exp(-(((avg_hp - 275) / 25) ** 2))
+    avg_Cp_7 = avg_Cp**7
+    R_C = 2 * np.sqrt(avg_Cp_7 / (avg_Cp_7 + 25.0**7))
+    R_T = -R_C * np.sin(2 * np.radians(delta_ro))
+
+    l_term = delta_Lp / (S_L * Kl)
+    c_term = delta_Cp / (S_C * Kc)
+    h_term = delta_Hp / (S_H * Kh)
+
+    return np.sqrt(l_term**2 + c_term**2 + h_term**2 + R_T * c_term * h_term)
+
+
+def delta_e_cie2000_matrix(lab, Kl=1, Kc=1, Kh=1):
+    """Calculates the symmetric CIEDE2000 distance matrix of a list of Lab colors.
+
+    Only the upper triangle (without the diagonal) is computed. The lower triangle is mirrored from it and the diagonal is zero.
+
+    A stack of lists, e.g., the colors simulated for K color vision deficiencies of shape `(K, N, 3)`, is computed in one pass and gives a stack of matrices of shape `(K, N, N)`.
+
+    :param lab: an array of Lab colors of shape `(N, 3)` or `(..., N, 3)`
+    :return: the distance matrix of shape `(N, N)` or `(..., N, N)`
+    :rtype: numpy.ndarray
+    """
+    lab = np.asarray(lab, dtype=float)
+    if lab.ndim < 2:
+        lab = lab.reshape(-1, 3)
+    n = lab.shape[-2]
+
+    i, j = np.triu_indices(n, k=1)
+    distances = np.zeros(lab.shape[:-2] + (n, n), dtype=float)
+    upper = delta_e_cie2000(lab[..., i, :], lab[..., j, :], Kl=Kl, Kc=Kc, Kh=Kh)
+    distances[..., i, j] = upper
+    distances[..., j, i] = upper
+
+    return distances
+
+
+#: the color difference metrics by name, see `register_metric`
+METRICS = {}
+
+#: conversions of the metrics that are Euclidean distances in another color space
+_SPACES = {}
+
+#: the default metric of the benchmarks
+DEFAULT_METRIC = "cie2000"
+
+
+def register_metric(
+    name: str, func: Optional[Callable] = None, space: Optional[Callable] = None
+) -> None:
+    """Register a color difference metric, so that it can be selected by name in the benchmarks, the sorting functions and the charts.
+
+    ```python
+    register_metric("lightness", space=lambda lab: lab[..., :1])
+    delta_e_pairwise(lab_1, lab_2, metric="lightness")
+    ```
+
+    :param name: name of the metric
+    :param func: a function that takes two arrays of Lab colors and returns the distances with broadcasting, e.g., `delta_e_cie2000`
+    :param space: a function that converts Lab colors to a color space. If it is given, the metric is the Euclidean distance in this space and the colors are converted once instead of once for each pair. `func` is optional in this case.
+    """
+    if func is None and space is None:
+        raise ValueError("func or space is required")
+    if func is None:
+
+        def func(lab_1, lab_2):
+            return _euclidean(space(lab_1), space(lab_2))
+
+    METRICS[name] = func
+    if space is not None:
+        _SPACES[name] = space
+    else:
+        _SPACES.pop(name, None)
+
+
+register_metric("cie76", delta_e_cie76, space=np.asarray)
+register_metric("cie94", delta_e_cie94)
+register_metric("cie2000", delta_e_cie2000)
+register_metric("cmc", delta_e_cmc)
+register_metric("oklab", delta_e_oklab, space=_oklab)
+register_metric("cam02ucs", delta_e_cam02ucs, space=lab_to_cam02ucs)
+
+
+def get_metric(metric: Union[str, Callable, None] = None) -> Callable:
+    """Get a registered metric by name.
+
+    :param metric: name of the metric, see `METRICS`, or a function which is returned as it is, defaults to `DEFAULT_METRIC`
+    :return: a function that takes two arrays of Lab colors and returns the distances with broadcasting
+    :rtype: Callable
+    """
+    if metric is None:
+        metric = DEFAULT_METRIC
+    if callable(metric):
+        return metric
+    if metric not in METRICS:
+        raise ValueError(f"metric has to be one of {list(METRICS)}; {metric}")
+
+    return METRICS[metric]
+
+
+def delta_e_pairwise(lab_1, lab_2, metric: Union[str, Callable] = DEFAULT_METRIC):
+    """Calculates the color differences between all the pairs of two lists of Lab colors.
+
+    ```python
+    delta_e_pairwise(lab_1, lab_2, metric="oklab").shape
+    # (N, M)
+    ```
+
+    :param lab_1: an array of Lab colors of shape `(N, 3)`
+    :param lab_2: an array of Lab colors of shape `(M, 3)`
+    :param metric: name of the metric, see `METRICS`, or a function, defaults to `cie2000`
+    :return: the distances of shape `(N, M)`
+    :rtype: numpy.ndarray
+    """
+    lab_1 = np.asarray(lab_1, dtype=float).reshape(-1, 3)
+    lab_2 = np.asarray(lab_2, dtype=float).reshape(-1, 3)
+    if isinstance(metric, str) and metric in _SPACES:
+        lab_1, lab_2 = _SPACES[metric](lab_1), _SPACES[metric](lab_2)
+        metric = _euclidean
+
+    return np.asarray(get_metric(metric)(lab_1[:, None, :], lab_2[None, :, :]))
+
+
+def delta_e_symmetric(lab_1, lab_2, metric: Union[str, Callable] = DEFAULT_METRIC):
+    """Calculates the color differences between arrays of Lab colors, the same in both directions.
+
+    CIE94 and CMC use one of the colors as the reference, so `d(a, b)` and `d(b, a)` differ. This function returns the mean of the two directions for them and for any other function given as `metric`. CIE76, CIEDE2000 and the Euclidean metrics are symmetric and are calculated once.
+
+    :param lab_1: Lab colors with the last axis being (L, a, b)
+    :param lab_2: Lab colors with the last axis being (L, a, b)
+    :param metric: name of the metric, see `METRICS`, or a function, defaults to `cie2000`
+    :return: the distances
+    :rtype: numpy.ndarray
+    """
+    func = get_metric(metric)
+    if metric == "cie2000" or (isinstance(metric, str) and metric in _SPACES):
+        return np.asarray(func(lab_1, lab_2))
+
+    return (np.asarray(func(lab_1, lab_2)) + np.asarray(func(lab_2, lab_1))) / 2
+
+
+def delta_e_matrix(lab, metric: Union[str, Callable] = DEFAULT_METRIC):
+    """Calculates the symmetric distance matrix of a list of Lab colors using a metric.
+
+    Only the upper triangle is computed for the metrics that are not Euclidean distances, see `delta_e_cie2000_matrix`. CIE94 and CMC are not symmetric, their matrices are the mean of both directions, see `delta_e_symmetric`. So the matrix doesn't depend on the order of the colors: permuting the colors permutes the rows and the columns.
+
+    :param lab: an array of Lab colors of shape `(N, 3)` or `(..., N, 3)`
+    :param metric: name of the metric, see `METRICS`, or a function, defaults to `cie2000`
+    :return: the distance matrix of shape `(N, N)` or `(..., N, N)`
+    :rtype: numpy.ndarray
+    """
+    lab = np.asarray(lab, dtype=float)
+    if lab.ndim < 2:
+        lab = lab.reshape(-1, 3)
+    if metric == "cie2000":
+        return delta_e_cie2000_matrix(lab)
+    if isinstance(metric, str) and metric in _SPACES:
+        x = _SPACES[metric](lab)
+        return _euclidean(x[..., :, None, :], x[..., None, :, :])
+
+    n = lab.shape[-2]
+    i, j = np.triu_indices(n, k=1)
+    distances = np.zeros(lab.shape[:-2] + (n, n), dtype=float)
+    upper = delta_e_symmetric(lab[..., i, :], lab[..., j, :], metric)
+    distances[..., i, j] = upper
+    distances[..., j, i] = upper
+
+    return distances
@@ -0,0 +1,141 @@
+import json
+import re
+from pathlib import Path
+from typing import Iterator, Union
+
+from loguru import logger
+
+from colorteller.teller import ColorTeller
+
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+
+# the `colors` array if it has no nested arrays
+_COLORS_ARRAY = re.compile(r'"colors"\s*:\s*\[([^\[\]]*)\]')
+_COLORS_HEX = re.compile(r'"hex"\s*:\s*"([^"]*)"')
+_NESTED_OBJECT = re.compile(r"\{[^}]*\{")
+_JSON_STRING = re.compile(r'"(?:[^"\\]|\\.)*"')
+_OTHER_BRACKETS = re.compile(r"[\[\]}]")
+
+
+def _depth(text: str) -> int:
+    """Nesting depth of json objects and arrays at the end of `text`, ignoring brackets in strings."""
+    if text.count("{") == 1 and not _OTHER_BRACKETS.search(text):
+        return 1
+
+    text = _JSON_STRING.sub("", text)
+
+    return text.count("{") + text.count("[") - text.count("}") - text.count("]")
+
+
+def loads(data_raw: Union[str, bytes]):
+    """Parse a json string using [orjson](https://github.com/ijl/orjson) if it is installed, otherwise using the json module in the standard library.
+
+    :param data_raw: a json string
+    :return: the parsed object
+    """
+    return _json_loads(data_raw)
+
+
+def extract_hex_strings(line: str, parser: str = "regex") -> list:
+    """Extract the hex strings from one record of the colorteller web service.
+
+    With `parser="regex"`, the `colors[].hex` values are extracted from the raw string without parsing the whole record. The record is parsed as json instead if the `colors` array is not found at the top level of the record, if it has escaped characters, or if it is not a simple list of flat objects with one `hex` value each, e.g., if there are brackets in the names.
+
+    With `parser="json"`, the whole record is parsed and `ColorTeller.get_hex_strings` is used. Both parsers return the same hex strings for valid records.
+
+    ```python
+    line = '{"colors":[{"hex":"#8de4d3","name":""},{"hex":"#344b46"}],"hex":["8de4d3","344b46"]}'
+    extract_hex_strings(line)
+    # ['#8de4d3', '#344b46']
+    ```
+
+    !!! warning
+        The regex parser doesn't validate the json record.
+
+    :param line: one json record from the colorteller web service
+    :param parser: `regex` or `json`, defaults to `regex`
+    :return: a list of hex strings
+    :rtype: list
+    """
+    if parser == "regex":
+        colors_array = (
+            _COLORS_ARRAY.search(line) if line.count('"colors"') == 1 else None
+        )
+        # only the top level `colors`, without escaped characters
+        if (
+            colors_array is not None
+            and "\\" not in colors_array.group(1)
+            and _depth(line[: colors_array.start()]) == 1
+        ):
+            colors_raw = colors_array.group(1)
+            hex_strings = _COLORS_HEX.findall(colors_raw)
+            if len(hex_strings) == colors_raw.count("{") and not _NESTED_OBJECT.search(
+                colors_raw
+            ):
+                return hex_strings
+    elif parser != "json":
+        raise ValueError(f"parser has to be regex or json; {parser}")
+
+    colorteller_raw = loads(line)
+    if not isinstance(colorteller_raw, dict):
+        raise TypeError(f"colorteller record has to be a dict; {line}")
+
+    return ColorTeller(colorteller_raw=colorteller_raw).hex_strings
+
+
+def iter_jsonl(
+    source,
+    as_hex: bool = False,
+    parser: str = "regex",
+    errors: str = "raise",
+) -> Iterator[Union[ColorTeller, list]]:
+    """Read a [JSON Lines](https://jsonlines.org) file of colorteller web service records one line at a time.
+
+    Only one line is held in memory at a time, so the memory usage doesn't depend on the size of the file. Empty lines are skipped.
+
+    ```python
+    from colorteller.utils.jsonl import iter_jsonl
+
+    for ct in iter_jsonl("palettes.jsonl"):
+        print(ct.hex)
+    ```
+
+    :param source: path to the file, or a file object opened in text or binary mode.
+    :param as_hex: whether to yield lists of hex strings instead of ColorTeller objects, defaults to False
+    :param parser: `regex` or `json`, see `extract_hex_strings`, defaults to `regex`
+    :param errors: what to do with invalid lines, `raise` or `skip`, defaults to `raise`
+    :return: an iterator of ColorTeller objects or lists of hex strings
+    """
+    if errors not in ("raise", "skip"):
+        raise ValueError(f"errors has to be raise or skip; {errors}")
+
+    if isinstance(source, (str, Path)):
+        with open(source, "r", encoding="utf-8") as fp:
+            yield from iter_jsonl(fp, as_hex=as_hex, parser=parser, errors=errors)
+        return
+
+    for line_number, line in enumerate(source, start=1):
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+        line = line.strip()
+        if not line:
+            continue
+
+        try:
+            hex_strings = extract_hex_strings(line, parser=parser)
+        except Exception as e:
+            if errors == "raise":
+                raise ValueError(f"Could not parse line {line_number}: {e}") from e
+            logger.warning(f"Skipping line {line_number}: {e}")
+            continue
+
+        if as_hex:
+            yield hex_strings
+        else:
+            yield ColorTeller(hex_strings=hex_strings)
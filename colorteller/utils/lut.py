@@ -0,0 +1,135 @@
+import os
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+from loguru import logger
+
+from colorteller.utils.color import rgb_to_lab
+
+#: number of 24-bit sRGB colors
+LUT_SIZE = 2**24
+
+#: environment variable of the path of the lookup table
+LUT_ENV = "COLORTELLER_LUT"
+
+_LUTS = {}
+
+
+def lut_path() -> Optional[Path]:
+    """The path of the lookup table set by the environment variable `COLORTELLER_LUT`.
+
+    The table is opt-in: its values are float32, so the Lab values and the metrics calculated with it differ slightly (about `1e-5`) from the direct conversion. Without the environment variable, the table is not used.
+
+    :return: the path, or None if the environment variable is not set
+    :rtype: Optional[Path]
+    """
+    path = os.environ.get(LUT_ENV)
+    if not path:
+        return None
+
+    return Path(path)
+
+
+def rgb_to_index(rgb) -> np.ndarray:
+    """Convert rgb values to the indices in the lookup table, i.e., the 24-bit integer `0xRRGGBB`.
+
+    :param rgb: an uint8 array of rgb values with the last axis being (r, g, b)
+    :return: an array of indices
+    :rtype: numpy.ndarray
+    """
+    rgb = np.asarray(rgb, dtype=np.uint32)
+
+    return (rgb[..., 0] << 16) | (rgb[..., 1] << 8) | rgb[..., 2]
+
+
+def build_lut(
+    path: Optional[Union[str, Path]] = None, chunk_size: int = 2**20
+) -> Path:
+    """Build the lookup table of the Lab values of all the 24-bit sRGB colors.
+
+    The table is a float32 array of shape `(2**24, 3)` (about 200 MB) saved as a `.npy` file. Row `0xRRGGBB` is the Lab value of the color `#RRGGBB`.
+
+    :param path: where to save the table, defaults to `lut_path`
+    :param chunk_size: number of colors converted at once, defaults to 2**20
+    :return: the path of the table
+    :rtype: Path
+    """
+    if path is None:
+        path = lut_path()
+    if path is None:
+        raise ValueError(f"path is required if {LUT_ENV} is not set")
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    # write to a temporary file so that readers never see a partial table
+    path_tmp = path.with_name(f"{path.name}.tmp")
+    lut = np.lib.format.open_memmap(
+        path_tmp, mode="w+", dtype=np.float32, shape=(LUT_SIZE, 3)
+    )
+    for start in range(0, LUT_SIZE, chunk_size):
+        index = np.arange(start, min(start + chunk_size, LUT_SIZE), dtype=np.uint32)
+        rgb = np.stack([index >> 16, (index >> 8) & 0xFF, index & 0xFF], axis=-1)
+        lut[start : start + len(index)] = rgb_to_lab(rgb.astype(np.uint8))
+        logger.debug(f"Built lookup table for {start + len(index)} colors")
+    lut.flush()
+    del lut
+    os.replace(path_tmp, path)
+    _LUTS.pop(str(path), None)
+
+    return path
+
+
+def load_lut(path: Optional[Union[str, Path]] = None) -> Optional[np.ndarray]:
+    """Open the lookup table as a read-only memory-mapped array.
+
+    The table is opened once per process. Processes that use the same table share the pages through the page cache of the operating system. A missing table is not remembered, so a table built later is used.
+
+    :param path: path of the table, defaults to `lut_path`
+    :return: the memory-mapped table or None if there is no path or the file doesn't exist.
+    :rtype: Optional[numpy.ndarray]
+    """
+    if path is None:
+        path = lut_path()
+    if path is None:
+        return None
+    key = str(path)
+
+    if key not in _LUTS:
+        if not Path(path).exists():
+            return None
+        lut = np.load(path, mmap_mode="r")
+        if lut.shape != (LUT_SIZE, 3):
+            raise ValueError(f"lookup table {path} has a wrong shape {lut.shape}")
+        _LUTS[key] = lut
+
+    return _LUTS[key]
+
+
+def lookup_lab(rgb, lut: np.ndarray) -> np.ndarray:
+    """Look up the Lab values of rgb values in a lookup table.
+
+    :param rgb: an uint8 array of rgb values with the last axis being (r, g, b)
+    :param lut: the lookup table, see `build_lut`
+    :return: the Lab values as float64
+    :rtype: numpy.ndarray
+    """
+    return lut[rgb_to_index(rgb)].astype(float)
+
+
+def rgb_to_lab_lut(rgb, path: Optional[Union[str, Path]] = None) -> np.ndarray:
+    """Convert rgb values to Lab using the lookup table if it is enabled and exists, otherwise using `utils.color.rgb_to_lab`.
+
+    !!! note
+        The table is opt-in, using `path` or the environment variable `COLORTELLER_LUT`, see `lut_path`. The values in the table are float32, which are within about `1e-5` of the direct conversion.
+
+    :param rgb: an uint8 array of rgb values with the last axis being (r, g, b)
+    :param path: path of the table, defaults to `lut_path`
+    :return: the Lab values
+    :rtype: numpy.ndarray
+    """
+    lut = load_lut(path)
+    if lut is None:
+        return rgb_to_lab(rgb)
+
+    return lookup_lab(rgb, lut)
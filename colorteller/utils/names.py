@@ -0,0 +1,211 @@
+from functools import lru_cache
+from typing import Optional, Union
+
+import numpy as np
+
+from colorteller.utils.color import hex_to_lab
+from colorteller.utils.delta_e import delta_e_cie2000
+from colorteller.utils.neighbors import SAFETY, compress_chroma
+
+
+@lru_cache(maxsize=None)
+def _ring_offsets(r: int) -> np.ndarray:
+    """Offsets of the grid cells at Chebyshev distance `r`, an array of shape (M, 3)."""
+    side = np.arange(-r, r + 1)
+    offsets = np.stack(np.meshgrid(side, side, side, indexing="ij"), axis=-1)
+    offsets = offsets.reshape(-1, 3)
+    offsets = offsets[np.abs(offsets).max(axis=1) == r]
+    offsets.setflags(write=False)
+
+    return offsets
+
+
+def _top_k(n: int, k: int, query, indices, distances):
+    """The k smallest distances of each of the n queries, ties broken by the smaller index.
+
+    :return: the indices and the distances, both of shape (n, k), padded with -1 and inf
+    """
+    order = np.lexsort((indices, distances, query))
+    query, indices, distances = query[order], indices[order], distances[order]
+    rank = np.arange(len(query)) - np.searchsorted(query, query)
+    keep = rank < k
+
+    top_indices = np.full((n, k), -1, dtype=np.int64)
+    top_distances = np.full((n, k), np.inf)
+    top_indices[query[keep], rank[keep]] = indices[keep]
+    top_distances[query[keep], rank[keep]] = distances[keep]
+
+    return top_indices, top_distances
+
+
+class NamedColorIndex:
+    """A spatial index of named colors to find the names of colors.
+
+    The named colors are bucketed in a grid in the space of `utils.neighbors.compress_chroma`. For each query, the grid cells around the color are searched ring by ring, and the named colors in the cells are compared using CIEDE2000. All the queries are searched at once, one ring at a time.
+
+    ```python
+    from colorteller.utils.names import NamedColorIndex
+
+    index = NamedColorIndex({"black": "#000000", "white": "#ffffff", "red": "#ff0000"})
+    index.query(["#fe0101", "#111111"], k=1)
+    # [[{'name': 'red', 'hex': '#ff0000', 'delta_e': 0.5...}],
+    #  [{'name': 'black', 'hex': '#000000', 'delta_e': 5.1...}]]
+    ```
+
+    !!! note
+        The colors outside of ring `r` are at least `r * cell_size` away in the compressed space. The search stops once the k-th nearest named color found is closer than `r * cell_size / safety` in CIEDE2000. For sRGB colors, the ratio of the distance in the compressed space to CIEDE2000 is below 2.8 in our samples, so with the default `safety` the results are the same as a linear scan using CIEDE2000.
+
+    :param named_colors: a dict of names to hex strings, or a list of (name, hex string) pairs.
+    :param cell_size: size of the grid cells in the compressed space, defaults to `(3e6 / len(named_colors)) ** (1 / 3)` but at least 5, i.e., larger cells for fewer named colors
+    :param safety: ratio of the distance in the compressed space to CIEDE2000, defaults to `utils.neighbors.SAFETY["cie2000"]`
+    """
+
+    def __init__(
+        self,
+        named_colors: Union[dict, list],
+        cell_size: Optional[float] = None,
+        safety: Optional[float] = None,
+    ) -> None:
+        if isinstance(named_colors, dict):
+            named_colors = list(named_colors.items())
+        if not named_colors:
+            raise ValueError("named_colors is empty")
+
+        self.names = [n for n, _ in named_colors]
+        self.hex = [h if h.startswith("#") else f"#{h}" for _, h in named_colors]
+        self.lab = hex_to_lab(self.hex)
+        if cell_size is None:
+            # a few named colors in each cell
+            cell_size = max(5.0, (3e6 / len(named_colors)) ** (1 / 3))
+        self.cell_size = cell_size
+        self.safety = SAFETY["cie2000"] if safety is None else safety
+
+        self._points = compress_chroma(self.lab)
+
+        # the named colors sorted by the key of their cells
+        cells = self._cell(self._points)
+        self._cell_min = cells.min(axis=0)
+        self._cell_max = cells.max(axis=0)
+        self._dims = self._cell_max - self._cell_min + 1
+        keys = np.ravel_multi_index((cells - self._cell_min).T, self._dims)
+        self._order = np.argsort(keys, kind="stable")
+        self._keys, self._starts, counts = np.unique(
+            keys[self._order], return_index=True, return_counts=True
+        )
+        self._ends = self._starts + counts
+
+    def __len__(self):
+        return len(self.names)
+
+    def _cell(self, points):
+        return np.floor(points / self.cell_size).astype(np.int64)
+
+    def _ring_candidates(self, cells: np.ndarray, r: int):
+        """The named colors in the cells at Chebyshev distance `r` of each cell.
+
+        :param cells: the cells of the queries, an array of shape (N, 3)
+        :return: the positions of the queries in `cells` and the indices of the named colors, one pair for each candidate
+        """
+        neighbours = cells[:, None, :] + _ring_offsets(r)[None, :, :] - self._cell_min
+        inside = np.all((neighbours >= 0) & (neighbours < self._dims), axis=-1)
+        query, offset = np.nonzero(inside)
+        keys = np.ravel_multi_index(neighbours[query, offset].T, self._dims)
+
+        position = np.minimum(np.searchsorted(self._keys, keys), len(self._keys) - 1)
+        found = self._keys[position] == keys
+        query, position = query[found], position[found]
+
+        counts = self._ends[position] - self._starts[position]
+        within = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        named = self._order[np.repeat(self._starts[position], counts) + within]
+
+        return np.repeat(query, counts), named
+
+    def query_lab(self, lab, k: int = 1):
+        """Find the k nearest named colors for each Lab color.
+
+        :param lab: an array of Lab colors of shape (N, 3)
+        :param k: number of named colors for each color, defaults to 1
+        :return: the indices of the named colors and the CIEDE2000 distances, both of shape (N, k)
+        :rtype: tuple
+        """
+        lab = np.asarray(lab, dtype=float).reshape(-1, 3)
+        if not 1 <= k <= len(self):
+            raise ValueError(
+                f"k has to be between 1 and the number of named colors ({len(self)}); {k}"
+            )
+
+        n = len(lab)
+        points = compress_chroma(lab)
+        cells = self._cell(points)
+        # the ring beyond which there are no named colors
+        max_rings = np.maximum(
+            np.abs(cells - self._cell_min), np.abs(cells - self._cell_max)
+        ).max(axis=1, initial=0)
+
+        indices = np.full((n, k), -1, dtype=np.int64)
+        distances = np.full((n, k), np.inf)
+        active = np.arange(n)
+        r = 0
+        while len(active):
+            query, named = self._ring_candidates(cells[active], r)
+            query = active[query]
+
+            # only the candidates that may be closer than the k-th nearest named color found so far
+            kth = distances[query, -1]
+            close = np.linalg.norm(self._points[named] - points[query], axis=-1)
+            close = close <= self.safety * kth
+            query, named = query[close], named[close]
+            candidate_distances = delta_e_cie2000(lab[query], self.lab[named])
+            close = candidate_distances <= kth[close]
+            query, named = query[close], named[close]
+
+            if len(query):
+                found = indices >= 0
+                indices, distances = _top_k(
+                    n,
+                    k,
+                    np.concatenate([np.nonzero(found)[0], query]),
+                    np.concatenate([indices[found], named]),
+                    np.concatenate([distances[found], candidate_distances[close]]),
+                )
+
+            # the named colors outside of ring r are at least r * cell_size / safety away in CIEDE2000
+            active = active[
+                (distances[active, -1] > r * self.cell_size / self.safety)
+                & (max_rings[active] > r)
+            ]
+            r += 1
+
+        return indices, distances
+
+    def query(self, hex_strings: list, k: int = 1) -> list:
+        """Find the k nearest named colors for each color in a palette.
+
+        :param hex_strings: a list of hex strings
+        :param k: number of named colors for each color, defaults to 1
+        :return: a list with a list of k named colors for each color, each named color is a dict with `name`, `hex` and `delta_e`.
+        :rtype: list
+        """
+        indices, distances = self.query_lab(hex_to_lab(hex_strings), k=k)
+
+        return [
+            [
+                {"name": self.names[i], "hex": self.hex[i], "delta_e": d}
+                for i, d in zip(row_indices, row_distances)
+            ]
+            for row_indices, row_distances in zip(
+                indices.tolist(), distances.tolist()
+            )
+        ]
+
+    def name(self, hex_strings: list) -> list:
+        """Find the name of each color in a palette.
+
+        :param hex_strings: a list of hex strings
+        :return: a list of names
+        :rtype: list
+        """
+        indices, _ = self.query_lab(hex_to_lab(hex_strings), k=1)
+
+        return [self.names[i] for i in indices[:, 0].tolist()]
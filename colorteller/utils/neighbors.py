@@ -0,0 +1,212 @@
+from typing import Optional, Union
+
+import numpy as np
+
+from colorteller.utils.delta_e import (
+    DEFAULT_METRIC,
+    _SPACES,
+    delta_e_symmetric,
+    get_metric,
+)
+
+#: ratios of the search radius to the threshold for the metrics that are not Euclidean distances, see `close_pairs`
+SAFETY = {"cie2000": 3.0, "cie94": 2.0, "cmc": 4.0}
+
+#: the ratio of the search radius to the threshold for the other metrics
+DEFAULT_SAFETY = 4.0
+
+#: the chroma factor of `compress_chroma`, the same as `S_C` of CIEDE2000 and CIE94
+CHROMA_FACTOR = 0.045
+
+# the 13 neighbouring cells in one half of the 3 x 3 x 3 block, the other half is found from the other cell
+_HALF_OFFSETS = np.array(
+    [
+        (i, j, k)
+        for i in (-1, 0, 1)
+        for j in (-1, 0, 1)
+        for k in (-1, 0, 1)
+        if (i, j, k) > (0, 0, 0)
+    ],
+    dtype=np.int64,
+)
+
+
+def compress_chroma(lab, k: float = CHROMA_FACTOR) -> np.ndarray:
+    """Compress the chroma of Lab colors to `log(1 + k C) / k`, keeping L and the hue.
+
+    The chroma weighting `S_C = 1 + k C` of CIEDE2000 makes a difference in chroma less noticable for saturated colors. In the compressed space, the Euclidean distance is much closer to CIEDE2000 than in Lab, which makes it a good space to search for the candidates of close pairs.
+
+    :param lab: Lab colors with the last axis being (L, a, b)
+    :param k: the chroma factor, defaults to `CHROMA_FACTOR`
+    :return: the compressed colors with the last axis being (L, a, b)
+    :rtype: numpy.ndarray
+    """
+    lab = np.asarray(lab, dtype=float)
+    chroma = np.hypot(lab[..., 1], lab[..., 2])
+    scale = np.ones_like(chroma)
+    np.divide(np.log1p(k * chroma), k * chroma, out=scale, where=chroma > 0)
+
+    compressed = lab.copy()
+    compressed[..., 1:] *= scale[..., None]
+
+    return compressed
+
+
+def _cell_pairs(cells: np.ndarray):
+    """Pairs of occupied cells that are neighbours, including each cell with itself."""
+    n_cells = len(cells)
+    lower = cells.min(axis=0) - 1
+    dims = cells.max(axis=0) - lower + 2
+    keys = np.ravel_multi_index((cells - lower).T, dims)
+    order = np.argsort(keys)
+    keys_sorted = keys[order]
+
+    first = [np.arange(n_cells)]
+    second = [np.arange(n_cells)]
+    for offset in _HALF_OFFSETS:
+        neighbour_keys = np.ravel_multi_index((cells - lower + offset).T, dims)
+        position = np.minimum(np.searchsorted(keys_sorted, neighbour_keys), n_cells - 1)
+        found = keys_sorted[position] == neighbour_keys
+        first.append(np.flatnonzero(found))
+        second.append(order[position[found]])
+
+    return np.concatenate(first), np.concatenate(second)
+
+
+def _blocks(first, second, starts, counts, chunk_size):
+    """Split the candidate pairs of the cell pairs into blocks of about `chunk_size` pairs.
+
+    Each block is (start_1, length_1, start_2, length_2, same_cell), large cells are split by rows.
+    """
+    n_1, n_2 = counts[first], counts[second]
+    rows_per_block = np.maximum(chunk_size // np.maximum(n_2, 1), 1)
+    n_blocks = -(-n_1 // rows_per_block)
+
+    pair = np.repeat(np.arange(len(first)), n_blocks)
+    block = np.arange(len(pair)) - np.repeat(np.cumsum(n_blocks) - n_blocks, n_blocks)
+    row_start = block * rows_per_block[pair]
+    length_1 = np.minimum(rows_per_block[pair], n_1[pair] - row_start)
+
+    return (
+        starts[first][pair] + row_start,
+        length_1,
+        starts[second][pair],
+        n_2[pair],
+        first[pair] == second[pair],
+    )
+
+
+def _expand(start_1, length_1, start_2, length_2, same_cell):
+    """All the candidate pairs of a group of blocks, as positions in the sorted colors."""
+    sizes = length_1 * length_2
+    block = np.repeat(np.arange(len(sizes)), sizes)
+    k = np.arange(sizes.sum()) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+    i = start_1[block] + k // length_2[block]
+    j = start_2[block] + k % length_2[block]
+    # within a cell, only the pairs in the upper triangle
+    keep = ~same_cell[block] | (i < j)
+
+    return i[keep], j[keep]
+
+
+def close_pairs(
+    lab,
+    threshold: Union[int, float] = 5,
+    metric: str = DEFAULT_METRIC,
+    safety: Optional[float] = None,
+    chunk_size: int = 2**20,
+) -> dict:
+    """Find the pairs of colors that are closer than a threshold, without the N^2 distance matrix.
+
+    This is the sparse counterpart of the `noticable` matrix of `utils.benchmark.PerceptualDistanceBenchmark`, i.e., the pairs that are not noticable, for very large sets of colors.
+
+    ```python
+    from colorteller.utils.color import hex_to_lab
+    from colorteller.utils.neighbors import close_pairs
+
+    pairs = close_pairs(hex_to_lab(hex_strings), threshold=5)
+    for i, j, d in zip(pairs["rows"], pairs["cols"], pairs["distances"]):
+        print(hex_strings[i], hex_strings[j], d)
+    ```
+
+    The colors are put into the cells of a grid, of which the size is the search radius. Only the colors in the same or neighbouring cells are candidates, and the candidates are checked using the exact metric in vectorized chunks of `chunk_size` pairs.
+
+    !!! note "Search radius"
+        For the metrics that are Euclidean distances in a color space, e.g., `cie76`, `oklab` and `cam02ucs`, the grid is built in that space with the radius being the threshold, so no pair is missed.
+
+        For the other metrics, e.g., `cie2000`, the grid is built in the space of `compress_chroma` with the radius being `safety` times the threshold. For the pairs of sRGB colors within a distance of 5 that we have sampled, the ratio of the distance in this space to the metric is at most 2.4 for CIEDE2000, 1.2 for CIE94 and 2.9 for CMC. The defaults in `SAFETY` leave a margin. A larger `safety` is slower but more conservative, and it should be set for the metrics added using `utils.delta_e.register_metric`.
+
+    CIE94 and CMC are not symmetric. Same as `utils.delta_e.delta_e_matrix`, the distances are the mean of both directions, see `utils.delta_e.delta_e_symmetric`, so the pairs don't depend on the order of the colors.
+
+    :param lab: an array of Lab colors of shape (N, 3)
+    :param threshold: the max distance of the pairs, defaults to 5
+    :param metric: name of the color difference metric, see `utils.delta_e.METRICS`, defaults to `cie2000`
+    :param safety: ratio of the search radius to the threshold, defaults to 1 for the Euclidean metrics, the value in `SAFETY`, or `DEFAULT_SAFETY`
+    :param chunk_size: approximate number of candidate pairs checked at once, which bounds the memory used, defaults to 2**20
+    :return: the pairs in COO format, i.e., the arrays `rows` and `cols` of the indices of the colors with `rows < cols`, and `distances`, sorted by `rows` and `cols`
+    :rtype: dict
+    """
+    lab = np.asarray(lab, dtype=float).reshape(-1, 3)
+    # raises ValueError for unknown metrics
+    get_metric(metric)
+    if metric in _SPACES:
+        points = np.asarray(_SPACES[metric](lab), dtype=float)
+        if safety is None:
+            safety = 1.0
+        else:
+            safety = max(safety, 1.0)
+    else:
+        points = compress_chroma(lab)
+        if safety is None:
+            safety = SAFETY.get(metric, DEFAULT_SAFETY)
+    radius = threshold * safety
+
+    rows, cols, distances = [], [], []
+    if len(lab) > 1 and radius > 0:
+        cell_of_point = np.floor(points / radius).astype(np.int64)
+        cells, cell_index, counts = np.unique(
+            cell_of_point, axis=0, return_inverse=True, return_counts=True
+        )
+        cell_index = cell_index.reshape(-1)
+        # colors sorted by cell, so that the colors of a cell are contiguous
+        order = np.argsort(cell_index, kind="stable")
+        starts = np.cumsum(counts) - counts
+        points_sorted = points[order]
+
+        first, second = _cell_pairs(cells)
+        start_1, length_1, start_2, length_2, same_cell = _blocks(
+            first, second, starts, counts, chunk_size
+        )
+        n_pairs = np.cumsum(length_1 * length_2)
+        group = n_pairs // max(chunk_size, 1)
+        bounds = np.flatnonzero(np.diff(group)) + 1
+        for blocks in np.split(np.arange(len(start_1)), bounds):
+            if not len(blocks):
+                continue
+            i, j = _expand(
+                start_1[blocks],
+                length_1[blocks],
+                start_2[blocks],
+                length_2[blocks],
+                same_cell[blocks],
+            )
+            diff = points_sorted[i] - points_sorted[j]
+            near = np.einsum("ij,ij->i", diff, diff) <= radius**2
+            i, j = order[i[near]], order[j[near]]
+            i, j = np.minimum(i, j), np.maximum(i, j)
+            d = delta_e_symmetric(lab[i], lab[j], metric)
+            close = d <= threshold
+            rows.append(i[close])
+            cols.append(j[close])
+            distances.append(d[close])
+
+    rows = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int64)
+    cols = np.concatenate(cols) if cols else np.zeros(0, dtype=np.int64)
+    distances = np.concatenate(distances) if distances else np.zeros(0)
+    sort = np.lexsort((cols, rows))
+
+    return {
+        "rows": rows[sort],
+        "cols": cols[sort],
+        "distances": distances[sort],
+    }
@@ -0,0 +1,156 @@
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Iterable, Optional
+
+#: the context manager used for the stages when profiling is disabled
+NO_STAGE = nullcontext()
+
+#: the stage name of the total of a benchmark method
+TOTAL = "total"
+
+
+def _empty_stats() -> dict:
+    return {"calls": 0, "time": 0.0, "allocated": 0, "peak_memory": None}
+
+
+class Profiler:
+    """Collect timing, call counts and allocation stats of the benchmark methods and their stages.
+
+    The benchmarks in `colorteller.utils.benchmark` mark the stages of `metric`, e.g., `conversion`, `pairwise` and `thresholding`. A profiler is passed to `teller.Colors.metrics` to record them.
+
+    ```python
+    from colorteller import teller
+    from colorteller.utils import benchmark
+    from colorteller.utils.profile import Profiler
+
+    profiler = Profiler(callbacks=[print])
+    c = teller.Colors(color_palette=["#8de4d3", "#344b46", "#74ee65"])
+    c.metrics(methods=[benchmark.PerceptualDistanceBenchmark], profiler=profiler)
+    profiler.stats["perceptual_distance"]["stages"]["pairwise"]
+    # {'calls': 1, 'time': 4.1e-05, 'allocated': 0, 'peak_memory': None}
+    ```
+
+    Each callback is called with an event dict when a stage (or a method, with `stage` being `"total"`) finishes. The event has the keys `method`, `stage`, `time` in seconds, and `allocated` and `peak_memory` in bytes.
+
+    !!! note "Memory"
+        The allocation stats are only recorded if `trace_memory` is `True`, as `tracemalloc` slows down the calculations considerably. `allocated` is the net memory allocated in the stage and `peak_memory` is the peak memory used in the stage on top of the memory at the start. `peak_memory` requires Python 3.9 or later.
+
+    :param callbacks: functions to call with each event, defaults to None
+    :param trace_memory: whether to record the allocation stats using `tracemalloc`, defaults to False
+    """
+
+    def __init__(
+        self, callbacks: Optional[Iterable[Callable]] = None, trace_memory: bool = False
+    ) -> None:
+        self.callbacks = list(callbacks or [])
+        self.trace_memory = trace_memory
+        self.stats = {}
+        self._method = None
+        self._memory_stack = []
+        self._lock = threading.Lock()
+
+    def add_callback(self, callback: Callable) -> None:
+        """Add a function to call with each event."""
+        self.callbacks.append(callback)
+
+    def reset(self) -> None:
+        """Remove all the recorded stats."""
+        with self._lock:
+            self.stats = {}
+
+    def record(self, event: dict) -> None:
+        """Add an event to the stats and pass it to the callbacks.
+
+        Events are recorded by `stage` and `method`. It can also be used as a callback of another profiler, to aggregate the stats of many `metrics` calls.
+
+        :param event: a dict with the keys `method`, `stage`, `time`, `allocated` and `peak_memory`.
+        """
+        with self._lock:
+            method_stats = self.stats.setdefault(
+                event["method"], {**_empty_stats(), "stages": {}}
+            )
+            if event["stage"] == TOTAL:
+                stats = method_stats
+            else:
+                stats = method_stats["stages"].setdefault(
+                    event["stage"], _empty_stats()
+                )
+            stats["calls"] += 1
+            stats["time"] += event["time"]
+            if event["allocated"] is not None:
+                stats["allocated"] += event["allocated"]
+            if event["peak_memory"] is not None:
+                stats["peak_memory"] = max(stats["peak_memory"] or 0, event["peak_memory"])
+
+        for callback in self.callbacks:
+            callback(event)
+
+    @contextmanager
+    def method(self, name: str):
+        """Profile a benchmark method. The stages inside are recorded for this method."""
+        previous, self._method = self._method, name
+        try:
+            with self._measure(TOTAL):
+                yield
+        finally:
+            self._method = previous
+
+    def stage(self, name: str):
+        """Profile a stage of the current benchmark method."""
+        return self._measure(name)
+
+    @contextmanager
+    def _measure(self, stage: str):
+        memory = self._start_memory() if self.trace_memory else None
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            allocated, peak_memory = (
+                self._stop_memory(memory) if memory is not None else (None, None)
+            )
+            self.record(
+                {
+                    "method": self._method,
+                    "stage": stage,
+                    "time": elapsed,
+                    "allocated": allocated,
+                    "peak_memory": peak_memory,
+                }
+            )
+
+    def _start_memory(self) -> dict:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            started = True
+        else:
+            started = False
+        current, peak = tracemalloc.get_traced_memory()
+        # the peak of the enclosing stage so far, before resetting the peak for this stage
+        if self._memory_stack:
+            parent = self._memory_stack[-1]
+            parent["peak"] = max(parent["peak"], peak)
+        if hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+        memory = {"start": current, "peak": current, "started": started}
+        self._memory_stack.append(memory)
+
+        return memory
+
+    def _stop_memory(self, memory: dict):
+        current, peak = tracemalloc.get_traced_memory()
+        self._memory_stack.pop()
+        memory["peak"] = max(memory["peak"], peak)
+        if self._memory_stack:
+            parent = self._memory_stack[-1]
+            parent["peak"] = max(parent["peak"], memory["peak"])
+        if memory["started"]:
+            tracemalloc.stop()
+
+        if not hasattr(tracemalloc, "reset_peak"):
+            return current - memory["start"], None
+
+        return current - memory["start"], memory["peak"] - memory["start"]
@@ -0,0 +1,254 @@
+import json
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+
+from colorteller.utils.benchmark import ColorsBenchmark
+
+#: formats of the metrics files
+FORMATS = ("json", "condensed", "npz")
+
+_HEADER_KEY = "__header__"
+
+
+def condense(matrix) -> np.ndarray:
+    """Condense a symmetric matrix to its upper triangle without the diagonal, in row-major order.
+
+    The last two axes are condensed, so a stack of matrices of shape (K, N, N) becomes (K, N * (N - 1) / 2).
+
+    ```python
+    condense([[0, 1, 2], [1, 0, 3], [2, 3, 0]])
+    # array([1, 2, 3])
+    ```
+
+    :param matrix: a symmetric matrix of shape (..., N, N)
+    :return: the condensed matrix of shape (..., N * (N - 1) / 2)
+    :rtype: numpy.ndarray
+    """
+    matrix = np.asarray(matrix)
+    i, j = np.triu_indices(matrix.shape[-1], k=1)
+
+    return matrix[..., i, j]
+
+
+def condensed_size(length: int) -> int:
+    """The size N of the matrix of a condensed matrix of length N * (N - 1) / 2."""
+    n = int(round((1 + np.sqrt(1 + 8 * length)) / 2))
+    if n * (n - 1) // 2 != length:
+        raise ValueError(f"{length} is not the length of a condensed matrix")
+
+    return n
+
+
+def squareform(condensed, diagonal=0) -> np.ndarray:
+    """Expand a condensed matrix to the full symmetric matrix, the inverse of `condense`.
+
+    :param condensed: the condensed matrix of shape (..., N * (N - 1) / 2)
+    :param diagonal: the value of the diagonal, defaults to 0 (False for boolean matrices)
+    :return: the full matrix of shape (..., N, N)
+    :rtype: numpy.ndarray
+    """
+    condensed = np.asarray(condensed)
+    n = condensed_size(condensed.shape[-1])
+    i, j = np.triu_indices(n, k=1)
+
+    matrix = np.full(condensed.shape[:-1] + (n, n), diagonal, dtype=condensed.dtype)
+    matrix[..., i, j] = condensed
+    matrix[..., j, i] = condensed
+
+    return matrix
+
+
+def _benchmark_classes(cls=ColorsBenchmark):
+    for sub in cls.__subclasses__():
+        yield sub
+        yield from _benchmark_classes(sub)
+
+
+def pairwise_fields(method: str) -> tuple:
+    """The pairwise fields of a benchmark method, see `utils.benchmark.ColorsBenchmark`.
+
+    :param method: name of the method, e.g., `perceptual_distance`
+    :return: names of the pairwise fields, empty if the method is unknown.
+    :rtype: tuple
+    """
+    for cls in _benchmark_classes():
+        if cls.method == method:
+            return cls.pairwise_fields
+
+    return ()
+
+
+def condense_metrics(metrics: list) -> list:
+    """Condense the pairwise fields of the metrics, e.g., `distances` and `noticable` of `perceptual_distance`.
+
+    The condensed fields are numpy arrays and their names are listed in the `condensed` key of each metric. The other fields are not copied.
+
+    :param metrics: metrics from `teller.Colors.metrics`
+    :return: the condensed metrics
+    :rtype: list
+    """
+    condensed_metrics = []
+    for metric in metrics:
+        if metric.get("condensed"):
+            condensed_metrics.append(metric)
+            continue
+        fields = [f for f in pairwise_fields(metric["method"]) if f in metric["data"]]
+        if not fields:
+            condensed_metrics.append(metric)
+            continue
+        data = {**metric["data"], **{f: condense(metric["data"][f]) for f in fields}}
+        condensed_metrics.append({**metric, "data": data, "condensed": fields})
+
+    return condensed_metrics
+
+
+def expand_metrics(metrics: list) -> list:
+    """Expand the condensed fields of the metrics to the full matrices, the inverse of `condense_metrics`.
+
+    :param metrics: condensed metrics, e.g., from `load_metrics`
+    :return: the metrics with the full matrices as numpy arrays
+    :rtype: list
+    """
+    expanded_metrics = []
+    for metric in metrics:
+        fields = metric.get("condensed")
+        if not fields:
+            expanded_metrics.append(metric)
+            continue
+        data = {**metric["data"], **{f: squareform(metric["data"][f]) for f in fields}}
+        expanded_metric = {k: v for k, v in metric.items() if k != "condensed"}
+        expanded_metric["data"] = data
+        expanded_metrics.append(expanded_metric)
+
+    return expanded_metrics
+
+
+def _json_default(obj):
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _format(path: Path, format: Optional[str]) -> str:
+    if format is None:
+        format = "npz" if path.suffix == ".npz" else "json"
+    if format not in FORMATS:
+        raise ValueError(f"format has to be one of {FORMATS}; {format}")
+
+    return format
+
+
+def dumps_metrics(metrics: list, format: str = "json", indent=None) -> str:
+    """Serialize metrics to a json string.
+
+    :param metrics: metrics from `teller.Colors.metrics`
+    :param format: `json` or `condensed`, see `save_metrics`
+    :param indent: indent of the json, defaults to None
+    :return: the json string
+    :rtype: str
+    """
+    if format == "condensed":
+        metrics = condense_metrics(metrics)
+    elif format != "json":
+        raise ValueError(f"format has to be json or condensed; {format}")
+
+    return json.dumps(metrics, indent=indent, default=_json_default)
+
+
+def save_metrics(
+    metrics: list, path: Union[str, Path], format: Optional[str] = None
+) -> Path:
+    """Save metrics to a file.
+
+    Three formats are available:
+
+    - `json`: the metrics as they are, with the full matrices;
+    - `condensed`: json with the pairwise fields condensed to the upper triangles, see `condense_metrics`;
+    - `npz`: the condensed metrics in a numpy `.npz` file. The per color and pairwise fields are stored as arrays and the rest of the metrics in a json header. This is the smallest and fastest format for large palettes.
+
+    ```python
+    save_metrics(m, "metrics.npz")
+    load_metrics("metrics.npz")[0]["data"]["distances"]  # the full matrix
+    ```
+
+    :param metrics: metrics from `teller.Colors.metrics`
+    :param path: path of the file
+    :param format: `json`, `condensed` or `npz`, defaults to `npz` for `.npz` files and `json` otherwise.
+    :return: the path of the file
+    :rtype: Path
+    """
+    path = Path(path)
+    format = _format(path, format)
+
+    if format in ("json", "condensed"):
+        with open(path, "w") as fp:
+            fp.write(dumps_metrics(metrics, format=format))
+    else:
+        header = []
+        arrays = {}
+        for i, metric in enumerate(condense_metrics(metrics)):
+            data = {}
+            array_fields = []
+            for k, v in metric["data"].items():
+                v_array = (
+                    np.asarray(v) if isinstance(v, (list, tuple, np.ndarray)) else None
+                )
+                # object arrays, e.g., lists with None, can't be loaded without pickle
+                if v_array is not None and v_array.dtype != object:
+                    arrays[f"{i}/{k}"] = v_array
+                    array_fields.append(k)
+                else:
+                    data[k] = v
+            header.append({**metric, "data": data, "arrays": array_fields})
+        arrays[_HEADER_KEY] = np.array(json.dumps(header, default=_json_default))
+        with open(path, "wb") as fp:
+            np.savez(fp, **arrays)
+
+    return path
+
+
+def load_metrics(
+    path: Union[str, Path], format: Optional[str] = None, expand: bool = True
+) -> list:
+    """Load metrics saved by `save_metrics` or by the command line tool.
+
+    :param path: path of the file
+    :param format: `json`, `condensed` or `npz`, defaults to `npz` for `.npz` files and `json` otherwise. `json` also reads the `condensed` format.
+    :param expand: whether to expand the condensed fields to the full matrices, defaults to True. Use `False` to keep the condensed fields and expand them on demand using `squareform`.
+    :return: the metrics. The pairwise fields are numpy arrays if they were condensed in the file.
+    :rtype: list
+    """
+    path = Path(path)
+    format = _format(path, format)
+
+    if format == "npz":
+        with np.load(path, allow_pickle=False) as npz:
+            header = json.loads(str(npz[_HEADER_KEY]))
+            metrics = []
+            for i, metric in enumerate(header):
+                data = dict(metric["data"])
+                condensed_fields = metric.get("condensed") or []
+                for k in metric["arrays"]:
+                    v = npz[f"{i}/{k}"]
+                    data[k] = v if k in condensed_fields else v.tolist()
+                metrics.append(
+                    {
+                        **{k: v for k, v in metric.items() if k != "arrays"},
+                        "data": data,
+                    }
+                )
+    else:
+        with open(path, "r") as fp:
+            metrics = json.load(fp)
+        for metric in metrics:
+            for k in metric.get("condensed") or []:
+                metric["data"][k] = np.asarray(metric["data"][k])
+
+    if expand:
+        return expand_metrics(metrics)
+
+    return metrics
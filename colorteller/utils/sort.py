@@ -1,42 +1,191 @@
-from colormath.color_conversions import convert_color
-from colormath.color_objects import LabColor, sRGBColor
-from loguru import logger
+import numpy as np
+
+from colorteller.utils.delta_e import DEFAULT_METRIC, delta_e_matrix, get_metric
+
+
+def _lab_array(lab_colors) -> np.ndarray:
+    """Convert Lab colors, e.g., a list of colormath LabColor objects or Lab tuples, to an array of shape (N, 3)."""
+    if len(lab_colors) and hasattr(lab_colors[0], "get_value_tuple"):
+        lab_colors = [c.get_value_tuple() for c in lab_colors]
+
+    return np.asarray(lab_colors, dtype=float).reshape(-1, 3)
+
+
+def _is_broadcasting(distance_metric) -> bool:
+    """Whether a distance function takes arrays of Lab colors, or two colormath LabColor objects, e.g., `colormath.color_diff.delta_e_cie2000`."""
+    lab = np.zeros((2, 3))
+    try:
+        return np.shape(distance_metric(lab, lab)) == (2,)
+    except (AttributeError, TypeError, ValueError):
+        return False
+
+
+def _distance_function(distance_metric):
+    """A distance function that takes two arrays of Lab colors and returns the distances with broadcasting.
+
+    :param distance_metric: a name in `utils.delta_e.METRICS`, a function with broadcasting, or a function of two colormath LabColor objects, defaults to `cie2000`
+    """
+    if distance_metric is None or isinstance(distance_metric, str):
+        return get_metric(distance_metric or DEFAULT_METRIC)
+    if _is_broadcasting(distance_metric):
+        return distance_metric
+
+    from colormath.color_objects import LabColor
+
+    def _distance(lab_1, lab_2):
+        lab_1, lab_2 = np.broadcast_arrays(np.asarray(lab_1), np.asarray(lab_2))
+        distances = np.empty(lab_1.shape[:-1])
+        for i in np.ndindex(distances.shape):
+            distances[i] = distance_metric(LabColor(*lab_1[i]), LabColor(*lab_2[i]))
+        return distances
+
+    return _distance
+
+
+def distance_matrix(lab_colors, distance_metric=None) -> np.ndarray:
+    """Calculate the distance matrix of a list of colors.
+
+    :param lab_colors: an array of Lab colors of shape (N, 3), or a list of colormath LabColor objects
+    :param distance_metric: a name in `utils.delta_e.METRICS`, a function that takes two arrays of Lab colors and returns the distances with broadcasting, or a function of two colormath LabColor objects, e.g., `colormath.color_diff.delta_e_cie2000`. Defaults to `cie2000`.
+    :return: the distance matrix of shape (N, N)
+    :rtype: numpy.ndarray
+    """
+    lab = _lab_array(lab_colors)
+    if distance_metric is None or isinstance(distance_metric, str):
+        return delta_e_matrix(lab, distance_metric or DEFAULT_METRIC)
+
+    distance_metric = _distance_function(distance_metric)
+
+    return np.asarray(distance_metric(lab[:, None, :], lab[None, :, :]))
 
 
 def sort_on_distance_to_reference(lab_colors, distance_metric, reference_color):
-    """sort colors based on distance metric"""
+    """sort colors based on distance metric
 
-    ref_distances = [distance_metric(c, reference_color) for c in lab_colors]
-    sorted_index = sorted(range(len(ref_distances)), key=ref_distances.__getitem__)
+    :param lab_colors: an array of Lab colors of shape (N, 3), or a list of colormath LabColor objects
+    :param distance_metric: a name in `utils.delta_e.METRICS`, a function that takes two arrays of Lab colors and returns the distances with broadcasting, e.g., `utils.delta_e.delta_e_cie2000`, or a function of two colormath LabColor objects
+    :param reference_color: the Lab value of the reference color
+    :return: the sorted colors and the indices
+    :rtype: dict
+    """
+    lab = _lab_array(lab_colors)
+    distance_metric = _distance_function(distance_metric)
+
+    ref_distances = np.asarray(
+        distance_metric(lab, _lab_array([reference_color])[0])
+    )
+    sorted_index = np.argsort(ref_distances, kind="stable").tolist()
 
     return {
-        "colors": [lab_colors[i] for i in sorted_index],
+        "colors": lab[sorted_index],
         "indices": sorted_index,
     }
 
 
-def sort_on_distance_matrix(lab_colors, distance_metric):
-    """sort colors based on distance metric
+def _nearest_neighbour_path(dist: np.ndarray, start: int, farthest=False) -> list:
+    """Greedy path that always goes to the nearest (or farthest) unvisited color."""
+    n = len(dist)
+    visited = np.zeros(n, dtype=bool)
+    path = [start]
+    visited[start] = True
+    fill = -np.inf if farthest else np.inf
+    for _ in range(n - 1):
+        row = np.where(visited, fill, dist[path[-1]])
+        nxt = int(np.argmax(row) if farthest else np.argmin(row))
+        path.append(nxt)
+        visited[nxt] = True
+
+    return path
+
+
+def _two_opt(path: list, dist: np.ndarray, objective: str, max_iter: int) -> list:
+    """Improve an open path using 2-opt moves.
+
+    A dummy node is added at both ends of the path so that reversing a segment at the ends is also a 2-opt move. For each segment start `i`, all the segment ends `j` are evaluated at once.
 
-    TODO: To be extended.
+    :param objective: `shortest_path` to minimize the total length or `max_min` to maximize the minimum distance between adjacent colors.
     """
+    n = len(dist)
+    # the edges to the dummy node never change the objective
+    dummy_distance = 0.0 if objective == "shortest_path" else 2 * dist.max() + 1
+    dist_dummy = np.full((n + 1, n + 1), dummy_distance)
+    dist_dummy[:n, :n] = dist
 
-    s = len(lab_colors)
+    tour = np.array([n] + list(path) + [n])
+    for _ in range(max_iter):
+        improved = False
+        for i in range(1, n):
+            a, b = tour[i - 1], tour[i]
+            c, e = tour[i + 1 : n + 1], tour[i + 2 : n + 2]
+            if objective == "shortest_path":
+                gain = (
+                    dist_dummy[a, b]
+                    + dist_dummy[c, e]
+                    - dist_dummy[a, c]
+                    - dist_dummy[b, e]
+                )
+            else:
+                gain = np.minimum(dist_dummy[a, c], dist_dummy[b, e]) - np.minimum(
+                    dist_dummy[a, b], dist_dummy[c, e]
+                )
+            best = int(np.argmax(gain))
+            if gain[best] > 1e-9:
+                j = i + 1 + best
+                tour[i : j + 1] = tour[i : j + 1][::-1]
+                improved = True
+        if not improved:
+            break
 
-    dist = [[distance_metric(c1, c2) for c1 in lab_colors] for c2 in lab_colors]
+    return tour[1:-1].tolist()
 
-    # calculate the shortest path
-    min_distances = []
-    min_distance_indices = []
-    for r in range(s - 1):
-        c = r + 1
-        r_dist = dist[r][c:]
-        r_min_d_index = min(range(len(r_dist)), key=r_dist.__getitem__)
 
-        min_distance = r_dist[r_min_d_index]
-        min_index = (r, c + r_min_d_index)
+def sort_on_distance_matrix(
+    lab_colors, distance_metric=None, method="shortest_path", max_iter=100
+):
+    """sort colors based on the distance matrix
 
-        min_distances.append(min_distance)
-        min_distance_indices.append(min_index)
+    Two orderings are available:
 
-    return min_distances, min_distance_indices
+    - `shortest_path`: the shortest perceptual path through all the colors, i.e., similar colors are next to each other. This is an open traveling salesman path found using the nearest neighbour heuristic followed by 2-opt.
+    - `max_min`: maximize the minimum distance between adjacent colors, i.e., adjacent colors are as distinguishable as possible, e.g., for categorical palettes. The path is built greedily by going to the farthest color, followed by 2-opt moves that increase the smaller of the two changed distances.
+
+    ```python
+    from colorteller.utils.color import hex_to_lab
+    from colorteller.utils.sort import sort_on_distance_matrix
+
+    lab = hex_to_lab(["#8de4d3", "#344b46", "#74ee65", "#238910", "#a6c363", "#509d99"])
+    sort_on_distance_matrix(lab, method="max_min")["indices"]
+    ```
+
+    !!! warning "Changed"
+        Up to 0.0.3, `sort_on_distance_matrix(lab_colors, distance_metric)` returned a tuple `(min_distances, min_distance_indices)` with the nearest later color of each color, which is not an ordering. It now returns a dict with `colors`, `indices`, and `distances`. The old values are the minimum of each row of `distance_matrix(lab_colors, distance_metric)` to the right of the diagonal.
+
+    :param lab_colors: an array of Lab colors of shape (N, 3), or a list of colormath LabColor objects
+    :param distance_metric: a name in `utils.delta_e.METRICS`, e.g., `oklab` for large palettes, a function that takes two arrays of Lab colors and returns the distances with broadcasting, or a function of two colormath LabColor objects, e.g., `colormath.color_diff.delta_e_cie2000`. Defaults to `cie2000`.
+    :param method: `shortest_path` or `max_min`, defaults to `shortest_path`
+    :param max_iter: max number of 2-opt passes, defaults to 100
+    :return: the sorted colors (`colors`), the indices of the sorted colors (`indices`), and the distances between adjacent colors (`distances`).
+    :rtype: dict
+    """
+    if method not in ("shortest_path", "max_min"):
+        raise ValueError(f"method has to be shortest_path or max_min; {method}")
+
+    lab = _lab_array(lab_colors)
+    dist = distance_matrix(lab, distance_metric)
+    if len(lab) < 3:
+        indices = list(range(len(lab)))
+    else:
+        if method == "shortest_path":
+            # an outlier is likely to be one end of the shortest path
+            start = int(np.argmax(dist.sum(axis=1)))
+            path = _nearest_neighbour_path(dist, start)
+        else:
+            start = int(np.argmin(dist.sum(axis=1)))
+            path = _nearest_neighbour_path(dist, start, farthest=True)
+        indices = _two_opt(path, dist, method, max_iter)
+
+    return {
+        "colors": lab[indices],
+        "indices": indices,
+        "distances": dist[indices[:-1], indices[1:]].tolist(),
+    }
@@ -1,30 +1,143 @@
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+
+import matplotlib
 import matplotlib.pyplot as plt
 from loguru import logger
-from colorteller.utils.chart import distance_matrix, noticable_matrix
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.patches import Circle
+from colorteller.utils.chart import distance_matrix, noticable_matrix, set_theme
+from colorteller.utils.delta_e import delta_e_matrix
 from pathlib import Path
 import colorteller.data.dataset as ds
-import seaborn as sns
 from typing import List, Tuple, Union, Optional
 
-sns.set(style="white")
+
+class FigurePool:
+    """A thread-safe pool of matplotlib figures.
+
+    The figures are created using the object-oriented API with an Agg canvas, so they are not registered in the global pyplot state and can be used from several threads. A released figure is cleared and reused by the next chart, which saves the cost of creating a figure for each chart.
+
+    ```python
+    pool = FigurePool(max_size=4)
+    fig = pool.acquire()
+    ax = fig.add_subplot()
+    ax.plot([0, 1], [0, 1])
+    fig.savefig("line.png")
+    pool.release(fig)
+    ```
+
+    :param max_size: max number of idle figures kept in the pool, defaults to 8
+    """
+
+    def __init__(self, max_size: int = 8) -> None:
+        self.max_size = max_size
+        self._figures = []
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._figures)
+
+    def acquire(self, figsize: Optional[Tuple[float, float]] = None) -> Figure:
+        """Get an empty figure from the pool, or a new figure if the pool is empty.
+
+        :param figsize: size of the figure in inches, defaults to `matplotlib.rcParams["figure.figsize"]`
+        :return: an empty figure
+        :rtype: matplotlib.figure.Figure
+        """
+        with self._lock:
+            fig = self._figures.pop() if self._figures else None
+        if fig is None:
+            fig = Figure()
+            FigureCanvasAgg(fig)
+        fig.set_size_inches(
+            figsize if figsize is not None else matplotlib.rcParams["figure.figsize"]
+        )
+
+        return fig
+
+    def release(self, fig: Figure) -> None:
+        """Clear a figure and put it back in the pool. The figure is dropped if the pool is full.
+
+        :param fig: a figure from `acquire`
+        """
+        fig.clear()
+        with self._lock:
+            if len(self._figures) < self.max_size:
+                self._figures.append(fig)
+
+
+#: figure pool shared by all the charts in the process
+FIGURE_POOL = FigurePool()
 
 
 class Charts:
     """A base class for charts. This class is not meant to be used directly.
 
+    Each chart is drawn on an explicit figure. If no `ax` is provided and the chart is only saved, i.e., `save_to` without `show`, the figure is taken from the figure pool and put back in the pool once it is saved; these charts don't use the global pyplot state, so they can be rendered from several threads. Otherwise the figure is created using pyplot, as `plt.subplots()` does, and closed once it is shown.
+
     :param save_folder: which folder to save the charts to.
+    :param figure_pool: the pool of figures, defaults to `FIGURE_POOL`
     """
 
-    def __init__(self, save_folder: Optional[Union[str, Path]] = None) -> None:
+    def __init__(
+        self,
+        save_folder: Optional[Union[str, Path]] = None,
+        figure_pool: Optional[FigurePool] = None,
+    ) -> None:
+
+        set_theme()
 
         self.save_folder = save_folder
         if not (self.save_folder is None):
             if isinstance(self.save_folder, str):
                 self.save_folder = Path(self.save_folder)
 
-    def _save_fig(self, save_to, name):
-        """Save fig to file. Only call this method after establishing a matplotlib axis object (ax)
+        self.figure_pool = FIGURE_POOL if figure_pool is None else figure_pool
+
+    def _axes(self, ax=None, show=False, save_to=None):
+        """Get the axis to draw a chart on.
+
+        The figure is only taken from the pool if the chart is saved and not shown. Otherwise it is created using pyplot, so that the chart is the current figure, e.g., for `plt.savefig`.
+
+        :return: the axis and the figure created for the chart, which is None if `ax` is provided.
+        """
+        if ax is not None:
+            return ax, None
+        if show or save_to is None:
+            fig, ax = plt.subplots()
+            return ax, fig
+
+        fig = self.figure_pool.acquire()
 
+        return fig.add_subplot(), fig
+
+    def _finish(self, ax, fig, show=False, save_to=None, name=None):
+        """Show and save the chart. The figure created for the chart is put back in the pool once it is saved, or closed once it is shown.
+
+        :param fig: the figure from `_axes`
+        :return: the axis if the chart is not saved, otherwise None.
+        """
+        if show:
+            plt.show()
+
+        if save_to is not None:
+            self._save_fig(ax.figure, save_to=save_to, name=name)
+
+        if fig is not None:
+            if show:
+                plt.close(fig)
+            elif save_to is not None:
+                self.figure_pool.release(fig)
+
+        if save_to is None:
+            return ax
+
+    def _save_fig(self, fig, save_to, name):
+        """Save fig to file.
+
+        :param fig: the figure to save
         :param save_to: the path to save the figure as. If this is set to `True`, the figure will be saved to `self.save_folder / name`. If this is set to a specific path, the figure will be saved to that path.
         """
 
@@ -34,11 +147,9 @@ class Charts:
             if self.save_folder is None:
                 logger.error("No save folder specified for Charts")
             else:
-                plt.savefig(self.save_folder / name)
+                fig.savefig(self.save_folder / name)
         else:
-            plt.savefig(save_to)
-
-        plt.clf()
+            fig.savefig(save_to)
 
 
 class BenchmarkCharts(Charts):
@@ -68,53 +179,85 @@ class BenchmarkCharts(Charts):
     :type save_folder: Union[str, Path]
     """
 
-    def __init__(self, metrics, save_folder=None) -> None:
-        super().__init__(save_folder=save_folder)
+    def __init__(self, metrics, save_folder=None, figure_pool=None) -> None:
+        super().__init__(save_folder=save_folder, figure_pool=figure_pool)
 
         self.metrics = metrics
 
-    def distance_matrix(self, ax=None, show=False, save_to=None):
-
+    def _data(self, method: str) -> dict:
         for b in self.metrics:
-            if b["method"] == "perceptual_distance":
-                data = b["data"]
-                hex_strings = data["colors"]
-                dist_mat = data["distances"]
+            if b["method"] == method:
+                return b["data"]
 
-                break
+        raise ValueError(f"No {method} in the metrics")
 
-        ax = distance_matrix(dist_mat, hex_strings, ax=ax)
-        if show:
-            plt.show()
+    def _pairwise(self, field: str, deficiency: Optional[str] = None):
+        """Find the hex strings and a pairwise field of the metrics.
 
-        if save_to is None:
-            return ax
-        else:
-            self._save_fig(save_to=save_to, name="distance_matrix.png")
+        :param field: `distances` or `noticable`
+        :param deficiency: name of a color vision deficiency, use the matrix of `utils.benchmark.ColorVisionDeficiencyBenchmark` instead of `utils.benchmark.PerceptualDistanceBenchmark`, defaults to None
+        """
+        method = "perceptual_distance" if deficiency is None else "color_vision_deficiency"
+        data = self._data(method)
+        if field not in data:
+            # e.g., the sparse perceptual distance has no matrices
+            raise ValueError(f"No {field} in the {method} metrics")
+
+        if deficiency is None:
+            return data["colors"], data[field]
+        if deficiency not in data["deficiencies"]:
+            raise ValueError(
+                f"deficiency has to be one of {data['deficiencies']}; {deficiency}"
+            )
+
+        return data["colors"], data[field][data["deficiencies"].index(deficiency)]
+
+    def distance_matrix(
+        self, ax=None, show=False, save_to=None, deficiency=None, metric=None
+    ):
+        """Plot the deltaE distance matrix.
+
+        :param deficiency: plot the distances seen with a color vision deficiency, e.g., `protanopia`, see `utils.benchmark.ColorVisionDeficiencyBenchmark`, defaults to None
+        :param metric: name of a color difference metric to recalculate the distances from the Lab values of `perceptual_distance`, e.g., `cie2000` for the report of palettes screened using a cheaper metric, see `utils.delta_e.METRICS`. Defaults to None, i.e., the distances in the metrics.
+        """
+        hex_strings, dist_mat = self._pairwise("distances", deficiency)
+        if metric is not None:
+            if deficiency is not None:
+                raise ValueError("metric can not be used with deficiency")
+            lab = self._data("perceptual_distance")["lab"]
+            dist_mat = delta_e_matrix(lab, metric)
+
+        ax, fig = self._axes(ax=ax, show=show, save_to=save_to)
+        ax = distance_matrix(dist_mat, hex_strings, ax=ax)
 
-    def noticable_matrix(self, ax=None, show=False, save_to=None):
+        name = (
+            "distance_matrix.png"
+            if deficiency is None
+            else f"distance_matrix_{deficiency}.png"
+        )
+        return self._finish(ax, fig, show=show, save_to=save_to, name=name)
 
-        for b in self.metrics:
-            if b["method"] == "perceptual_distance":
-                data = b["data"]
-                hex_strings = data["colors"]
-                noti_mat = data["noticable"]
+    def noticable_matrix(self, ax=None, show=False, save_to=None, deficiency=None):
+        """Plot the matrix of whether the colors are noticable.
 
-                break
+        :param deficiency: plot whether the colors are noticable with a color vision deficiency, e.g., `protanopia`, see `utils.benchmark.ColorVisionDeficiencyBenchmark`, defaults to None
+        """
+        hex_strings, noti_mat = self._pairwise("noticable", deficiency)
 
+        ax, fig = self._axes(ax=ax, show=show, save_to=save_to)
         ax = noticable_matrix(noti_mat, hex_strings, ax=ax)
-        if show:
-            plt.show()
 
-        if save_to is None:
-            return ax
-        else:
-            self._save_fig(save_to=save_to, name="noticable_matrix.png")
+        name = (
+            "noticable_matrix.png"
+            if deficiency is None
+            else f"noticable_matrix_{deficiency}.png"
+        )
+        return self._finish(ax, fig, show=show, save_to=save_to, name=name)
 
 
 class ApplicationCharts(Charts):
-    def __init__(self, colors, save_folder=None) -> None:
-        super().__init__(save_folder=save_folder)
+    def __init__(self, colors, save_folder=None, figure_pool=None) -> None:
+        super().__init__(save_folder=save_folder, figure_pool=figure_pool)
         self.colors = colors
         self.hex_strings = self.colors.hex
         self.data = self._data()
@@ -128,14 +271,11 @@ class ApplicationCharts(Charts):
     def bar_chart(self, ax=None, show=False, save_to=None):
         filename = "ac_bar_chart.png"
         tds = self.data["two_dim_scalar"]
-        ax = tds.data().plot.bar(stacked=True, color=self.hex_strings)
-        if show:
-            plt.show()
-
+        ax, fig = self._axes(ax=ax, show=show, save_to=save_to)
+        tds.data().plot.bar(stacked=True, color=self.hex_strings, ax=ax)
+        ax = self._finish(ax, fig, show=show, save_to=save_to, name=filename)
         if save_to is None:
             return ax
-        else:
-            self._save_fig(save_to=save_to, name=filename)
 
         return {"filename": filename}
 
@@ -143,14 +283,11 @@ class ApplicationCharts(Charts):
         filename = "ac_line_chart.png"
         tds = self.data["two_dim_scalar"]
 
-        ax = tds.data().plot.line(color=self.hex_strings)
-        if show:
-            plt.show()
-
+        ax, fig = self._axes(ax=ax, show=show, save_to=save_to)
+        tds.data().plot.line(color=self.hex_strings, ax=ax)
+        ax = self._finish(ax, fig, show=show, save_to=save_to, name=filename)
         if save_to is None:
             return ax
-        else:
-            self._save_fig(save_to=save_to, name=filename)
 
         return {"filename": filename}
 
@@ -159,25 +296,16 @@ class ApplicationCharts(Charts):
         tds = self.data["two_dim_scalar"]
         df = tds.data().reset_index()
 
-        ax = df.plot.scatter(
-            x="index",
-            y=self.hex_strings[0],
-            color=self.hex_strings[0],
-            label=self.hex_strings[0],
-        )
-        for h in self.hex_strings[1:]:
+        ax, fig = self._axes(ax=ax, show=show, save_to=save_to)
+        for h in self.hex_strings:
             df.plot.scatter(x="index", y=h, ax=ax, color=h, label=h)
 
         ax.set_xlabel("")
         ax.set_ylabel("")
-        plt.legend()
-        if show:
-            plt.show()
-
+        ax.legend()
+        ax = self._finish(ax, fig, show=show, save_to=save_to, name=filename)
         if save_to is None:
             return ax
-        else:
-            self._save_fig(save_to=save_to, name=filename)
 
         return {"filename": filename}
 
@@ -186,34 +314,99 @@ class ApplicationCharts(Charts):
         ods_const = self.data["one_dim_scalar__const"]
         df = ods_const.data()
 
-        ax = df.plot.pie(colors=self.hex_strings)
-        centre_circle = plt.Circle((0, 0), 0.70, fc="white")
-        fig = plt.gcf()
-        fig.gca().add_artist(centre_circle)
+        ax, fig = self._axes(ax=ax, show=show, save_to=save_to)
+        df.plot.pie(colors=self.hex_strings, ax=ax)
+        ax.add_artist(Circle((0, 0), 0.70, fc="white"))
         ax.set_xlabel("")
         ax.set_ylabel("")
 
-        if show:
-            plt.show()
-
+        ax = self._finish(ax, fig, show=show, save_to=save_to, name=filename)
         if save_to is None:
             return ax
-        else:
-            self._save_fig(save_to=save_to, name=filename)
 
         return {"filename": filename}
 
-    def charts(self, save_to=None):
-        dispatcher = {
-            "bar_chart": self.bar_chart(save_to=save_to),
-            "line_chart": self.line_chart(save_to=save_to),
-            "scatter_chart": self.scatter_chart(save_to=save_to),
-            "donut_chart": self.donut_chart(save_to=save_to),
+    def _dispatcher(self):
+        """The chart methods by name. The charts are only rendered when the methods are called."""
+        return {
+            "bar_chart": self.bar_chart,
+            "line_chart": self.line_chart,
+            "scatter_chart": self.scatter_chart,
+            "donut_chart": self.donut_chart,
+        }
+
+    def charts(
+        self,
+        save_to=None,
+        names: Optional[List[str]] = None,
+        jobs: int = 1,
+        executor: Optional[Executor] = None,
+    ):
+        """Render the application charts.
+
+        Only the charts in `names` are rendered. With `jobs` larger than 1, the charts are rendered concurrently in a pool of processes using the Agg backend.
+
+        ```python
+        ac = ApplicationCharts(colors=c, save_folder=".")
+        ac.charts(save_to=True, names=["bar_chart", "donut_chart"], jobs=2)
+        ```
+
+        Starting a pool of processes takes longer than rendering a few charts. To render the charts of many palettes, create the pool once and pass it as `executor`; it is not shut down by `charts`.
+
+        ```python
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=4) as executor:
+            for c in palettes:
+                ApplicationCharts(colors=c, save_folder=".").charts(save_to=True, executor=executor)
+        ```
+
+        :param save_to: see the chart methods, e.g., `bar_chart`. It is required if `jobs` is larger than 1 or `executor` is provided.
+        :param names: names of the charts to render, defaults to all the charts: `bar_chart`, `line_chart`, `scatter_chart`, and `donut_chart`.
+        :param jobs: number of processes to render the charts, defaults to 1. It is ignored if `executor` is provided.
+        :param executor: an executor to render the charts in, e.g., a `concurrent.futures.ProcessPoolExecutor` shared by many palettes, defaults to None
+        :return: a dict of the results of the chart methods by name
+        :rtype: dict
+        """
+        dispatcher = self._dispatcher()
+        if names is None:
+            names = list(dispatcher)
+        unknown = [n for n in names if n not in dispatcher]
+        if unknown:
+            raise ValueError(f"Unknown charts: {unknown}")
+
+        if executor is None and jobs <= 1:
+            return {k: dispatcher[k](save_to=save_to) for k in names}
+
+        if save_to is None:
+            raise ValueError("save_to is required to render the charts in processes")
+
+        if executor is not None:
+            return self._submit_charts(executor, names, save_to)
+
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            return self._submit_charts(executor, names, save_to)
+
+    def _submit_charts(self, executor: Executor, names: List[str], save_to) -> dict:
+        """Render the charts in `names` using the executor and wait for the results."""
+        futures = {
+            k: executor.submit(
+                _render_application_chart,
+                list(self.hex_strings),
+                self.save_folder,
+                k,
+                save_to,
+            )
+            for k in names
         }
 
-        res = {}
+        return {k: f.result() for k, f in futures.items()}
+
+
+def _render_application_chart(hex_strings, save_folder, name, save_to):
+    """Render one application chart in a worker process."""
+    from colorteller.teller import Colors
 
-        for k in dispatcher:
-            res[k] = dispatcher[k]
+    ac = ApplicationCharts(colors=Colors(color_palette=hex_strings), save_folder=save_folder)
 
-        return res
+    return ac._dispatcher()[name](save_to=save_to)
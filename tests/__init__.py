@@ -0,0 +1,4 @@
+import os
+
+# the tests compare values to the direct conversion, so the lookup table is disabled
+os.environ.pop("COLORTELLER_LUT", None)
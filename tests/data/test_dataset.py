@@ -1,5 +1,7 @@
+import numpy as np
 import colorteller.data.dataset as dataset
 from loguru import logger
+from nose import tools as _tools
 
 
 def test__TwoDimScalar():
@@ -7,3 +9,30 @@ def test__TwoDimScalar():
     ds_1 = dataset.TwoDimScalar(index=6)
 
     logger.debug(ds_1.data().head())
+
+
+def test__values():
+    values = dataset.values((5, 3), seed=42)
+
+    _tools.assert_true(dataset.values((5, 3), seed=42) is values)
+    _tools.assert_false(values.flags.writeable)
+    _tools.assert_false(dataset.values((5, 3), seed=43) is values)
+    _tools.eq_(dataset.values((4,), seed=42, mode="constant").tolist(), [100] * 4)
+
+
+def test__TwoDimScalar__shared():
+    ds = dataset.TwoDimScalar(column=["#000000", "#ffffff"], index=5, seed=42)
+    ds_1 = dataset.TwoDimScalar(column=["#ff0000", "#00ff00"], index=5, seed=42)
+
+    _tools.assert_true(ds.data() is ds.data())
+    _tools.assert_true(np.shares_memory(ds.data().to_numpy(), ds_1.data().to_numpy()))
+    _tools.eq_(list(ds_1.data().columns), ["#ff0000", "#00ff00"])
+
+
+def test__OneDimScalar():
+    ds = dataset.OneDimScalar(index=3, seed=42)
+    ds_const = dataset.OneDimScalar(index=3, mode="constant")
+
+    _tools.eq_(len(ds.data()), 3)
+    _tools.eq_(ds_const.data().tolist(), [100, 100, 100])
+    _tools.assert_raises(ValueError, dataset.OneDimScalar(mode="linear").data)
@@ -0,0 +1,59 @@
+from colorteller import batch, teller
+from colorteller.utils import benchmark
+from nose import tools as _tools
+
+palettes = [
+    ["#8de4d3", "#344b46", "#74ee65", "#238910", "#a6c363", "#509d99"],
+    ["#8de4d3", "#zzzzzz"],
+    {"colors": [{"hex": "#238910"}, {"hex": "#a6c363"}]},
+    ["#000000", "#ffffff"],
+]
+
+
+def test__batch__benchmark_palettes():
+    res = batch.benchmark_palettes(palettes, processes=1)
+
+    _tools.eq_([r["index"] for r in res], [0, 1, 2, 3])
+    _tools.eq_([r["error"] is None for r in res], [True, False, True, True])
+    _tools.eq_(res[2]["colors"], ["#238910", "#a6c363"])
+
+    c = teller.Colors(color_palette=palettes[0])
+    _tools.eq_(
+        res[0]["metrics"],
+        c.metrics(
+            methods=[benchmark.PerceptualDistanceBenchmark, benchmark.LightnessBenchmark]
+        ),
+    )
+
+
+def test__batch__benchmark_palettes__processes():
+    res_pool = batch.benchmark_palettes(
+        palettes * 5, methods=[benchmark.LightnessBenchmark], processes=2, chunksize=3
+    )
+    res = batch.benchmark_palettes(
+        palettes * 5, methods=[benchmark.LightnessBenchmark], processes=1
+    )
+
+    _tools.eq_(res_pool, res)
+
+
+def test__batch__iter_benchmark_palettes__lazy():
+    consumed = []
+
+    def _palettes():
+        for i in range(200):
+            consumed.append(i)
+            yield ["#8de4d3", "#344b46", f"#{i:06x}"]
+
+    res = batch.iter_benchmark_palettes(
+        _palettes(),
+        methods=[benchmark.LightnessBenchmark],
+        processes=2,
+        chunksize=4,
+        max_in_flight=3,
+    )
+    # at most max_in_flight chunks are read ahead of the results
+    for i in range(20):
+        _tools.eq_(next(res)["index"], i)
+        _tools.ok_(len(consumed) <= i + 1 + 3 * 4)
+    _tools.eq_(len(list(res)), 180)
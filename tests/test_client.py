@@ -0,0 +1,164 @@
+import json
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from nose import tools as _tools
+
+try:
+    import aiohttp  # noqa: F401
+except ImportError:
+    raise unittest.SkipTest("aiohttp is not installed")
+
+from colorteller.client import ColorTellerClient, fetch_palettes
+from colorteller.teller import ColorTeller
+
+HEX_STRINGS = ["#8de4d3", "#344b46", "#74ee65", "#238910", "#a6c363", "#509d99"]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """A stand-in for the colorteller web service.
+
+    - `/colors/<name>/index.json`: a palette, after a short delay;
+    - `/colors/flaky-<n>/index.json`: 503 for the first n requests;
+    - anything else: 404.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        state = self.server.state
+        with state["lock"]:
+            state["requests"] += 1
+            state["in_flight"] += 1
+            state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+            state["connections"].add(self.client_address)
+        try:
+            parts = self.path.strip("/").split("/")
+            if len(parts) != 3 or parts[0] != "colors" or parts[2] != "index.json":
+                return self._send(404, b"")
+            name = parts[1]
+            if name.startswith("flaky-"):
+                with state["lock"]:
+                    state["flaky"][name] = state["flaky"].get(name, 0) + 1
+                    failures = state["flaky"][name]
+                if failures <= int(name.split("-")[1]):
+                    return self._send(503, b"", {"Retry-After": "0"})
+            time.sleep(0.02)
+            body = json.dumps(
+                {
+                    "colors": [{"hex": h} for h in HEX_STRINGS],
+                    "file": name,
+                    "permalink": f"//localhost/colors/{name}/",
+                }
+            ).encode()
+            self._send(200, body)
+        finally:
+            with state["lock"]:
+                state["in_flight"] -= 1
+
+    def _send(self, status, body, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _Server:
+    def __enter__(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.server.daemon_threads = True
+        self.server.state = {
+            "lock": threading.Lock(),
+            "requests": 0,
+            "in_flight": 0,
+            "max_in_flight": 0,
+            "connections": set(),
+            "flaky": {},
+        }
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    @property
+    def state(self):
+        return self.server.state
+
+
+def test__client__ColorTellerClient__url():
+    client = ColorTellerClient(base_url="https://colorteller.kausalflow.com/")
+
+    _tools.eq_(
+        client.url("//localhost:1234/colors/bobcat-yellow/"),
+        "https://localhost:1234/colors/bobcat-yellow/index.json",
+    )
+    _tools.eq_(
+        client.url("bobcat-yellow"),
+        "https://colorteller.kausalflow.com/colors/bobcat-yellow/index.json",
+    )
+    _tools.eq_(
+        client.url("/colors/bobcat-yellow/palette.json"),
+        "https://colorteller.kausalflow.com/colors/bobcat-yellow/palette.json",
+    )
+
+
+def test__client__fetch_palettes():
+    names = [f"palette-{i}" for i in range(40)]
+    with _Server() as server:
+        responses = fetch_palettes(names, base_url=server.url, concurrency=4)
+        state = server.state
+
+    _tools.eq_([r.data["file"] for r in responses], names)
+    _tools.ok_(all(r.ok for r in responses))
+    _tools.ok_(state["max_in_flight"] <= 4)
+    # keep-alive connections are reused
+    _tools.ok_(len(state["connections"]) <= 4)
+
+    ct = responses[0].colorteller()
+    _tools.ok_(isinstance(ct, ColorTeller))
+    _tools.eq_(ct.hex, HEX_STRINGS)
+
+
+def test__client__ColorTellerClient__retries():
+    with _Server() as server:
+        responses = fetch_palettes(
+            ["flaky-2", "flaky-5", "/missing/"],
+            base_url=server.url,
+            retries=3,
+            backoff=0.01,
+        )
+        flaky = server.state["flaky"]
+
+    _tools.ok_(responses[0].ok)
+    _tools.eq_(flaky["flaky-2"], 3)
+
+    _tools.eq_(responses[1].error, "HTTP 503")
+    _tools.eq_(flaky["flaky-5"], 4)
+
+    # client errors are not retried
+    _tools.eq_(responses[2].error, "HTTP 404")
+    _tools.assert_raises(ValueError, responses[2].colorteller)
+
+
+def test__client__ColorTellerClient__connection_error():
+    with _Server() as server:
+        url = server.url
+
+    responses = fetch_palettes(["bobcat-yellow"], base_url=url, retries=1, backoff=0.01)
+
+    _tools.ok_(not responses[0].ok)
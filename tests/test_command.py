@@ -0,0 +1,102 @@
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from click.testing import CliRunner
+from nose import tools as _tools
+
+from colorteller.command import benchmark_batch, colorteller
+from colorteller.utils import lut
+
+
+def test__command__benchmark_batch():
+    palettes = "#8de4d3,#344b46 #74ee65\n\n#000000 #gggggg\n"
+
+    result = CliRunner().invoke(
+        colorteller, ["benchmark-batch", "--format", "lines"], input=palettes
+    )
+
+    records = [json.loads(line) for line in result.output.splitlines()]
+    _tools.eq_(result.exit_code, 0)
+    _tools.eq_([r["index"] for r in records], [0, 1])
+    _tools.eq_(records[0]["colors"], ["#8de4d3", "#344b46", "#74ee65"])
+    _tools.eq_(
+        [m["method"] for m in records[0]["metrics"]],
+        ["perceptual_distance", "lightness"],
+    )
+    _tools.assert_true(records[1]["error"].startswith("ValueError"))
+
+
+def test__command__benchmark_batch__streaming():
+    consumed = []
+
+    def _lines():
+        for i in range(200):
+            consumed.append(i)
+            yield f"#8de4d3 #344b46 #{i:06x}\n"
+
+    class _Output:
+        def __init__(self):
+            self.consumed_at_write = []
+
+        def write(self, line):
+            self.consumed_at_write.append(len(consumed))
+
+    output = _Output()
+    benchmark_batch.callback(
+        input_file=_lines(),
+        output_file=output,
+        input_format="lines",
+        jobs=2,
+        chunksize=4,
+        store_path=None,
+        metric="cie2000",
+    )
+
+    _tools.eq_(len(output.consumed_at_write), 200)
+    # the input is streamed: at most 2 * jobs chunks are read ahead of the output
+    for i, n in enumerate(output.consumed_at_write):
+        _tools.ok_(n <= i + 1 + 2 * 2 * 4)
+
+
+def test__command__import_time():
+    # the plain metrics path shouldn't import the plotting stack or colormath
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import colorteller.command"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    imported = {
+        line.split("|")[-1].strip().split(".")[0]
+        for line in proc.stderr.splitlines()
+        if line.startswith("import time:")
+    }
+
+    _tools.assert_in("colorteller", imported)
+    for module in ["matplotlib", "seaborn", "pandas", "colormath"]:
+        _tools.assert_not_in(module, imported)
+
+
+def test__command__build_lut():
+    runner = CliRunner()
+    # the target is required without COLORTELLER_LUT
+    _tools.eq_(runner.invoke(colorteller, ["build-lut"]).exit_code, 2)
+
+    # the table is tested in tests/utils/test_lut.py, it is too large to build twice
+    with tempfile.TemporaryDirectory() as tmp, mock.patch(
+        "colorteller.command.build_lut", side_effect=Path
+    ) as build_lut:
+        path = Path(tmp) / "srgb_to_lab.npy"
+        result = runner.invoke(colorteller, ["build-lut"], env={lut.LUT_ENV: str(path)})
+        _tools.eq_(result.exit_code, 0, result.output)
+        _tools.assert_in(str(path), result.output)
+        build_lut.assert_called_once_with(path)
+
+        result = runner.invoke(colorteller, ["build-lut", "--target", str(path)])
+        _tools.eq_(result.exit_code, 0, result.output)
+        build_lut.assert_called_with(str(path))
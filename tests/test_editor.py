@@ -0,0 +1,76 @@
+import numpy as np
+from nose import tools as _tools
+
+from colorteller import teller
+from colorteller.editor import PaletteEditor
+from colorteller.utils import benchmark
+
+HEX_STRINGS = ["#8de4d3", "#344b46", "#74ee65", "#238910", "#a6c363", "#509d99"]
+METHODS = [benchmark.PerceptualDistanceBenchmark, benchmark.LightnessBenchmark]
+
+
+def _assert_metrics_equal(m, m_expected):
+    _tools.eq_([b["method"] for b in m], [b["method"] for b in m_expected])
+    pd, pd_expected = m[0]["data"], m_expected[0]["data"]
+    _tools.eq_(pd["colors"], pd_expected["colors"])
+    np.testing.assert_allclose(pd["lab"], pd_expected["lab"])
+    np.testing.assert_allclose(pd["distances"], pd_expected["distances"], atol=1e-9)
+    _tools.eq_(pd["noticable"], pd_expected["noticable"])
+    _tools.eq_(
+        {k: v for k, v in m[1]["data"].items() if k != "lightness"},
+        {k: v for k, v in m_expected[1]["data"].items() if k != "lightness"},
+    )
+
+
+def test__editor__PaletteEditor():
+    editor = PaletteEditor(HEX_STRINGS[:3])
+
+    editor.add(HEX_STRINGS[3])
+    editor.add(HEX_STRINGS[4], index=0)
+    _tools.eq_(editor.remove(1), HEX_STRINGS[0])
+    editor.replace(2, HEX_STRINGS[5])
+
+    expected = [HEX_STRINGS[4], HEX_STRINGS[1], HEX_STRINGS[5], HEX_STRINGS[3]]
+    _tools.eq_(editor.hex, expected)
+    _assert_metrics_equal(
+        editor.metrics(), teller.Colors(color_palette=expected).metrics(METHODS)
+    )
+
+
+def test__editor__PaletteEditor__random_edits():
+    rng = np.random.default_rng(42)
+    editor = PaletteEditor(threshold=10)
+
+    # grows beyond the initial capacity and reuses the freed slots
+    for _ in range(200):
+        op = rng.choice(3, p=[0.5, 0.2, 0.3])
+        h = f"#{rng.integers(0, 2**24):06x}"
+        if op == 0 or len(editor) < 2:
+            editor.add(h, index=int(rng.integers(len(editor) + 1)))
+        elif op == 1:
+            editor.remove(int(rng.integers(len(editor))))
+        else:
+            editor.replace(int(rng.integers(len(editor))), h)
+
+    _tools.assert_true(len(editor) > 8)
+    c = teller.Colors(color_palette=editor.hex)
+    _assert_metrics_equal(
+        editor.metrics(),
+        c.metrics(
+            [lambda c: benchmark.PerceptualDistanceBenchmark(c, threshold=10), METHODS[1]]
+        ),
+    )
+
+
+def test__editor__PaletteEditor__invalid_hex():
+    editor = PaletteEditor(["#000000", "#ffffff"])
+    editor.remove(1)
+
+    # an invalid color doesn't change the palette
+    _tools.assert_raises(ValueError, editor.add, "#zzzzzz")
+    _tools.assert_raises(ValueError, editor.replace, 0, "#zzzzzz")
+    _tools.eq_(editor.hex, ["#000000"])
+    _tools.eq_(editor.metrics()[0]["data"]["colors"], ["#000000"])
+
+    editor.add("#ff0000")
+    _tools.eq_(editor.hex, ["#000000", "#ff0000"])
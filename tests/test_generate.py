@@ -0,0 +1,32 @@
+import numpy as np
+from nose import tools as _tools
+
+from colorteller.generate import generate_palette
+
+
+def test__generate__generate_palette():
+    res = generate_palette(
+        8, min_lightness=30, max_lightness=80, time_budget=0.2, seed=42
+    )
+
+    _tools.eq_(len(res["colors"]), 8)
+    _tools.eq_([m["method"] for m in res["metrics"]], ["perceptual_distance", "lightness"])
+
+    lightness = res["metrics"][1]["data"]
+    _tools.eq_((lightness["min_lightness"], lightness["max_lightness"]), (30, 80))
+    _tools.assert_true(all(lightness["bounded_by_min_max"]))
+
+    distances = np.array(res["metrics"][0]["data"]["distances"])
+    np.fill_diagonal(distances, np.inf)
+    _tools.assert_almost_equal(distances.min(), res["min_distance"], places=6)
+    _tools.assert_greater(res["min_distance"], 20)
+
+
+def test__generate__generate_palette__max_iter():
+    # without refinement, the palette is the farthest point sampling of the grid
+    res = generate_palette(4, max_iter=0, seed=42)
+
+    _tools.eq_(len(res["colors"]), 4)
+    distances = np.array(res["metrics"][0]["data"]["distances"])
+    np.fill_diagonal(distances, np.inf)
+    _tools.assert_almost_equal(distances.min(), res["min_distance"], places=6)
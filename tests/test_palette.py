@@ -0,0 +1,77 @@
+import pickle
+
+import numpy as np
+from nose import tools as _tools
+
+from colorteller import teller
+from colorteller.batch import benchmark_palette
+from colorteller.palette import Palette, split_palettes
+from colorteller.utils import benchmark
+
+HEX_STRINGS = ["#8de4d3", "#344b46", "#74ee65", "#238910", "#a6c363", "#509d99"]
+
+
+def test__palette__Palette():
+    p = Palette.from_hex(HEX_STRINGS)
+
+    _tools.eq_(len(p), 6)
+    _tools.eq_(p.hex, HEX_STRINGS)
+    _tools.eq_(list(p), HEX_STRINGS)
+    _tools.eq_(p[-1], "#509d99")
+    _tools.eq_(p.rgb.dtype, np.uint8)
+    _tools.assert_false(p.rgb.flags.writeable)
+    _tools.assert_false(hasattr(p, "__dict__"))
+
+    # slicing is zero-copy
+    p_slice = p[1:3]
+    _tools.eq_(p_slice.hex, HEX_STRINGS[1:3])
+    _tools.assert_true(np.shares_memory(p_slice.rgb, p.rgb))
+
+    _tools.eq_(Palette([[141, 228, 211]]).hex, ["#8de4d3"])
+    _tools.assert_raises(ValueError, Palette, [[256, 0, 0]])
+
+    _tools.eq_(pickle.loads(pickle.dumps(p)), p)
+    _tools.eq_(len({p, Palette.from_hex(HEX_STRINGS)}), 1)
+
+
+def test__palette__Palette__dict():
+    p = Palette.from_hex(HEX_STRINGS)
+    d = p.to_dict()
+
+    _tools.eq_(d["hex"][0], "8de4d3")
+    _tools.eq_(Palette.from_dict(d), p)
+
+    ct = teller.ColorTeller(colorteller_raw=d)
+    _tools.eq_(ct.hex, HEX_STRINGS)
+    _tools.eq_(Palette.from_colorteller(ct), p)
+
+
+def test__palette__Palette__Colors():
+    p = Palette.from_hex(HEX_STRINGS)
+    methods = [benchmark.PerceptualDistanceBenchmark, benchmark.LightnessBenchmark]
+
+    c = teller.Colors(color_palette=p)
+    m = c.metrics(methods=methods)
+    m_expected = teller.Colors(color_palette=HEX_STRINGS).metrics(methods=methods)
+
+    _tools.eq_(m, m_expected)
+    # the rgb array of the palette is used instead of parsing the hex strings
+    _tools.eq_(c.conversions["rgb_array"], 0)
+    _tools.eq_(c.palette, p)
+
+    _tools.eq_(
+        benchmark.LightnessBenchmark(p).metric(),
+        m_expected[1],
+    )
+    _tools.eq_(benchmark_palette(0, p)["metrics"], m_expected)
+
+
+def test__palette__split_palettes():
+    palettes = [Palette.from_hex(HEX_STRINGS[:2]), Palette.from_hex(HEX_STRINGS[2:])]
+    rgb = np.concatenate([p.rgb for p in palettes])
+
+    res = split_palettes(rgb, [len(p) for p in palettes])
+
+    _tools.eq_(res, palettes)
+    _tools.assert_true(np.shares_memory(res[1].rgb, rgb))
+    _tools.assert_raises(ValueError, split_palettes, rgb, [1, 2])
@@ -0,0 +1,118 @@
+import tempfile
+from pathlib import Path
+
+import numpy as np
+from nose import tools as _tools
+
+from colorteller.palette import Palette
+from colorteller.search import PaletteIndex, palette_distance, palette_distances
+from colorteller.utils.color import hex_to_lab
+from colorteller.utils.delta_e import delta_e_pairwise
+
+hex_strings = ["#8de4d3", "#344b46", "#74ee65", "#238910", "#a6c363", "#509d99"]
+
+
+def _palettes(size=300, seed=42):
+    rng = np.random.default_rng(seed)
+    return [
+        Palette(rng.integers(0, 256, size=(n, 3))) for n in rng.integers(2, 8, size=size)
+    ]
+
+
+def test__search__palette_distance():
+    lab_1 = hex_to_lab(hex_strings)
+    lab_2 = hex_to_lab(["#8de4d4", "#238910", "#344b46"])
+    d = delta_e_pairwise(lab_1, lab_2)
+
+    _tools.eq_(palette_distance(lab_1, lab_1[::-1]), 0)
+    _tools.assert_true(
+        np.isclose(
+            palette_distance(lab_1, lab_2, method="hausdorff"),
+            max(d.min(axis=1).max(), d.min(axis=0).max()),
+        )
+    )
+    _tools.assert_true(
+        np.isclose(
+            palette_distance(lab_1, lab_2),
+            max(d.min(axis=1).mean(), d.min(axis=0).mean()),
+        )
+    )
+    _tools.assert_true(
+        np.isclose(palette_distance(lab_1, lab_2), palette_distance(lab_2, lab_1))
+    )
+    _tools.assert_raises(ValueError, palette_distance, lab_1, lab_2, "euclidean")
+    _tools.assert_raises(ValueError, palette_distance, lab_1, np.zeros((0, 3)))
+
+
+def test__search__palette_distances():
+    lab = hex_to_lab(hex_strings)
+    palettes = [hex_to_lab(p.hex) for p in _palettes(50)]
+    colors = np.concatenate(palettes)
+    offsets = np.concatenate([[0], np.cumsum([len(p) for p in palettes])])
+
+    for method in ["hausdorff", "modified_hausdorff"]:
+        expected = [palette_distance(lab, p, method=method) for p in palettes]
+        for chunk_size in [2**20, 10]:
+            distances = palette_distances(
+                lab, colors, offsets, method=method, chunk_size=chunk_size
+            )
+            _tools.assert_true(np.allclose(distances, expected))
+
+
+def test__search__PaletteIndex():
+    palettes = _palettes() + [Palette.from_hex(hex_strings)]
+    index = PaletteIndex(palettes, names=[f"p{i}" for i in range(len(palettes))])
+    _tools.eq_(len(index), len(palettes))
+    _tools.eq_(index.palette(len(palettes) - 1), palettes[-1])
+
+    # a slightly different palette in a different order
+    query = ["#509d9a", "#8de4d3", "#238911", "#74ee65", "#344b46", "#a6c363"]
+    res = index.query(query, k=5, candidates=20)
+    _tools.eq_(len(res), 5)
+    _tools.eq_(res[0]["name"], f"p{len(palettes) - 1}")
+    _tools.eq_(res[0]["colors"], hex_strings)
+    _tools.eq_([r["distance"] for r in res], sorted(r["distance"] for r in res))
+
+    # all the palettes are candidates
+    lab = hex_to_lab(query)
+    distances = [palette_distance(lab, hex_to_lab(p.hex)) for p in palettes]
+    expected = np.argsort(distances, kind="stable")[:5]
+    res_exact = index.query(query, k=5, candidates=len(palettes))
+    _tools.eq_([r["index"] for r in res_exact], expected.tolist())
+
+    _tools.assert_raises(ValueError, PaletteIndex, [hex_strings, []])
+    _tools.assert_raises(ValueError, PaletteIndex, [hex_strings], names=["a", "b"])
+    _tools.eq_(PaletteIndex([]).query(hex_strings), [])
+
+
+def test__search__PaletteIndex__recall():
+    index = PaletteIndex(_palettes(2000))
+
+    # the exact 10 closest palettes found for random queries
+    found = []
+    for seed in range(10):
+        query = Palette(np.random.default_rng(seed).integers(0, 256, size=(6, 3)))
+        distances = palette_distances(hex_to_lab(query.hex), index.lab, index.offsets)
+        expected = set(np.argsort(distances, kind="stable")[:10].tolist())
+        res = index.query(query, k=10, candidates=200)
+        found.append(len(expected & {r["index"] for r in res}))
+
+    _tools.assert_greater_equal(np.mean(found), 8)
+    _tools.assert_greater_equal(min(found), 6)
+
+
+def test__search__PaletteIndex__save():
+    raws = [
+        {"colors": [{"hex": h} for h in p.hex], "permalink": f"//localhost/colors/{i}/"}
+        for i, p in enumerate(_palettes(20))
+    ]
+    index = PaletteIndex.from_dicts(raws, method="hausdorff")
+    _tools.eq_(index.names[3], "//localhost/colors/3/")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index_loaded = PaletteIndex.load(index.save(Path(tmp) / "palettes.npz"))
+
+    _tools.eq_(index_loaded.names, index.names)
+    _tools.eq_(index_loaded.method, "hausdorff")
+    _tools.eq_(index_loaded.palettes, index.palettes)
+    _tools.eq_(index_loaded.query(hex_strings), index.query(hex_strings))
@@ -0,0 +1,123 @@
+import json
+import tempfile
+from functools import partial
+
+from colorteller import batch, teller
+from colorteller.store import ResultsStore, palette_key
+from colorteller.utils import benchmark
+from nose import tools as _tools
+
+hex_strings = ["#8de4d3", "#344b46", "#74ee65", "#238910", "#a6c363", "#509d99"]
+methods = [benchmark.PerceptualDistanceBenchmark, benchmark.LightnessBenchmark]
+
+
+def test__store__palette_key():
+    _tools.eq_(
+        palette_key(hex_strings), palette_key([h.upper() for h in hex_strings[::-1]])
+    )
+    _tools.assert_not_equal(palette_key(hex_strings), palette_key(hex_strings[1:]))
+
+
+def test__store__ResultsStore():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ResultsStore(tmp)
+
+        m = teller.Colors(color_palette=hex_strings).metrics(
+            methods=methods, store=store
+        )
+        _tools.eq_(len(store), 2)
+
+        # same palette in a different order and case is read from the store
+        hex_reordered = [h.upper() for h in hex_strings[::-1]]
+        c = teller.Colors(color_palette=hex_reordered)
+        m_reordered = c.metrics(methods=methods, store=store)
+        _tools.eq_(sum(c.metrics_conversions.values()), 0)
+        _tools.eq_(m_reordered[0]["data"]["colors"], hex_reordered)
+        _tools.eq_(
+            json.loads(json.dumps(m_reordered)),
+            json.loads(
+                json.dumps(teller.Colors(color_palette=hex_reordered).metrics(methods))
+            ),
+        )
+
+        # different parameters are different results
+        teller.Colors(color_palette=hex_strings).metrics(
+            methods=[partial(benchmark.LightnessBenchmark, min_lightness=50)],
+            store=store,
+        )
+        _tools.eq_(len(store), 3)
+
+        # the index is persisted
+        store_reopened = ResultsStore(tmp)
+        _tools.eq_(store_reopened.index, store.index)
+        _tools.eq_(len(list(store_reopened.query(method="lightness"))), 2)
+        _tools.eq_(
+            len(
+                list(
+                    store_reopened.query(
+                        params={"min_lightness": 25, "max_lightness": 85},
+                        color="#8DE4D3",
+                    )
+                )
+            ),
+            1,
+        )
+
+
+def test__store__batch():
+    palettes = [hex_strings, ["#000000", "#zzzzzz"], hex_strings[::-1]]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ResultsStore(tmp)
+        res = batch.benchmark_palettes(palettes, processes=1, store=store)
+        _tools.eq_([r["error"] is None for r in res], [True, False, True])
+        _tools.eq_(len(store), 2)
+
+        res_stored = batch.benchmark_palettes(palettes, processes=2, store=store)
+        _tools.eq_(json.loads(json.dumps(res_stored)), json.loads(json.dumps(res)))
+
+
+def test__store__ResultsStore__stacked():
+    methods = [benchmark.ColorVisionDeficiencyBenchmark]
+    hex_reordered = hex_strings[::-1]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ResultsStore(tmp)
+        teller.Colors(color_palette=hex_strings).metrics(methods=methods, store=store)
+
+        # the matrices of all the deficiencies are reordered
+        _tools.eq_(
+            teller.Colors(color_palette=hex_reordered).metrics(methods, store=store),
+            teller.Colors(color_palette=hex_reordered).metrics(methods),
+        )
+
+
+def test__store__ResultsStore__pairs():
+    methods = [partial(benchmark.PerceptualDistanceBenchmark, threshold=40, sparse=True)]
+    hex_reordered = hex_strings[::-1]
+
+    def _pairs(m):
+        data = m[0]["data"]
+        return sorted(
+            (min(i, j), max(i, j), round(d, 6))
+            for i, j, d in zip(data["pair_rows"], data["pair_cols"], data["pair_distances"])
+        )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ResultsStore(tmp)
+        teller.Colors(color_palette=hex_strings).metrics(methods=methods, store=store)
+
+        # the indices of the pairs are updated to the order of the colors
+        c = teller.Colors(color_palette=hex_reordered)
+        m = c.metrics(methods, store=store)
+        _tools.eq_(sum(c.metrics_conversions.values()), 0)
+        m_expected = teller.Colors(color_palette=hex_reordered).metrics(methods)
+        _tools.ok_(len(_pairs(m_expected)) > 0)
+        _tools.eq_(_pairs(m), _pairs(m_expected))
+
+        # the pairs keep the form of close_pairs: rows < cols, sorted by rows and cols
+        data = m[0]["data"]
+        pairs = list(zip(data["pair_rows"], data["pair_cols"]))
+        _tools.ok_(all(i < j for i, j in pairs))
+        _tools.eq_(pairs, sorted(pairs))
+        _tools.eq_(len(data["pair_distances"]), len(pairs))
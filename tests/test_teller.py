@@ -65,3 +65,90 @@ def test__teller_Colors___benchmark_multiple():
     logger.info(
         f"{c.metrics(methods=[benchmark.PerceptualDistanceBenchmark, benchmark.LightnessBenchmark])}"
     )
+
+
+def test__teller_Colors__lab_array():
+    hex_strings = ["#8de4d3", "#344b46", "#74ee65", "#238910", "#a6c363", "#509d99"]
+
+    c = teller.Colors(color_palette=hex_strings)
+
+    _tools.eq_(c.rgb_array.shape, (6, 3))
+    _tools.eq_(c.rgb, [tuple(rgb) for rgb in c.rgb_array.tolist()])
+    _tools.eq_(c.lab_array.shape, (6, 3))
+    for lab, lab_color in zip(c.lab_array, c.LabColor):
+        _tools.assert_almost_equal(lab[0], lab_color.lab_l)
+
+
+def test__teller_Colors__cache():
+    hex_strings = ["#8de4d3", "#344b46", "#74ee65", "#238910", "#a6c363", "#509d99"]
+
+    ct = teller.ColorTeller(hex_strings=hex_strings)
+    c = teller.Colors(colorteller=ct)
+
+    c.metrics(
+        methods=[benchmark.PerceptualDistanceBenchmark, benchmark.LightnessBenchmark]
+    )
+    _tools.eq_(c.metrics_conversions["lab_array"], 1)
+    _tools.eq_(c.metrics_conversions["rgb_array"], 1)
+
+    c.metrics(methods=[benchmark.LightnessBenchmark])
+    _tools.eq_(sum(c.metrics_conversions.values()), 0)
+
+    ct.from_hex(["#000000", "#ffffff"])
+    _tools.eq_(c.lab_array.shape, (2, 3))
+    _tools.eq_(c.conversions["lab_array"], 2)
+
+
+def test__teller_ColorTeller__cache_copies():
+    hex_strings = ["#000000", "#ffffff"]
+
+    ct = teller.ColorTeller(hex_strings=hex_strings)
+    _tools.eq_(ct.rgb, [(0, 0, 0), (255, 255, 255)])
+
+    # changing the input or the returned values doesn't make the cache stale
+    hex_strings[0] = "#ff0000"
+    ct.hex.append("#00ff00")
+    ct.rgb.pop()
+    _tools.eq_(ct.hex, ["#000000", "#ffffff"])
+    _tools.eq_(ct.rgb, [(0, 0, 0), (255, 255, 255)])
+    _tools.assert_false(ct.rgb_array.flags.writeable)
+    _tools.assert_false(teller.Colors(colorteller=ct).lab_array.flags.writeable)
+
+
+def test__teller_Colors___color_vision_deficiency():
+    # red and green, which are hard to distinguish with protanopia and deuteranopia
+    hex_strings = ["#d62728", "#2ca02c", "#1f77b4"]
+
+    c = teller.Colors(color_palette=hex_strings)
+    m = c.metrics(
+        methods=[
+            benchmark.PerceptualDistanceBenchmark,
+            benchmark.ColorVisionDeficiencyBenchmark,
+        ]
+    )
+    data = m[1]["data"]
+
+    _tools.eq_(m[1]["method"], "color_vision_deficiency")
+    _tools.eq_(data["deficiencies"], ["protanopia", "deuteranopia", "tritanopia"])
+    _tools.eq_(len(data["distances"]), 3)
+    _tools.eq_(len(data["noticable"][0]), 3)
+    _tools.assert_true(m[0]["data"]["noticable"][0][1])
+    _tools.assert_true(
+        data["distances"][0][0][1] < m[0]["data"]["distances"][0][1] / 2
+    )
+
+    # no simulation is the perceptual distance
+    m_none = benchmark.ColorVisionDeficiencyBenchmark(
+        c, deficiencies=["tritanopia"], severity=0
+    ).metric()
+    _tools.eq_(len(m_none["data"]["distances"]), 1)
+    _tools.assert_true(
+        max(
+            abs(a - b)
+            for row_a, row_b in zip(
+                m_none["data"]["distances"][0], m[0]["data"]["distances"]
+            )
+            for a, b in zip(row_a, row_b)
+        )
+        < 1e-3
+    )
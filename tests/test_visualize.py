@@ -1,6 +1,12 @@
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+
+import matplotlib.pyplot as plt
 from colorteller import teller
 from colorteller.utils import benchmark
-from colorteller.visualize import BenchmarkCharts, ApplicationCharts
+from colorteller.visualize import ApplicationCharts, BenchmarkCharts, FigurePool
 from loguru import logger
 from nose import tools as _tools
 
@@ -37,3 +43,145 @@ def test__visualize___Charts():
     # ac.scatter_chart(show=False)
     # ac.donut_chart(show=True)
     ac.charts()
+
+
+def test__visualize___BenchmarkCharts__metric():
+    hex_strings = ["#8de4d3", "#344b46", "#74ee65", "#238910", "#a6c363", "#509d99"]
+
+    c = teller.Colors(color_palette=hex_strings)
+    m = c.metrics(methods=[benchmark.PerceptualDistanceBenchmark])
+
+    # screen with a cheap metric and plot CIEDE2000
+    m_oklab = c.metrics(
+        methods=[partial(benchmark.PerceptualDistanceBenchmark, metric="oklab")]
+    )
+    _tools.eq_(m_oklab[0]["data"]["metric"], "oklab")
+    ax = BenchmarkCharts(metrics=m_oklab).distance_matrix(metric="cie2000")
+    ax_cie2000 = BenchmarkCharts(metrics=m).distance_matrix()
+    _tools.eq_(
+        [t.get_text() for t in ax.texts], [t.get_text() for t in ax_cie2000.texts]
+    )
+
+
+def test__visualize___BenchmarkCharts__deficiency():
+    hex_strings = ["#8de4d3", "#344b46", "#74ee65", "#238910", "#a6c363", "#509d99"]
+
+    c = teller.Colors(color_palette=hex_strings)
+
+    m_cvd = c.metrics(methods=[benchmark.ColorVisionDeficiencyBenchmark])
+    charts_cvd = BenchmarkCharts(metrics=m_cvd)
+    ax = charts_cvd.noticable_matrix(deficiency="deuteranopia")
+    _tools.eq_(len(ax.get_xticklabels()), len(hex_strings))
+    _tools.assert_raises(ValueError, charts_cvd.distance_matrix)
+    _tools.assert_raises(
+        ValueError, charts_cvd.distance_matrix, deficiency="monochromacy"
+    )
+
+
+def test__visualize___ApplicationCharts__charts():
+    hex_strings = ["#8de4d3", "#344b46", "#74ee65", "#238910", "#a6c363", "#509d99"]
+
+    c = teller.Colors(color_palette=hex_strings)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ac = ApplicationCharts(colors=c, save_folder=tmp)
+
+        res = ac.charts(save_to=True, names=["bar_chart", "donut_chart"], jobs=2)
+
+        _tools.eq_(list(res), ["bar_chart", "donut_chart"])
+        _tools.eq_(
+            sorted(p.name for p in Path(tmp).iterdir()),
+            ["ac_bar_chart.png", "ac_donut_chart.png"],
+        )
+
+
+def test__visualize___ApplicationCharts__charts__executor():
+    palettes = [["#8de4d3", "#344b46", "#74ee65"], ["#238910", "#a6c363", "#509d99"]]
+
+    with tempfile.TemporaryDirectory() as tmp, ProcessPoolExecutor(
+        max_workers=2
+    ) as executor:
+        for i, hex_strings in enumerate(palettes):
+            folder = Path(tmp) / str(i)
+            folder.mkdir()
+            ac = ApplicationCharts(
+                colors=teller.Colors(color_palette=hex_strings), save_folder=folder
+            )
+            res = ac.charts(save_to=True, names=["bar_chart"], executor=executor)
+            _tools.eq_(res, {"bar_chart": {"filename": "ac_bar_chart.png"}})
+            _tools.eq_([p.name for p in folder.iterdir()], ["ac_bar_chart.png"])
+
+        # the executor is still usable after the charts are rendered
+        _tools.eq_(executor.submit(len, palettes).result(), 2)
+
+
+def test__visualize___FigurePool():
+    pool = FigurePool(max_size=1)
+
+    fig_1 = pool.acquire()
+    fig_2 = pool.acquire()
+    fig_1.add_subplot().plot([0, 1], [0, 1])
+
+    pool.release(fig_1)
+    pool.release(fig_2)
+
+    _tools.eq_(len(pool), 1)
+    fig = pool.acquire()
+    _tools.assert_true(fig is fig_1)
+    _tools.eq_(fig.axes, [])
+
+
+def test__visualize___Charts__threads():
+    hex_strings = ["#8de4d3", "#344b46", "#74ee65", "#238910", "#a6c363", "#509d99"]
+
+    c = teller.Colors(color_palette=hex_strings)
+    m = c.metrics(
+        methods=[benchmark.PerceptualDistanceBenchmark, benchmark.LightnessBenchmark]
+    )
+    pool = FigurePool()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        bc = BenchmarkCharts(metrics=m, save_folder=tmp, figure_pool=pool)
+        ac = ApplicationCharts(colors=c, save_folder=tmp, figure_pool=pool)
+        renders = [
+            bc.distance_matrix,
+            bc.noticable_matrix,
+            ac.bar_chart,
+            ac.line_chart,
+            ac.scatter_chart,
+            ac.donut_chart,
+        ]
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = [executor.submit(r, save_to=True) for r in renders * 2]
+            for f in futures:
+                f.result()
+
+        _tools.eq_(len(list(Path(tmp).iterdir())), 6)
+
+    _tools.assert_true(0 < len(pool) <= 6)
+
+
+def test__visualize___Charts__pyplot():
+    hex_strings = ["#8de4d3", "#344b46", "#74ee65", "#238910", "#a6c363", "#509d99"]
+
+    c = teller.Colors(color_palette=hex_strings)
+    pool = FigurePool()
+    ac = ApplicationCharts(colors=c, figure_pool=pool)
+
+    # a chart that is not saved is the current pyplot figure
+    ax = ac.bar_chart()
+    _tools.assert_true(plt.gcf() is ax.figure)
+    _tools.assert_true(len(plt.gca().patches) > 0)
+    plt.close(ax.figure)
+
+    # a shown chart is closed
+    ax = ac.line_chart(show=True)
+    _tools.assert_false(plt.fignum_exists(ax.figure.number))
+
+    # a saved chart uses the pool, without touching pyplot
+    fignums = plt.get_fignums()
+    with tempfile.TemporaryDirectory() as tmp:
+        ac.donut_chart(save_to=Path(tmp) / "donut.png")
+    _tools.eq_(plt.get_fignums(), fignums)
+    _tools.eq_(len(pool), 1)
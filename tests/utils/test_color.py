@@ -0,0 +1,79 @@
+import numpy as np
+from colormath.color_conversions import convert_color
+from colormath.color_objects import LabColor, sRGBColor
+from nose import tools as _tools
+
+from colorteller.utils import color
+
+
+def test__color__hex_to_rgb():
+    hex_colors = ["#0000FF", "#800000", "008000"]
+
+    rgb_results = [[0, 0, 255], [128, 0, 0], [0, 128, 0]]
+
+    rgb = color.hex_to_rgb(hex_colors)
+
+    _tools.eq_(rgb.dtype, np.uint8)
+    _tools.eq_(rgb.tolist(), rgb_results)
+
+
+def test__color__hex_to_rgb__invalid():
+    _tools.assert_raises(ValueError, color.hex_to_rgb, ["#0000FF", "#80000G"])
+    _tools.assert_raises(ValueError, color.hex_to_rgb, ["#0000F"])
+    _tools.assert_raises(ValueError, color.hex_to_rgb, ["#12 34 "] * 3)
+    _tools.assert_raises(ValueError, color.hex_to_rgb, ["#0000FF", " 80000"])
+
+
+def test__color__rgb_to_lab():
+    rng = np.random.default_rng(42)
+    rgb = rng.integers(0, 256, size=(100, 3)).astype(np.uint8)
+
+    lab = color.rgb_to_lab(rgb)
+    lab_colormath = np.array(
+        [
+            convert_color(sRGBColor(*c, is_upscaled=True), LabColor).get_value_tuple()
+            for c in rgb.tolist()
+        ]
+    )
+
+    _tools.assert_true(np.allclose(lab, lab_colormath, atol=1e-8))
+
+
+def test__color__simulate_cvd():
+    rgb = color.hex_to_rgb(["#ff0000", "#00ff00", "#808080", "#ffffff"])
+    linear_rgb = color.srgb_to_linear(rgb)
+
+    simulated = color.simulate_cvd(linear_rgb)
+    _tools.eq_(simulated.shape, (3, 4, 3))
+    _tools.assert_true(np.all((simulated >= 0) & (simulated <= 1)))
+    # the neutral colors are kept
+    _tools.assert_true(np.allclose(simulated[:, 2:], linear_rgb[2:], atol=1e-2))
+
+    simulated = color.simulate_cvd(linear_rgb, ["deuteranopia"], severity=0)
+    _tools.assert_true(np.allclose(simulated[0], linear_rgb))
+
+    _tools.assert_raises(ValueError, color.simulate_cvd, linear_rgb, ["monochromacy"])
+    _tools.assert_raises(ValueError, color.simulate_cvd, linear_rgb, severity=2)
+
+
+def test__color__xyz_to_oklab():
+    # test data from https://bottosson.github.io/posts/oklab/
+    xyz = [[0.950, 1.000, 1.089], [1.000, 0.000, 0.000], [0.000, 1.000, 0.000]]
+    oklab = [[1.000, 0.000, 0.000], [0.450, 1.236, -0.019], [0.922, -0.671, 0.263]]
+
+    _tools.assert_true(np.allclose(color.xyz_to_oklab(xyz), oklab, atol=1e-3))
+
+
+def test__color__lab_to_cam02ucs():
+    rgb = np.array([[255, 0, 0], [0, 128, 0], [32, 96, 224], [128, 128, 128]])
+    # from colorspacious.cspace_convert(rgb / 255, "sRGB1", "CAM02-UCS")
+    cam02ucs = [
+        [60.048, 38.689, 24.319],
+        [46.972, -24.253, 22.832],
+        [44.903, -7.768, -33.499],
+        [56.229, -1.265, -0.762],
+    ]
+    lab = color.rgb_to_lab(rgb.astype(np.uint8))
+
+    _tools.assert_true(np.allclose(color.xyz_to_lab(color.lab_to_xyz(lab)), lab))
+    _tools.assert_true(np.allclose(color.lab_to_cam02ucs(lab), cam02ucs, atol=2e-2))
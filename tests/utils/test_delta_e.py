@@ -0,0 +1,119 @@
+import numpy as np
+from colormath.color_conversions import convert_color
+from colormath import color_diff_matrix
+from colormath.color_diff_matrix import delta_e_cie2000 as colormath_delta_e_cie2000
+from colormath.color_objects import LabColor, sRGBColor
+from nose import tools as _tools
+
+from colorteller.utils import delta_e
+
+
+def _lab_colors(size=50, seed=42):
+    rng = np.random.default_rng(seed)
+    rgb = rng.integers(0, 256, size=(size, 3))
+    rgb = np.vstack([rgb, [[0, 0, 0], [255, 255, 255], [128, 128, 128]]])
+
+    return np.array(
+        [
+            convert_color(sRGBColor(*c, is_upscaled=True), LabColor).get_value_tuple()
+            for c in rgb
+        ]
+    )
+
+
+def test__delta_e__delta_e_cie2000_matrix():
+    lab = _lab_colors()
+
+    dist = delta_e.delta_e_cie2000_matrix(lab)
+    dist_colormath = np.array([colormath_delta_e_cie2000(c, lab) for c in lab])
+
+    _tools.eq_(dist.shape, (len(lab), len(lab)))
+    _tools.assert_true(np.allclose(dist, dist.T))
+    _tools.assert_true(np.all(np.diag(dist) == 0))
+    _tools.assert_true(np.abs(dist - dist_colormath).max() < 1e-3)
+
+
+def test__delta_e__delta_e_cie2000__sharma():
+    # test data from Sharma, Wu and Dalal (2005)
+    lab_1 = [[50.0, 2.6772, -79.7751], [50.0, 0.0, 0.0], [60.2574, -34.0099, 36.2677]]
+    lab_2 = [[50.0, 0.0, -82.7485], [50.0, -1.0, 2.0], [60.4626, -34.1751, 39.4387]]
+    results = [2.0425, 2.3669, 1.2644]
+
+    for d, r in zip(delta_e.delta_e_cie2000(lab_1, lab_2), results):
+        _tools.assert_almost_equal(d, r, places=4)
+
+
+def test__delta_e__delta_e_cie2000_matrix__stacked():
+    lab = _lab_colors(size=20).reshape(-1, 23, 3)
+    lab = np.stack([lab[0], lab[0][::-1]])
+
+    dist = delta_e.delta_e_cie2000_matrix(lab)
+
+    _tools.eq_(dist.shape, (2, 23, 23))
+    for k in range(2):
+        _tools.assert_true(np.allclose(dist[k], delta_e.delta_e_cie2000_matrix(lab[k])))
+
+
+def test__delta_e__delta_e_pairwise():
+    lab = _lab_colors()
+    colormath_metrics = {
+        "cie76": color_diff_matrix.delta_e_cie1976,
+        "cie94": color_diff_matrix.delta_e_cie1994,
+        "cie2000": color_diff_matrix.delta_e_cie2000,
+        "cmc": color_diff_matrix.delta_e_cmc,
+    }
+
+    for metric in delta_e.METRICS:
+        dist = delta_e.delta_e_pairwise(lab[:10], lab, metric=metric)
+        _tools.eq_(dist.shape, (10, len(lab)))
+        _tools.assert_true(np.allclose(np.diagonal(dist), 0))
+        if metric in colormath_metrics:
+            dist_colormath = np.array(
+                [colormath_metrics[metric](c, lab) for c in lab[:10]]
+            )
+            _tools.assert_true(np.abs(dist - dist_colormath).max() < 1e-3)
+
+        dist_matrix = delta_e.delta_e_matrix(lab, metric=metric)
+        i, j = np.triu_indices(10, k=1)
+        _tools.assert_true(np.allclose(dist_matrix, dist_matrix.T))
+        # the mean of both directions for CIE94 and CMC
+        _tools.assert_true(
+            np.allclose(dist_matrix[i, j], (dist[i, j] + dist[:, :10].T[i, j]) / 2)
+        )
+
+    _tools.assert_raises(ValueError, delta_e.get_metric, "cie1931")
+
+
+def test__delta_e__delta_e_matrix__permutation():
+    lab = _lab_colors(size=20)
+    perm = np.random.default_rng(0).permutation(len(lab))
+
+    for metric in delta_e.METRICS:
+        dist = delta_e.delta_e_matrix(lab, metric=metric)
+        dist_permuted = delta_e.delta_e_matrix(lab[perm], metric=metric)
+        _tools.assert_true(np.allclose(dist_permuted, dist[np.ix_(perm, perm)]))
+        _tools.assert_true(
+            np.allclose(
+                delta_e.delta_e_symmetric(lab[:5], lab[5:10], metric),
+                delta_e.delta_e_symmetric(lab[5:10], lab[:5], metric),
+            )
+        )
+
+
+def test__delta_e__register_metric():
+    lab = _lab_colors(size=5)
+
+    delta_e.register_metric("lightness", space=lambda lab: lab[..., :1])
+    try:
+        dist = delta_e.delta_e_matrix(lab, "lightness")
+        _tools.assert_true(
+            np.allclose(dist, np.abs(lab[:, None, 0] - lab[None, :, 0]))
+        )
+        _tools.assert_true(
+            np.allclose(
+                delta_e.get_metric("lightness")(lab, lab[::-1]), np.diag(dist[:, ::-1])
+            )
+        )
+    finally:
+        del delta_e.METRICS["lightness"]
+        del delta_e._SPACES["lightness"]
@@ -0,0 +1,58 @@
+import io
+
+from nose import tools as _tools
+
+from colorteller.utils import jsonl
+
+ct_raw = '{"author":"KausalFlow","colors":[{"hex":"#8de4d3","name":""},{"hex":"#344b46"},{"hex":"#74ee65"},{"hex":"#238910"},{"hex":"#a6c363"},{"hex":"#509d99"}],"date":1637142696,"expirydate":-62135596800,"file":"bobcat-yellow","hex":["8de4d3","344b46","74ee65","238910","a6c363","509d99"],"images":null,"objectID":"e0e129c8ed58316127909db84c67efcb","permalink":"//localhost:1234/colors/bobcat-yellow/","publishdate":"2021-11-17T10:51:36+01:00","summary":"This is an experiment","tags":null,"title":"Bobcat Yellow"}'
+
+hex_results = ["#8de4d3", "#344b46", "#74ee65", "#238910", "#a6c363", "#509d99"]
+
+
+def test__jsonl__extract_hex_strings():
+    _tools.eq_(jsonl.extract_hex_strings(ct_raw), hex_results)
+    _tools.eq_(jsonl.extract_hex_strings(ct_raw, parser="json"), hex_results)
+    _tools.eq_(
+        jsonl.extract_hex_strings('{"hex": ["8de4d3", "344b46"], "colors": []}'), []
+    )
+    _tools.eq_(jsonl.extract_hex_strings('{"summary": "no colors"}'), [])
+
+
+def test__jsonl__extract_hex_strings__parsers():
+    records = [
+        ct_raw,
+        '{"hex": ["8de4d3", "344b46"], "colors": []}',
+        '{"summary": "no colors"}',
+        '{"hex": "#ffffff", "colors": [{"hex": "#8de4d3"}, {"hex": "#344b46"}]}',
+        '{"colors": [{"hex": "#8de4d3", "name": "[x] {y}"}, {"name": "no hex"}]}',
+        '{"colors": [{"hex": "#8de4d3", "rgb": [141, 228, 211]}]}',
+        '{"colors": [{"hex": "#8de4d3", "alias": {"hex": "#000000"}}]}',
+        '{"summary": "\\"colors\\": [{\\"hex\\": \\"#000000\\"}]", "colors": [{"hex": "#8de4d3"}]}',
+        '{"meta": {"colors": [{"hex": "#000000"}]}}',
+        '{"meta": {"name": "}"}, "list": [{"colors": [{"hex": "#000000"}]}]}',
+        '{"colors": [{"hex": "\\u00238de4d3"}, {"hex": "#344b46"}]}',
+    ]
+
+    for record in records:
+        _tools.eq_(
+            jsonl.extract_hex_strings(record, parser="regex"),
+            jsonl.extract_hex_strings(record, parser="json"),
+        )
+
+
+def test__jsonl__iter_jsonl():
+    source = io.StringIO(f"{ct_raw}\n\n{ct_raw}\n")
+
+    cts = list(jsonl.iter_jsonl(source))
+
+    _tools.eq_(len(cts), 2)
+    _tools.eq_(cts[1].hex, hex_results)
+
+
+def test__jsonl__iter_jsonl__errors():
+    lines = [ct_raw.encode("utf-8"), b"not json", ct_raw.encode("utf-8")]
+
+    res = list(jsonl.iter_jsonl(iter(lines), as_hex=True, errors="skip"))
+    _tools.eq_(res, [hex_results, hex_results])
+
+    _tools.assert_raises(ValueError, list, jsonl.iter_jsonl(iter(lines)))
@@ -0,0 +1,79 @@
+import tempfile
+from pathlib import Path
+
+import numpy as np
+from nose import tools as _tools
+
+from colorteller.utils import lut
+from colorteller.utils.color import rgb_to_lab
+
+# the full table is about 200 MB, so it is built once for all the tests of the module
+_tmp = None
+_path = None
+
+
+def setup_module():
+    global _tmp, _path
+    _tmp = tempfile.TemporaryDirectory()
+    _path = Path(_tmp.name) / "srgb_to_lab.npy"
+    # a missing table is not remembered
+    _tools.eq_(lut.load_lut(_path), None)
+    _tools.eq_(lut.build_lut(_path, chunk_size=2**22), _path)
+
+
+def teardown_module():
+    lut._LUTS.clear()
+    _tmp.cleanup()
+
+
+def test__lut__rgb_to_index():
+    rgb = np.array([[0, 0, 255], [128, 0, 0], [0, 128, 1]], dtype=np.uint8)
+
+    _tools.eq_(lut.rgb_to_index(rgb).tolist(), [0x0000FF, 0x800000, 0x008001])
+
+
+def test__lut__lookup_lab():
+    # a partial table is enough for the colors #0000xx
+    rgb_blue = np.stack(
+        [np.zeros(256), np.zeros(256), np.arange(256)], axis=-1
+    ).astype(np.uint8)
+    table = rgb_to_lab(rgb_blue).astype(np.float32)
+
+    rgb = np.array([[0, 0, 255], [0, 0, 0], [0, 0, 18]], dtype=np.uint8)
+
+    _tools.assert_true(
+        np.allclose(lut.lookup_lab(rgb, table), rgb_to_lab(rgb), atol=1e-4)
+    )
+
+
+def test__lut__rgb_to_lab_lut__missing():
+    rgb = np.array([[0, 0, 255], [128, 0, 0]], dtype=np.uint8)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "missing.npy"
+        _tools.eq_(lut.load_lut(path), None)
+        _tools.assert_true(
+            np.array_equal(lut.rgb_to_lab_lut(rgb, path), rgb_to_lab(rgb))
+        )
+
+
+def test__lut__build_lut():
+    rng = np.random.default_rng(42)
+    rgb = rng.integers(0, 256, size=(1000, 3)).astype(np.uint8)
+
+    table = lut.load_lut(_path)
+    _tools.eq_(table.shape, (lut.LUT_SIZE, 3))
+    _tools.eq_(table.dtype, np.float32)
+    _tools.assert_true(
+        np.allclose(lut.rgb_to_lab_lut(rgb, _path), rgb_to_lab(rgb), atol=1e-4)
+    )
+
+
+def test__lut__lut_path():
+    rgb = np.array([[0, 0, 255], [128, 0, 0]], dtype=np.uint8)
+
+    # the table is opt-in
+    _tools.eq_(lut.lut_path(), None)
+    _tools.eq_(lut.load_lut(), None)
+    _tools.assert_raises(ValueError, lut.build_lut)
+    _tools.assert_true(np.array_equal(lut.rgb_to_lab_lut(rgb), rgb_to_lab(rgb)))
@@ -0,0 +1,52 @@
+import numpy as np
+from nose import tools as _tools
+
+from colorteller import teller
+from colorteller.utils.color import hex_to_lab
+from colorteller.utils.delta_e import delta_e_cie2000
+from colorteller.utils.names import NamedColorIndex
+
+
+def test__names__NamedColorIndex():
+    rng = np.random.default_rng(42)
+    named_colors = {
+        f"color_{i}": f"#{v:06x}"
+        for i, v in enumerate(rng.choice(2**24, size=2000, replace=False))
+    }
+    index = NamedColorIndex(named_colors)
+
+    hex_strings = [f"#{v:06x}" for v in rng.integers(0, 2**24, size=200)]
+    res = index.query(hex_strings, k=3)
+
+    _tools.eq_(len(res), 200)
+    _tools.eq_([len(r) for r in res], [3] * 200)
+
+    # the same as a linear scan
+    dist = delta_e_cie2000(hex_to_lab(hex_strings)[:, None, :], index.lab[None, :, :])
+    nearest = np.argsort(dist, axis=1, kind="stable")[:, :3]
+    _tools.eq_(
+        [[c["name"] for c in r] for r in res],
+        [[index.names[i] for i in row] for row in nearest.tolist()],
+    )
+    _tools.assert_true(
+        np.allclose(
+            [[c["delta_e"] for c in r] for r in res],
+            np.take_along_axis(dist, nearest, axis=1),
+        )
+    )
+    _tools.eq_(index.name(hex_strings[:2]), [r[0]["name"] for r in res[:2]])
+    _tools.assert_raises(ValueError, index.query, hex_strings, k=0)
+
+    # ties are broken by the order of the named colors, the same as argmin
+    index = NamedColorIndex({"aqua": "#00ffff", "cyan": "#00ffff", "red": "#ff0000"})
+    _tools.eq_(index.name(["#01fefe", "#fe0000"]), ["aqua", "red"])
+
+
+def test__teller__ColorTeller__fill_names():
+    index = NamedColorIndex({"black": "#000000", "white": "#ffffff", "red": "#ff0000"})
+    ct = teller.ColorTeller(
+        {"colors": [{"hex": "#fe0101", "name": "my red"}, {"hex": "#111111", "name": ""}]}
+    )
+
+    _tools.eq_(ct.names, ["my red", ""])
+    _tools.eq_(ct.fill_names(index), ["my red", "black"])
@@ -0,0 +1,72 @@
+import numpy as np
+from nose import tools as _tools
+
+from colorteller.utils.color import rgb_to_lab
+from colorteller.utils.delta_e import delta_e_matrix
+from colorteller.utils.neighbors import close_pairs, compress_chroma
+
+
+def _lab_colors(size=1000, seed=42):
+    rng = np.random.default_rng(seed)
+    rgb = rng.integers(0, 256, size=(size, 3))
+    # duplicates and grays, of which the chroma is 0
+    rgb = np.vstack([rgb, rgb[:5], [[0, 0, 0], [128, 128, 128]]])
+
+    return rgb_to_lab(rgb.astype(np.uint8))
+
+
+def _dense_pairs(lab, threshold, metric):
+    dist = delta_e_matrix(lab, metric)
+    rows, cols = np.nonzero(np.triu(dist <= threshold, k=1))
+
+    return rows, cols, dist[rows, cols]
+
+
+def test__neighbors__compress_chroma():
+    lab = np.array([[50.0, 0.0, 0.0], [50.0, 30.0, 40.0]])
+    compressed = compress_chroma(lab)
+
+    _tools.eq_(compressed[0].tolist(), [50.0, 0.0, 0.0])
+    _tools.assert_true(np.isclose(np.hypot(*compressed[1, 1:]), np.log1p(0.045 * 50) / 0.045))
+    # the hue is kept
+    _tools.assert_true(np.isclose(compressed[1, 1] / compressed[1, 2], 0.75))
+
+
+def test__neighbors__close_pairs():
+    lab = _lab_colors()
+
+    for metric, threshold in [("cie2000", 5), ("cie94", 5), ("cmc", 5), ("oklab", 8)]:
+        rows, cols, distances = _dense_pairs(lab, threshold, metric)
+        for chunk_size in [2**20, 1000]:
+            pairs = close_pairs(lab, threshold, metric=metric, chunk_size=chunk_size)
+            _tools.ok_(len(rows) > 0)
+            _tools.eq_(pairs["rows"].tolist(), rows.tolist())
+            _tools.eq_(pairs["cols"].tolist(), cols.tolist())
+            _tools.assert_true(np.allclose(pairs["distances"], distances))
+
+
+def test__neighbors__close_pairs__empty():
+    _tools.eq_(len(close_pairs(np.zeros((0, 3)))["rows"]), 0)
+    _tools.eq_(len(close_pairs([[50, 0, 0]])["rows"]), 0)
+    _tools.eq_(len(close_pairs([[50, 0, 0], [90, 0, 0]], threshold=5)["rows"]), 0)
+    _tools.eq_(close_pairs([[50, 0, 0], [50, 0, 0]])["rows"].tolist(), [0])
+
+
+def test__neighbors__close_pairs__permutation():
+    lab = _lab_colors(size=300)
+    perm = np.random.default_rng(0).permutation(len(lab))
+
+    for metric in ["cie94", "cmc"]:
+        pairs = close_pairs(lab, 10, metric=metric)
+        pairs_permuted = close_pairs(lab[perm], 10, metric=metric)
+        # the same pairs with the same distances in the original indices
+        rows, cols = perm[pairs_permuted["rows"]], perm[pairs_permuted["cols"]]
+        found = {
+            (min(i, j), max(i, j)): d
+            for i, j, d in zip(rows, cols, pairs_permuted["distances"])
+        }
+        expected = dict(zip(zip(pairs["rows"], pairs["cols"]), pairs["distances"]))
+        _tools.eq_(set(found), set(expected))
+        _tools.assert_true(
+            np.allclose([found[k] for k in expected], list(expected.values()))
+        )
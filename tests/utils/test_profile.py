@@ -0,0 +1,62 @@
+import sys
+
+from nose import tools as _tools
+
+from colorteller import teller
+from colorteller.utils import benchmark
+from colorteller.utils.profile import Profiler
+
+HEX_STRINGS = ["#8de4d3", "#344b46", "#74ee65", "#238910", "#a6c363", "#509d99"]
+METHODS = [benchmark.PerceptualDistanceBenchmark, benchmark.LightnessBenchmark]
+
+
+def test__profile__Profiler():
+    events = []
+    profiler = Profiler(callbacks=[events.append])
+
+    c = teller.Colors(color_palette=HEX_STRINGS)
+    c.metrics(methods=METHODS, profiler=profiler)
+    c.metrics(methods=METHODS, profiler=profiler)
+
+    _tools.eq_(set(profiler.stats), {"perceptual_distance", "lightness"})
+    pd_stats = profiler.stats["perceptual_distance"]
+    _tools.eq_(pd_stats["calls"], 2)
+    _tools.eq_(
+        set(pd_stats["stages"]), {"conversion", "pairwise", "thresholding", "result"}
+    )
+    _tools.eq_(pd_stats["stages"]["pairwise"]["calls"], 2)
+    _tools.assert_true(pd_stats["time"] >= pd_stats["stages"]["pairwise"]["time"])
+    _tools.eq_(pd_stats["allocated"], 0)
+
+    # 5 events for perceptual_distance and 4 for lightness in each call
+    _tools.eq_(len(events), 18)
+    _tools.eq_(events[-1]["method"], "lightness")
+    _tools.eq_(events[-1]["stage"], "total")
+
+
+def test__profile__Profiler__trace_memory():
+    profiler = Profiler(trace_memory=True)
+
+    c = teller.Colors(color_palette=HEX_STRINGS)
+    c.metrics(methods=METHODS, profiler=profiler)
+
+    stats = profiler.stats["perceptual_distance"]
+    _tools.assert_true(stats["stages"]["result"]["allocated"] > 0)
+    if sys.version_info >= (3, 9):
+        _tools.assert_true(
+            stats["peak_memory"] >= stats["stages"]["pairwise"]["peak_memory"]
+        )
+
+
+def test__profile__timings():
+    profiler = Profiler()
+    c = teller.Colors(color_palette=HEX_STRINGS)
+
+    m = c.metrics(methods=METHODS, profiler=profiler, timings=True)
+    m = c.metrics(methods=METHODS, profiler=profiler, timings=True)
+
+    _tools.eq_([b["method"] for b in m], ["perceptual_distance", "lightness"])
+    # the timings block has the stats of the last call only
+    _tools.eq_(m[0]["timings"]["calls"], 1)
+    _tools.eq_(profiler.stats["perceptual_distance"]["calls"], 2)
+    _tools.assert_false("timings" in c.metrics(methods=METHODS)[0])
@@ -0,0 +1,93 @@
+import tempfile
+from pathlib import Path
+
+import numpy as np
+from click.testing import CliRunner
+from nose import tools as _tools
+
+from colorteller import teller
+from colorteller.command import colorteller
+from colorteller.utils import benchmark
+from colorteller.utils.serialize import (
+    condense,
+    condense_metrics,
+    load_metrics,
+    save_metrics,
+    squareform,
+)
+
+HEX_STRINGS = ["#8de4d3", "#344b46", "#74ee65", "#238910", "#a6c363", "#509d99"]
+
+
+def _metrics():
+    c = teller.Colors(color_palette=HEX_STRINGS)
+
+    return c.metrics(
+        methods=[benchmark.PerceptualDistanceBenchmark, benchmark.LightnessBenchmark]
+    )
+
+
+def test__serialize__condense():
+    matrix = np.array([[0, 1, 2], [1, 0, 3], [2, 3, 0]])
+
+    _tools.eq_(condense(matrix).tolist(), [1, 2, 3])
+    _tools.eq_(squareform(condense(matrix)).tolist(), matrix.tolist())
+
+    stacked = np.stack([matrix, matrix * 2])
+    _tools.eq_(condense(stacked).shape, (2, 3))
+    _tools.eq_(squareform(condense(stacked)).tolist(), stacked.tolist())
+    _tools.assert_raises(ValueError, squareform, [1, 2])
+
+
+def test__serialize__condense_metrics():
+    m = _metrics()
+
+    m_condensed = condense_metrics(m)
+
+    _tools.eq_(m_condensed[0]["condensed"], ["distances", "noticable"])
+    _tools.eq_(m_condensed[0]["data"]["distances"].shape, (15,))
+    _tools.eq_(m_condensed[1], m[1])
+
+
+def test__serialize__save_metrics():
+    m = _metrics()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, format in [
+            ("metrics.json", None),
+            ("metrics_condensed.json", "condensed"),
+            ("metrics.npz", None),
+        ]:
+            path = save_metrics(m, Path(tmp) / name, format=format)
+            m_loaded = load_metrics(path)
+
+            _tools.eq_(m_loaded[0]["data"]["colors"], HEX_STRINGS)
+            for field in ["distances", "noticable"]:
+                np.testing.assert_array_equal(
+                    m_loaded[0]["data"][field], m[0]["data"][field]
+                )
+            _tools.eq_(m_loaded[1], m[1])
+
+        m_condensed = load_metrics(Path(tmp) / "metrics.npz", expand=False)
+        _tools.eq_(m_condensed[0]["data"]["noticable"].dtype, bool)
+        _tools.eq_(m_condensed[0]["data"]["noticable"].shape, (15,))
+
+
+def test__serialize__command():
+    hex_args = [a for h in HEX_STRINGS for a in ("-h", h)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        result = CliRunner().invoke(
+            colorteller, ["benchmark", *hex_args, "-t", tmp, "-f", "npz"]
+        )
+
+        _tools.eq_(result.exit_code, 0)
+        m = load_metrics(Path(tmp) / "metrics.npz")
+        _tools.eq_(m[0]["data"]["distances"].shape, (6, 6))
+
+    result = CliRunner().invoke(colorteller, ["benchmark", *hex_args, "-f", "npz"])
+    _tools.assert_not_equal(result.exit_code, 0)
+
+    result = CliRunner().invoke(colorteller, ["benchmark", *hex_args, "-f", "condensed"])
+    _tools.eq_(result.exit_code, 0)
+    _tools.assert_in('"condensed"', result.output)
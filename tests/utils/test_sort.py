@@ -0,0 +1,79 @@
+import numpy as np
+from nose import tools as _tools
+
+from colorteller.utils import sort
+from colorteller.utils.color import rgb_to_lab
+from colorteller.utils.delta_e import delta_e_cie2000, get_metric
+
+
+def _lab_colors(size=64, seed=42):
+    rng = np.random.default_rng(seed)
+    return rgb_to_lab(rng.integers(0, 256, size=(size, 3)).astype(np.uint8))
+
+
+def test__sort__sort_on_distance_matrix__shortest_path():
+    lab = _lab_colors()
+
+    res = sort.sort_on_distance_matrix(lab, method="shortest_path")
+
+    _tools.eq_(sorted(res["indices"]), list(range(len(lab))))
+    _tools.assert_less(
+        sum(res["distances"]), delta_e_cie2000(lab[:-1], lab[1:]).sum() / 2
+    )
+
+
+def test__sort__sort_on_distance_matrix__max_min():
+    lab = _lab_colors()
+
+    res = sort.sort_on_distance_matrix(lab, method="max_min")
+
+    _tools.eq_(sorted(res["indices"]), list(range(len(lab))))
+    _tools.assert_greater(min(res["distances"]), delta_e_cie2000(lab[:-1], lab[1:]).min())
+    _tools.assert_true(
+        np.allclose(
+            res["distances"],
+            delta_e_cie2000(lab[res["indices"]][:-1], lab[res["indices"]][1:]),
+        )
+    )
+
+
+def test__sort__sort_on_distance_to_reference():
+    lab = _lab_colors(size=10)
+    white = rgb_to_lab(np.array([255, 255, 255], dtype=np.uint8))
+
+    res = sort.sort_on_distance_to_reference(lab, delta_e_cie2000, white)
+
+    _tools.assert_true(np.all(np.diff(delta_e_cie2000(res["colors"], white)) >= 0))
+
+
+def test__sort__sort_on_distance_matrix__metric():
+    lab = _lab_colors()
+
+    res = sort.sort_on_distance_matrix(lab, distance_metric="oklab")
+    res_function = sort.sort_on_distance_matrix(
+        lab, distance_metric=get_metric("oklab")
+    )
+
+    _tools.eq_(res["indices"], res_function["indices"])
+    _tools.assert_true(np.allclose(res["distances"], res_function["distances"]))
+    _tools.assert_raises(
+        ValueError, sort.sort_on_distance_matrix, lab, distance_metric="cie1931"
+    )
+
+
+def test__sort__sort_on_distance_matrix__scalar_metric():
+    lab = _lab_colors(size=12)
+
+    def _scalar_cie2000(c1, c2):
+        # a metric of two colormath LabColor objects, e.g., colormath.color_diff.delta_e_cie2000
+        return float(
+            delta_e_cie2000(
+                np.array(c1.get_value_tuple()), np.array(c2.get_value_tuple())
+            )
+        )
+
+    res = sort.sort_on_distance_matrix(lab, distance_metric=_scalar_cie2000)
+    res_name = sort.sort_on_distance_matrix(lab, distance_metric="cie2000")
+
+    _tools.eq_(res["indices"], res_name["indices"])
+    _tools.assert_true(np.allclose(res["distances"], res_name["distances"]))